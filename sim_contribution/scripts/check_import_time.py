@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+
+# Modules that must stay cheap to import, and what they must not pull in.
+LIGHT_MODULES = ("sim_contribution", "sim_contribution.cli")
+FORBIDDEN = ("matplotlib", "numpy")
+
+
+def measure(module: str) -> Tuple[float, List[str]]:
+    """Cumulative import time of `module` in a fresh interpreter (ms) and every module it loaded."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (SRC_ROOT, env.get("PYTHONPATH")) if p)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line[len("import time:") :].split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    return cumulative.get(module, 0) / 1000.0, list(cumulative)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="cumulative import time allowed per module")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module (minimum is used)")
+    args = parser.parse_args()
+
+    failures = []
+    for module in LIGHT_MODULES:
+        runs = [measure(module) for _ in range(max(args.repeat, 1))]
+        elapsed = min(ms for ms, _ in runs)
+        loaded = runs[0][1]
+        heavy = sorted({name.split(".")[0] for name in loaded} & set(FORBIDDEN))
+        status = "ok"
+        if elapsed > args.budget_ms:
+            status = "over budget"
+            failures.append(f"{module}: {elapsed:.1f} ms > {args.budget_ms:.1f} ms")
+        if heavy:
+            status = "imports " + ", ".join(heavy)
+            failures.append(f"{module}: imports {', '.join(heavy)}")
+        print(f"{module}: {elapsed:.1f} ms ({status})")
+
+    if failures:
+        print("\n".join(["import-time check failed:"] + failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
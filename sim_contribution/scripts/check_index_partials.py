@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.insert(0, SRC_ROOT)
+
+from sim_contribution.config import Config  # noqa: E402
+from sim_contribution.evaluation.runner import run_phase_a  # noqa: E402
+from sim_contribution.indices.empirical_interaction import compute_empirical_interaction_scores  # noqa: E402
+from sim_contribution.indices.pair_profile import compute_observed_pair_counts  # noqa: E402
+from sim_contribution.indices.partials import (  # noqa: E402
+    chunk_bounds,
+    compute_index_partials,
+    index_partial,
+    merge_partials,
+)
+from sim_contribution.log.columnar import ColumnarSeasonLog  # noqa: E402
+from sim_contribution.strategies.greedy_interaction import interaction_candidates  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def same_candidates(a: tuple, b: tuple) -> bool:
+    """Same rows (members up to their common padding), sizes and score bits."""
+    width = max(a[0].shape[1], b[0].shape[1])
+    pad = [np.pad(m, ((0, 0), (0, width - m.shape[1])), constant_values=-1) for m in (a[0], b[0])]
+    return np.array_equal(pad[0], pad[1]) and np.array_equal(a[1], b[1]) and a[2].tobytes() == b[2].tobytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check that index partials reproduce the serial indices bit for bit, and time both."
+    )
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=max(os.cpu_count() or 1, 2))
+    parser.add_argument("--chunk-teams", type=int, nargs="+", default=[61, 4096, 1 << 18])
+    args = parser.parse_args()
+
+    # One schedule candidate: the log only has to be large, not well spread.
+    config = Config(n_players=args.players, n_matches=args.matches, schedule_candidates=1)
+    season_log, _ = run_phase_a(args.seed, config)
+    log = ColumnarSeasonLog.from_season_log(season_log)
+    print(f"{args.players} players, {args.matches} matches, {log.n_teams} team rows")
+
+    # What the strategies build: scored candidates and observed pair counts.
+    candidates, serial_candidates = timed(interaction_candidates, season_log, config)
+    (pair_index, pair_counts), serial_pairs = timed(compute_observed_pair_counts, season_log, config.n_players)
+    serial = serial_candidates + serial_pairs
+    print(f"serial (candidates + pair counts): {serial:.3f} s")
+
+    failures = []
+    for chunk_teams in args.chunk_teams:
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            partial = compute_index_partials(log, config, chunk_teams, workers)
+            merged = partial.fold_indices(config).candidates()
+            elapsed = time.perf_counter() - start
+            if not same_candidates(merged, candidates):
+                failures.append(f"chunk_teams={chunk_teams} workers={workers}: candidates differ")
+            if not (np.array_equal(partial.pair_index, pair_index) and np.array_equal(partial.pair_counts, pair_counts)):
+                failures.append(f"chunk_teams={chunk_teams} workers={workers}: pair counts differ")
+            print(f"partials chunk_teams={chunk_teams} workers={workers}: {elapsed:.3f} s ({serial / elapsed:.1f}x)")
+
+    parallel = replace(config, index_workers=args.workers, index_chunk_teams=args.chunk_teams[-1])
+    scores = compute_empirical_interaction_scores(season_log, config)
+    if list(compute_empirical_interaction_scores(season_log, parallel).items()) != list(scores.items()):
+        failures.append("index_workers dispatch: interaction scores differ")
+
+    # The map (one partial per chunk) runs in parallel; the merge and the fold do not.
+    chunk_teams = max(1, -(-log.n_teams // args.workers))
+    k_max = int(log.members.shape[1])
+    start = time.perf_counter()
+    partials = [
+        index_partial(log.rows(lo, hi), config.n_players, k_max, lo) for lo, hi in chunk_bounds(log.n_teams, chunk_teams)
+    ]
+    map_seconds = time.perf_counter() - start
+    merged_partial, merge_seconds = timed(merge_partials, partials)
+    _, fold_seconds = timed(lambda: merged_partial.fold_indices(config).candidates())
+    projected = map_seconds / len(partials) + merge_seconds + fold_seconds
+    print(
+        f"{len(partials)} chunks of {chunk_teams} rows: map {map_seconds:.3f} s, merge {merge_seconds:.3f} s, "
+        f"fold {fold_seconds:.3f} s; projected with {args.workers} workers: {projected:.3f} s "
+        f"({serial / projected:.1f}x, pool start-up not included; {os.cpu_count()} CPU(s) here)"
+    )
+
+    if failures:
+        print("\n".join(["index partial check failed:"] + failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from dataclasses import replace
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.insert(0, SRC_ROOT)
+
+import numpy as np  # noqa: E402
+
+from sim_contribution.config import Config  # noqa: E402
+from sim_contribution.evaluation.runner import run_phase_a  # noqa: E402
+from sim_contribution.log.columnar import ColumnarSeasonLog  # noqa: E402
+from sim_contribution.players.param_generator import generate_true_params  # noqa: E402
+from sim_contribution.precision import team_value_error_bound  # noqa: E402
+from sim_contribution.rng import phase_a_streams  # noqa: E402
+
+# Slack for the float64 rounding the bound leaves out.
+ABS_SLACK = 1e-12
+
+
+def params_nbytes(seed: int, config: Config) -> int:
+    params = generate_true_params(phase_a_streams(seed, config)["params"], config)
+    return params.affinity.nbytes + sum(np.asarray(p.skill).nbytes for p in params.players)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare float32 Phase A runs against float64 ones.")
+    parser.add_argument("--seeds", type=int, default=3, help="seasons compared (seeds 0..N-1)")
+    parser.add_argument("--n-players", type=int, default=60)
+    parser.add_argument("--n-matches", type=int, default=60)
+    args = parser.parse_args()
+
+    base = Config(n_players=args.n_players, n_matches=args.n_matches)
+    configs = {mode: replace(base, precision=mode) for mode in ("float64", "float32")}
+
+    failures = []
+    worst = {"v_true": 0.0, "y_obs": 0.0, "z": 0.0, "bound_ratio": 0.0}
+    n_teams = rank_flips = 0
+    for seed in range(args.seeds):
+        log64, params64 = run_phase_a(seed, configs["float64"])
+        log32, _ = run_phase_a(seed, configs["float32"])
+        for match64, match32 in zip(log64.matches, log32.matches):
+            for team64, team32 in zip(match64.teams, match32.teams):
+                n_teams += 1
+                bound = team_value_error_bound(team64.members, params64, base)
+                dv = abs(team32.v_true - team64.v_true)
+                dy = abs(team32.y_obs - team64.y_obs)
+                worst["v_true"] = max(worst["v_true"], dv)
+                worst["y_obs"] = max(worst["y_obs"], dy)
+                worst["z"] = max(worst["z"], abs(team32.z - team64.z))
+                worst["bound_ratio"] = max(worst["bound_ratio"], dv / bound if bound > 0 else 0.0)
+                rank_flips += team32.rank != team64.rank
+                if dv > bound + ABS_SLACK:
+                    failures.append(f"seed {seed} team {team64.members}: |dv| {dv:.3e} > bound {bound:.3e}")
+                if dy > bound + 2.0**-24 * abs(team64.y_obs) + ABS_SLACK:
+                    failures.append(f"seed {seed} team {team64.members}: |dy| {dy:.3e} over bound")
+
+    print(f"teams compared: {n_teams} ({args.seeds} seasons, n_players={args.n_players})")
+    print(f"max |dv_true| {worst['v_true']:.3e}  max |dy_obs| {worst['y_obs']:.3e}  max |dz| {worst['z']:.3e}")
+    print(f"max |dv| / bound {worst['bound_ratio']:.3f}  rank flips {rank_flips}")
+    for mode, config in configs.items():
+        log, _ = run_phase_a(0, config)
+        columnar = ColumnarSeasonLog.from_season_log(log).with_precision(config)
+        log_bytes = sum(column.nbytes for column in columnar.columns().values())
+        print(f"{mode}: true params {params_nbytes(0, config)} B, columnar log {log_bytes} B")
+
+    if failures:
+        print("\n".join(["precision check failed:"] + failures[:20]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
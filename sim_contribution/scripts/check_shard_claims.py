@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.insert(0, SRC_ROOT)
+
+from sim_contribution.sweep.shards import claim_shard, init_shards, reclaim_expired, shard_name  # noqa: E402
+
+
+def hammer(root: str, worker_id: str, seconds: float, lease_seconds: float) -> int:
+    """Reclaim and claim in a loop, as workers with an expiring lease do; returns the claims made."""
+    claims = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        reclaim_expired(root, lease_seconds)
+        if claim_shard(root, worker_id) is not None:
+            claims += 1
+    return claims
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Race shard claims against lease reclaims in several processes.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--lease", type=float, default=0.0, help="lease in seconds (0: every claim expires at once)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        init_shards(root, seeds=range(args.shards), shard_size=1, lease_seconds=args.lease)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [
+                pool.submit(hammer, root, f"worker-{idx}", args.seconds, args.lease) for idx in range(args.workers)
+            ]
+            failures = []
+            claims = 0
+            for future in futures:
+                try:
+                    claims += future.result()
+                except Exception as exc:
+                    failures.append(f"worker died: {type(exc).__name__}: {exc}")
+
+        # Every shard must be in exactly one place, unclaimed or claimed.
+        held = Counter(os.listdir(os.path.join(root, "todo")))
+        held.update(name.split("@")[0] for name in os.listdir(os.path.join(root, "claimed")))
+        expected = Counter(shard_name(shard) for shard in range(args.shards))
+        if held != expected:
+            failures.append(f"shards lost or duplicated: {sorted((held - expected) + (expected - held))}")
+
+    print(f"{args.workers} workers, {args.shards} shards, {claims} claims in {args.seconds:.1f} s")
+    if failures:
+        print("\n".join(["shard claim check failed:"] + failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
+if SRC_ROOT not in sys.path:
+    sys.path.insert(0, SRC_ROOT)
+
+from sim_contribution.cli import main
+
+# Same as `sim-contribution replay ...` once the package is installed.
+if __name__ == "__main__":
+    sys.exit(main(["replay", *sys.argv[1:]]))
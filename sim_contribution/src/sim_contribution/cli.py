@@ -0,0 +1,536 @@
+"""Console entry point: `sim-contribution run|sweep|replay|crossval|shards|serve|tune`.
+
+Only the standard library is imported at startup. NumPy, the simulation,
+reporting and matplotlib are imported by the subcommand (and the stage) that
+needs them, so short jobs with `--plots none` never load matplotlib.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import List, Optional, Sequence
+
+from sim_contribution.config import PRECISION_MODES
+from sim_contribution.schedule.types import SCHEDULE_MODES
+from sim_contribution.viz.types import PLOT_LEVELS
+
+
+def _strategy_names(spec: Optional[str]) -> List[str]:
+    if spec is None:
+        from sim_contribution.strategies.registry import DEFAULT_STRATEGIES
+
+        return list(DEFAULT_STRATEGIES)
+    return [name.strip() for name in spec.split(",") if name.strip()]
+
+
+def _add_plot_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--plots", choices=list(PLOT_LEVELS), default="all")
+    parser.add_argument("--plot-workers", type=int, default=1, help="processes rendering figures in parallel")
+
+
+def _add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--metrics-file", type=str, default=None, help='Prometheus text file, rewritten every interval ("{worker}" is replaced)'
+    )
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="seconds between metric exports")
+    parser.add_argument("--status", action="store_true", help="print a live status line to stderr")
+
+
+def _add_bootstrap_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--bootstrap-samples",
+        type=int,
+        default=0,
+        help="bootstrap resamples for CI columns in phase_a_indices (0: skip)",
+    )
+
+
+def _add_schedule_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--schedule",
+        choices=list(SCHEDULE_MODES),
+        default="fixed",
+        help="Phase A partitions fixed up front or chosen online after each match",
+    )
+    parser.add_argument(
+        "--schedule-seed",
+        type=int,
+        default=-1,
+        help="seed of the fixed schedule, shared by every season (default: the season seed)",
+    )
+    parser.add_argument(
+        "--schedule-library", type=str, default="", help="directory of precomputed schedules, filled on first use"
+    )
+
+
+def _add_precision_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--precision",
+        choices=list(PRECISION_MODES),
+        default="float64",
+        help="storage precision of parameters and Phase A values (see precision.py)",
+    )
+
+
+def _add_config_argument(parser: argparse.ArgumentParser, default: str) -> None:
+    parser.add_argument(
+        "--config", type=str, default=None, help=f"config.json, or a season directory holding one (default: {default})"
+    )
+
+
+def _saved_config(path: str):
+    from sim_contribution.log.loader import load_config
+
+    return load_config(os.path.abspath(path))
+
+
+def _season_config(args: argparse.Namespace):
+    from sim_contribution.config import Config
+
+    return Config(
+        bootstrap_samples=args.bootstrap_samples,
+        schedule_mode=args.schedule,
+        schedule_seed=args.schedule_seed,
+        schedule_library=os.path.abspath(args.schedule_library) if args.schedule_library else "",
+        precision=args.precision,
+    )
+
+
+def _metrics_exporter(args: argparse.Namespace, metrics):
+    from sim_contribution.sweep.metrics import MetricsExporter
+
+    path = args.metrics_file.replace("{worker}", metrics.worker) if args.metrics_file else None
+    return MetricsExporter(
+        metrics, path=path, interval=args.metrics_interval, stream=sys.stderr if args.status else None
+    )
+
+
+def _run(args: argparse.Namespace) -> int:
+    from sim_contribution.evaluation.runner import run_experiment
+
+    config = _season_config(args)
+    report = run_experiment(args.seed, config, _strategy_names(args.strategies))
+
+    from sim_contribution.evaluation.reporting import save_all_outputs, save_phase_a_indices, summarize_results
+
+    outdir = os.path.abspath(args.outdir)
+    save_all_outputs(report, outdir, config)
+    save_phase_a_indices(report.season_log, config, outdir)
+    if args.plots != "none":
+        from sim_contribution.viz.plots import plot_all
+
+        plot_all(
+            report.true_params,
+            report.season_log,
+            report.strategy_results,
+            config,
+            outdir,
+            level=args.plots,
+            workers=args.plot_workers,
+        )
+
+    print(summarize_results(report.strategy_results))
+
+    if args.baseline_samples > 0:
+        import numpy as np
+
+        from sim_contribution.evaluation.baseline import random_baseline, save_baseline_report, summarize_baseline
+
+        baseline = random_baseline(
+            report.true_params,
+            report.strategy_results,
+            config,
+            args.baseline_samples,
+            np.random.default_rng(args.seed + 2000),
+        )
+        save_baseline_report(baseline, outdir)
+        print(summarize_baseline(baseline))
+    return 0
+
+
+def _sweep(args: argparse.Namespace) -> int:
+    from sim_contribution.evaluation.aggregation import save_aggregate_report, summarize_aggregate
+    from sim_contribution.evaluation.sink import BackgroundSink, FanoutSink, OutputSink, ResultStoreSink, SeasonFilesSink
+    from sim_contribution.sweep.metrics import SweepMetrics
+    from sim_contribution.sweep.runner import parse_seeds, run_seasons
+
+    config = _season_config(args)
+    seeds = parse_seeds(args.seeds)
+    outdir = os.path.abspath(args.outdir)
+    metrics = SweepMetrics(
+        total=len(seeds), writers=0 if args.writer == "sync" else (args.writer_workers if args.writer == "process" else 1)
+    )
+    sink: OutputSink = FanoutSink(
+        [
+            SeasonFilesSink(outdir, config, plots=args.plots, plot_workers=args.plot_workers),
+            ResultStoreSink(os.path.join(outdir, "results.jsonl")),
+        ]
+    )
+    if args.writer != "sync":
+        background = BackgroundSink(
+            sink,
+            max_pending=args.max_pending,
+            mode=args.writer,
+            workers=args.writer_workers,
+            observer=metrics.record_write,
+        )
+        metrics.set_queue_depth_source(lambda: background.pending)
+        sink = background
+    if args.archive:
+        from sim_contribution.evaluation.sink import ArchiveSink
+
+        # Buffers rows across seasons, so it runs on the calling thread.
+        sink = FanoutSink([sink, ArchiveSink(os.path.abspath(args.archive), config, chunk_rows=args.archive_chunk_rows)])
+
+    checker = None
+    if args.crosscheck_rate > 0:
+        from sim_contribution.evaluation.crosscheck import CrossChecker
+
+        dump_dir = os.path.abspath(args.crosscheck_dir) if args.crosscheck_dir else os.path.join(outdir, "crosscheck")
+        checker = CrossChecker(args.crosscheck_rate, seed=seeds[0] if seeds else 0, dump_dir=dump_dir)
+
+    with sink, _metrics_exporter(args, metrics):
+        aggregate = run_seasons(
+            seeds, config, sink, _strategy_names(args.strategies), metrics=metrics, checker=checker
+        )
+
+    save_aggregate_report(aggregate, outdir)
+    print(summarize_aggregate(aggregate))
+    if checker is not None:
+        checker.save_report(os.path.join(outdir, "crosscheck.json"))
+        print(checker.summary())
+    return 0
+
+
+def _replay(args: argparse.Namespace) -> int:
+    from sim_contribution.evaluation.replay import replay_directory, save_replay_results, summarize_replay
+
+    results = replay_directory(
+        os.path.abspath(args.logdir),
+        _strategy_names(args.strategies),
+        _saved_config(args.config) if args.config else None,
+        seed=args.seed,
+        workers=args.workers,
+        evaluate=not args.no_evaluate,
+    )
+    save_replay_results(results, os.path.abspath(args.out))
+    print(summarize_replay(results))
+    return 0
+
+
+def _crossval(args: argparse.Namespace) -> int:
+    from sim_contribution.config import Config
+    from sim_contribution.evaluation.crossval import cross_validate, save_crossval_report, summarize_crossval
+
+    config = _saved_config(args.config) if args.config else None
+    if args.logdir is not None:
+        from sim_contribution.log.loader import load_season_log, load_true_params_if_present
+
+        season_dir = os.path.abspath(args.logdir)
+        config = config or _saved_config(season_dir)
+        season_log = load_season_log(season_dir)
+        true_params = load_true_params_if_present(season_dir)
+    else:
+        from sim_contribution.evaluation.runner import run_phase_a
+
+        config = config or Config()
+        season_log, true_params = run_phase_a(args.seed, config)
+
+    results = cross_validate(season_log, config, _strategy_names(args.strategies), seed=args.seed, true_params=true_params)
+    save_crossval_report(results, os.path.abspath(args.outdir))
+    print(summarize_crossval(results))
+    return 0
+
+
+def _shards(args: argparse.Namespace) -> int:
+    import json
+
+    from sim_contribution.sweep import shards
+
+    root = os.path.abspath(args.root)
+    if args.shards_command == "init":
+        from sim_contribution.sweep.grid import grid_points, parse_grid
+        from sim_contribution.sweep.runner import parse_seeds
+
+        plan = shards.init_shards(
+            root,
+            parse_seeds(args.seeds),
+            grid_points(parse_grid(args.grid)),
+            _strategy_names(args.strategies),
+            shard_size=args.shard_size,
+            lease_seconds=args.lease,
+        )
+        print(f"{plan.n_shards} shards ({plan.n_units} seasons) in {root}")
+    elif args.shards_command == "work":
+        import socket
+
+        from sim_contribution.sweep.metrics import SweepMetrics
+
+        worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        metrics = SweepMetrics(worker=worker_id)
+        with _metrics_exporter(args, metrics):
+            completed = shards.run_worker(
+                root,
+                worker_id=worker_id,
+                max_shards=args.max_shards,
+                poll_seconds=args.poll,
+                wait=not args.no_wait,
+                metrics=metrics,
+            )
+        print(f"completed {len(completed)} shard(s)")
+    elif args.shards_command == "status":
+        print(json.dumps(shards.shard_status(root).to_dict()))
+    else:
+        print(shards.merge_shards(root))
+    return 0
+
+
+def _archive_filter(args: argparse.Namespace):
+    from sim_contribution.log.archive import ArchiveFilter
+
+    seed_range, seeds = None, None
+    if args.seeds and ":" in args.seeds:
+        start, stop = args.seeds.split(":", 1)
+        seed_range = (int(start), int(stop))
+    elif args.seeds:
+        seeds = tuple(int(part) for part in args.seeds.split(",") if part.strip())
+
+    def ints(spec: Optional[str]):
+        return tuple(int(part) for part in spec.split(",") if part.strip()) if spec else None
+
+    return ArchiveFilter(
+        seed_range=seed_range,
+        seeds=seeds,
+        config_hashes=ints(args.config_hashes),
+        strategies=tuple(_strategy_names(args.strategies)) if args.strategies else None,
+        sizes=ints(args.sizes),
+    )
+
+
+def _archive(args: argparse.Namespace) -> int:
+    import json
+
+    from sim_contribution.log.archive import SeasonArchive
+
+    archive = SeasonArchive(os.path.abspath(args.root))
+    if args.archive_command == "info":
+        metas = [meta for _, meta in archive.chunks]
+        info = {
+            "chunks": len(metas),
+            "rows": archive.rows,
+            "strategies": archive.strategies(),
+            "seed_min": min((meta["seed_min"] for meta in metas), default=None),
+            "seed_max": max((meta["seed_max"] for meta in metas), default=None),
+            "config_hashes": sorted({h for meta in metas for h in meta["config_hashes"]}),
+        }
+        print(json.dumps(info))
+        return 0
+
+    from sim_contribution.evaluation.archive_reports import group_rows, group_team_stats, save_group_report
+
+    by = [key.strip() for key in args.by.split(",") if key.strip()]
+    groups = group_team_stats(archive, by, _archive_filter(args), batch_rows=args.batch_rows)
+    rows = group_rows(groups, by)
+    save_group_report(rows, os.path.abspath(args.out))
+    print(f"{len(rows)} group(s) written to {os.path.abspath(args.out)}")
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from sim_contribution.config import Config
+    from sim_contribution.service.server import ProposalServer
+    from sim_contribution.service.state import LeagueState
+
+    config = _saved_config(args.config) if args.config else None
+    if args.logdir is not None:
+        from sim_contribution.log.loader import load_season_log
+
+        season_dir = os.path.abspath(args.logdir)
+        config = config or _saved_config(season_dir)
+        season_log = load_season_log(season_dir)
+    else:
+        from sim_contribution.evaluation.runner import run_phase_a
+
+        config = config or Config()
+        season_log, _ = run_phase_a(args.seed, config)
+
+    server = ProposalServer(LeagueState(season_log, config), max_concurrent=args.max_concurrent)
+    path = os.path.abspath(args.socket) if args.socket else None
+    try:
+        asyncio.run(
+            server.serve(
+                path=path,
+                host=args.host,
+                port=args.port,
+                ready=lambda address: print(f"listening on {address}", file=sys.stderr, flush=True),
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _tune(args: argparse.Namespace) -> int:
+    from sim_contribution.config import Config
+    from sim_contribution.sweep.grid import grid_points, parse_grid
+    from sim_contribution.sweep.runner import parse_seeds
+    from sim_contribution.sweep.tuner import save_tuning_report, summarize_tuning, tune
+
+    result = tune(
+        args.strategy,
+        grid_points(parse_grid(args.grid)),
+        parse_seeds(args.seeds),
+        _saved_config(args.config) if args.config else Config(),
+        min_seasons=args.min_seasons,
+        eta=args.eta,
+        workers=args.workers,
+    )
+    save_tuning_report(result, os.path.abspath(args.outdir))
+    print(summarize_tuning(result))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sim-contribution")
+    commands = parser.add_subparsers(dest="command", required=True)
+    strategies_help = "comma-separated registered strategy names (default: random,greedy_interaction,lexcel_weber)"
+
+    run = commands.add_parser("run", help="simulate one season and write its outputs")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--outdir", type=str, default="outputs")
+    run.add_argument("--strategies", type=str, default=None, help=strategies_help)
+    _add_plot_arguments(run)
+    _add_bootstrap_argument(run)
+    _add_schedule_argument(run)
+    _add_precision_argument(run)
+    run.add_argument(
+        "--baseline-samples",
+        type=int,
+        default=0,
+        help="random partitions sampled for the strategy percentile baseline (0: skip)",
+    )
+    run.set_defaults(handler=_run)
+
+    sweep = commands.add_parser("sweep", help="simulate many seasons, writing outputs in the background")
+    sweep.add_argument("--seeds", type=str, default="0:10", help='"0:100", "1,5,9" or "42"')
+    sweep.add_argument("--outdir", type=str, default="outputs_runs")
+    sweep.add_argument("--strategies", type=str, default=None, help=strategies_help)
+    _add_plot_arguments(sweep)
+    _add_bootstrap_argument(sweep)
+    _add_schedule_argument(sweep)
+    _add_precision_argument(sweep)
+    sweep.add_argument("--writer", choices=["sync", "thread", "process"], default="thread")
+    sweep.add_argument("--writer-workers", type=int, default=1, help="processes for --writer process")
+    sweep.add_argument("--max-pending", type=int, default=4, help="reports queued before compute blocks")
+    sweep.add_argument(
+        "--crosscheck-rate",
+        type=float,
+        default=0.0,
+        help="fraction of seasons on which each fast path is re-run with its reference implementation",
+    )
+    sweep.add_argument(
+        "--crosscheck-dir", type=str, default="", help="where mismatching inputs are dumped (default: <outdir>/crosscheck)"
+    )
+    sweep.add_argument("--archive", type=str, default="", help="also append every season to this season archive")
+    sweep.add_argument("--archive-chunk-rows", type=int, default=1 << 20, help="team records per archive chunk")
+    _add_metrics_arguments(sweep)
+    sweep.set_defaults(handler=_sweep)
+
+    replay = commands.add_parser("replay", help="re-run strategies on saved Phase A logs")
+    replay.add_argument("--logdir", type=str, required=True, help="directory searched for phase_a_log.json")
+    replay.add_argument("--strategies", type=str, default=None, help=strategies_help)
+    replay.add_argument("--seed", type=int, default=0)
+    replay.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    replay.add_argument("--no-evaluate", action="store_true", help="skip Phase B even if true_params.json exists")
+    replay.add_argument("--out", type=str, default="replay_results.csv")
+    _add_config_argument(replay, "each season's own config.json")
+    replay.set_defaults(handler=_replay)
+
+    crossval = commands.add_parser("crossval", help="leave-one-match-out stability of strategy decisions")
+    crossval.add_argument("--seed", type=int, default=42, help="Phase A seed (without --logdir) and strategy seed")
+    crossval.add_argument("--logdir", type=str, default=None, help="saved season directory instead of simulating")
+    crossval.add_argument("--strategies", type=str, default=None, help=strategies_help)
+    crossval.add_argument("--outdir", type=str, default="outputs_crossval")
+    _add_config_argument(crossval, "the --logdir season's config.json, else the defaults")
+    crossval.set_defaults(handler=_crossval)
+
+    sharded = commands.add_parser("shards", help="sweep split into shards claimed through a shared directory")
+    shard_commands = sharded.add_subparsers(dest="shards_command", required=True)
+    init = shard_commands.add_parser("init", help="create the shard queue")
+    init.add_argument("--seeds", type=str, default="0:10", help='"0:100", "1,5,9" or "42"')
+    init.add_argument(
+        "--grid", type=str, action="append", default=[], help="Config field=v1,v2,... (repeatable; cartesian product)"
+    )
+    init.add_argument("--strategies", type=str, default=None, help=strategies_help)
+    init.add_argument("--shard-size", type=int, default=10, help="seasons per shard")
+    init.add_argument("--lease", type=float, default=600.0, help="seconds before a silent worker's shard is reclaimed")
+    work = shard_commands.add_parser("work", help="claim and run shards until none are left")
+    work.add_argument("--worker-id", type=str, default=None)
+    work.add_argument("--max-shards", type=int, default=None)
+    work.add_argument("--poll", type=float, default=5.0, help="seconds between checks while other workers hold shards")
+    work.add_argument("--no-wait", action="store_true", help="exit when nothing is left to claim")
+    _add_metrics_arguments(work)
+    shard_commands.add_parser("status", help="print shard counts")
+    shard_commands.add_parser("merge", help="write results.jsonl and summary.csv from finished shards")
+    for sub in shard_commands.choices.values():
+        sub.add_argument("--root", type=str, required=True, help="shared directory of the queue")
+    sharded.set_defaults(handler=_shards)
+
+    archive = commands.add_parser("archive", help="bounded-memory reports over a season archive")
+    archive_commands = archive.add_subparsers(dest="archive_command", required=True)
+    archive_commands.add_parser("info", help="print chunk and row counts, strategies, seed range, config hashes")
+    report = archive_commands.add_parser("report", help="group-by statistics of archived team records (CSV)")
+    report.add_argument(
+        "--by", type=str, default="strategy,size", help="comma-separated keys: config_hash, seed, strategy, size, coalition"
+    )
+    report.add_argument("--seeds", type=str, default="", help='"0:100", "1,5,9" or "42" (default: all)')
+    report.add_argument("--config-hashes", type=str, default="", help="comma-separated config hashes (default: all)")
+    report.add_argument(
+        "--strategies", type=str, default="", help='comma-separated strategy names, "phase_a" for Phase A teams'
+    )
+    report.add_argument("--sizes", type=str, default="", help="comma-separated team sizes (default: all)")
+    report.add_argument("--batch-rows", type=int, default=1 << 18, help="rows read per batch (bounds memory)")
+    report.add_argument("--out", type=str, default="archive_report.csv")
+    for sub in archive_commands.choices.values():
+        sub.add_argument("--root", type=str, required=True, help="archive directory")
+    archive.set_defaults(handler=_archive)
+
+    serve = commands.add_parser("serve", help="keep a league log and its indices resident and answer proposal requests")
+    serve.add_argument("--seed", type=int, default=42, help="Phase A seed of the initial log (without --logdir)")
+    serve.add_argument("--logdir", type=str, default=None, help="saved season directory to start from")
+    serve.add_argument("--socket", type=str, default=None, help="Unix socket path (default: TCP on --host/--port)")
+    serve.add_argument("--host", type=str, default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--max-concurrent", type=int, default=4, help="requests processed at once")
+    _add_config_argument(serve, "the --logdir season's config.json, else the defaults")
+    serve.set_defaults(handler=_serve)
+
+    tuner = commands.add_parser("tune", help="successive-halving search over strategy knobs on shared Phase A seasons")
+    tuner.add_argument("--strategy", type=str, required=True, help="registered strategy name")
+    tuner.add_argument(
+        "--grid",
+        type=str,
+        action="append",
+        default=[],
+        help='strategy Config field=v1,v2,... (repeatable; tuples as "3/2/1")',
+    )
+    tuner.add_argument("--seeds", type=str, default="0:27", help="seasons available to the last rung")
+    tuner.add_argument("--min-seasons", type=int, default=3, help="seasons per candidate in the first rung")
+    tuner.add_argument("--eta", type=int, default=3, help="keep 1/eta of the candidates per rung, eta times more seasons")
+    tuner.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    tuner.add_argument("--outdir", type=str, default="outputs_tune")
+    _add_config_argument(tuner, "the defaults; the grid overrides strategy fields on top")
+    tuner.set_defaults(handler=_tune)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
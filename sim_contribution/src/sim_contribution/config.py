@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from typing import Tuple, Dict
 
+# Config.precision values (precision.py); here so the CLI can list them without NumPy
+PRECISION_MODES = ("float64", "float32")
+
 
 @dataclass(frozen=True)
 class Config:
@@ -43,5 +46,65 @@ class Config:
     pair_profile_prior: str = "zero"
     pair_profile_prior_strength: float = 0.0
 
+    # Random streams of Phase A (rng.py): "named" (independent params/schedule/noise streams) or "shared"
+    rng_streams: str = "named"
+
+    # Storage precision (precision.py): "float64", or "float32" arrays with int16/int32 member ids
+    precision: str = "float64"
+
     # Schedule search
     schedule_candidates: int = 200
+    # >= 0: schedule stream seeded independently of the season seed (one schedule for every season)
+    schedule_seed: int = -1
+    # Directory of precomputed schedules (schedule/library.py); "" disables
+    schedule_library: str = ""
+    # "fixed": all Phase A partitions up front; "online": chosen after each match (schedule/online.py)
+    schedule_mode: str = "fixed"
+    online_decision_seconds: float = 0.05
+    online_candidates: int = 200
+    online_uncertainty_weight: float = 1.0
+
+    # Maximum-weight pairing (strategies/max_weight_pairing.py)
+    # Pair weights: "profile" (pair rank counts) or "interaction" (scores of the coalitions holding the pair)
+    matching_pair_weights: str = "profile"
+    # "exact" (blossom), "greedy" (greedy + augmentations) or "auto" (exact up to matching_exact_max_players
+    # and matching_exact_max_distinct_weights distinct positive edge weights; see max_weight_pairing.py)
+    matching_mode: str = "auto"
+    matching_exact_max_players: int = 500
+    matching_exact_max_distinct_weights: int = 10000
+    matching_augment_rounds: int = 10
+
+    # Local search refinement (strategies/local_search.py)
+    local_search_max_rounds: int = 20
+
+    # Phase A index builders (indices/partials.py): > 1 maps chunks of index_chunk_teams rows over a process pool
+    index_workers: int = 1
+    index_chunk_teams: int = 1 << 18
+
+    # Bootstrap confidence intervals of Phase A indices (indices/bootstrap.py); 0 disables
+    bootstrap_samples: int = 0
+    bootstrap_unit: str = "match"
+    bootstrap_level: float = 0.95
+    bootstrap_seed: int = 0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["g_map"] = {str(size): float(value) for size, value in self.g_map.items()}
+        data["rank_thresholds"] = [list(item) for item in self.rank_thresholds]
+        data["greedy_size_priority"] = list(self.greedy_size_priority)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Config":
+        """Fields missing from `data` keep their defaults; unknown fields are an error."""
+        unknown = sorted(set(data) - {f.name for f in fields(cls)})
+        if unknown:
+            raise ValueError(f"Unknown Config fields: {unknown}")
+        values = dict(data)
+        if "g_map" in values:
+            values["g_map"] = {int(size): float(value) for size, value in values["g_map"].items()}
+        if "rank_thresholds" in values:
+            values["rank_thresholds"] = tuple((str(label), float(cutoff)) for label, cutoff in values["rank_thresholds"])
+        if "greedy_size_priority" in values:
+            values["greedy_size_priority"] = tuple(int(size) for size in values["greedy_size_priority"])
+        return cls(**values)
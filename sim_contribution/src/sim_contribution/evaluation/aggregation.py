@@ -0,0 +1,426 @@
+"""Bounded-memory aggregation of sweep outcomes.
+
+A `SweepAggregate` consumes one season at a time (its `StrategyResult`s or
+the rows of `StrategyResult.summary_row`) and keeps, per strategy:
+
+- Welford running mean / variance / min / max of Σy and Σv_true,
+- a relative-error quantile sketch (DDSketch) of Σy,
+- the summed rank histogram,
+
+and, per ordered strategy pair, running statistics of the per-season
+difference Σy(a) - Σy(b) with win / loss / tie counts. Memory is
+O(strategies² + sketch buckets), independent of the number of seasons.
+
+Aggregates built on different workers or shards combine with `merge`:
+counts, histograms and sketch buckets add exactly; means and variances use
+the pairwise update of Chan et al., equal to a single pass up to float
+rounding. Aggregates round-trip through `to_dict` / `from_dict` (JSON).
+"""
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from sim_contribution.evaluation.types import StrategyResult
+from sim_contribution.observation.ranking import RANK_ORDER
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MAX_BUCKETS = 2048
+REPORT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+@dataclass
+class RunningStats:
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    @property
+    def stderr(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1) / self.count) if self.count > 1 else math.nan
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        return cls(
+            count=int(data["count"]),
+            mean=float(data["mean"]),
+            m2=float(data["m2"]),
+            min=float(data["min"]),
+            max=float(data["max"]),
+        )
+
+
+class QuantileSketch:
+    """DDSketch: log-spaced buckets with relative accuracy `alpha`.
+
+    Positive and negative values have separate stores; when a store exceeds
+    `max_buckets` its lowest-magnitude buckets are collapsed, which only
+    affects quantiles near zero. Merging adds bucket counts, so a merged
+    sketch equals the sketch of the concatenated data.
+    """
+
+    def __init__(self, alpha: float = SKETCH_RELATIVE_ACCURACY, max_buckets: int = SKETCH_MAX_BUCKETS) -> None:
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self.gamma = (1.0 + alpha) / (1.0 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _key(self, magnitude: float) -> int:
+        return int(math.ceil(math.log(magnitude) / self._log_gamma))
+
+    def _value(self, key: int) -> float:
+        return 2.0 * self.gamma**key / (self.gamma + 1.0)
+
+    def _collapse(self, store: Dict[int, int]) -> None:
+        if len(store) <= self.max_buckets:
+            return
+        keys = sorted(store)
+        excess = keys[: len(keys) - self.max_buckets + 1]
+        target = keys[len(keys) - self.max_buckets]
+        store[target] = store.get(target, 0) + sum(store.pop(k) for k in excess if k != target)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value > 0.0:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + 1
+            self._collapse(self.positive)
+        elif value < 0.0:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + 1
+            self._collapse(self.negative)
+        else:
+            self.zeros += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + n
+        for key, n in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self._collapse(self.positive)
+        self._collapse(self.negative)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "max_buckets": self.max_buckets,
+            "positive": {str(k): n for k, n in self.positive.items()},
+            "negative": {str(k): n for k, n in self.negative.items()},
+            "zeros": self.zeros,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(alpha=float(data["alpha"]), max_buckets=int(data["max_buckets"]))
+        sketch.positive = {int(k): int(n) for k, n in data["positive"].items()}
+        sketch.negative = {int(k): int(n) for k, n in data["negative"].items()}
+        sketch.zeros = int(data["zeros"])
+        sketch.count = int(data["count"])
+        return sketch
+
+
+@dataclass
+class StrategyAggregate:
+    total_y: RunningStats = field(default_factory=RunningStats)
+    total_v_true: RunningStats = field(default_factory=RunningStats)
+    total_y_sketch: QuantileSketch = field(default_factory=QuantileSketch)
+    rank_counts: Dict[str, int] = field(default_factory=lambda: {r: 0 for r in RANK_ORDER})
+
+    def add(self, total_y: float, total_v_true: float, rank_counts: Mapping[str, int]) -> None:
+        self.total_y.add(total_y)
+        self.total_v_true.add(total_v_true)
+        self.total_y_sketch.add(total_y)
+        for rank, count in rank_counts.items():
+            self.rank_counts[rank] = self.rank_counts.get(rank, 0) + int(count)
+
+    def merge(self, other: "StrategyAggregate") -> None:
+        self.total_y.merge(other.total_y)
+        self.total_v_true.merge(other.total_v_true)
+        self.total_y_sketch.merge(other.total_y_sketch)
+        for rank, count in other.rank_counts.items():
+            self.rank_counts[rank] = self.rank_counts.get(rank, 0) + count
+
+    def to_dict(self) -> dict:
+        return {
+            "total_y": self.total_y.to_dict(),
+            "total_v_true": self.total_v_true.to_dict(),
+            "total_y_sketch": self.total_y_sketch.to_dict(),
+            "rank_counts": dict(self.rank_counts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StrategyAggregate":
+        return cls(
+            total_y=RunningStats.from_dict(data["total_y"]),
+            total_v_true=RunningStats.from_dict(data["total_v_true"]),
+            total_y_sketch=QuantileSketch.from_dict(data["total_y_sketch"]),
+            rank_counts={str(k): int(v) for k, v in data["rank_counts"].items()},
+        )
+
+
+@dataclass
+class PairedDifference:
+    """Per-season Σy(a) - Σy(b) and Σv_true(a) - Σv_true(b)."""
+
+    total_y: RunningStats = field(default_factory=RunningStats)
+    total_v_true: RunningStats = field(default_factory=RunningStats)
+    wins: int = 0
+    losses: int = 0
+    ties: int = 0
+
+    def add(self, diff_y: float, diff_v_true: float) -> None:
+        self.total_y.add(diff_y)
+        self.total_v_true.add(diff_v_true)
+        if diff_y > 0:
+            self.wins += 1
+        elif diff_y < 0:
+            self.losses += 1
+        else:
+            self.ties += 1
+
+    def merge(self, other: "PairedDifference") -> None:
+        self.total_y.merge(other.total_y)
+        self.total_v_true.merge(other.total_v_true)
+        self.wins += other.wins
+        self.losses += other.losses
+        self.ties += other.ties
+
+    def to_dict(self) -> dict:
+        return {
+            "total_y": self.total_y.to_dict(),
+            "total_v_true": self.total_v_true.to_dict(),
+            "wins": self.wins,
+            "losses": self.losses,
+            "ties": self.ties,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PairedDifference":
+        return cls(
+            total_y=RunningStats.from_dict(data["total_y"]),
+            total_v_true=RunningStats.from_dict(data["total_v_true"]),
+            wins=int(data["wins"]),
+            losses=int(data["losses"]),
+            ties=int(data["ties"]),
+        )
+
+
+def _pair_key(a: str, b: str) -> str:
+    return f"{a}|{b}"
+
+
+class SweepAggregate:
+    """Streaming aggregate over seasons; strategies keep their first-seen order."""
+
+    def __init__(self) -> None:
+        self.seasons = 0
+        self.strategies: Dict[str, StrategyAggregate] = {}
+        self.pairs: Dict[str, PairedDifference] = {}
+
+    def _strategy(self, name: str) -> StrategyAggregate:
+        if name not in self.strategies:
+            self.strategies[name] = StrategyAggregate()
+        return self.strategies[name]
+
+    def add_season_totals(self, totals: Sequence[Tuple[str, float, float, Mapping[str, int]]]) -> None:
+        """`totals`: (strategy, Σy, Σv_true, rank counts) of every strategy in one season."""
+        self.seasons += 1
+        for name, total_y, total_v, ranks in totals:
+            self._strategy(name).add(total_y, total_v, ranks)
+        for i, (a, y_a, v_a, _) in enumerate(totals):
+            for b, y_b, v_b, _ in totals[i + 1 :]:
+                key = _pair_key(a, b)
+                if key not in self.pairs:
+                    self.pairs[key] = PairedDifference()
+                self.pairs[key].add(y_a - y_b, v_a - v_b)
+
+    def add_season(self, results: Sequence[StrategyResult]) -> None:
+        self.add_season_totals(
+            [
+                (r.name, float(r.total_y), float(sum(t.v_true for t in r.teams)), r.rank_counts)
+                for r in results
+            ]
+        )
+
+    def add_rows(self, rows: Sequence[Mapping[str, object]]) -> None:
+        """Rows of one season in `StrategyResult.summary_row` form."""
+        self.add_season_totals(
+            [
+                (
+                    str(row["strategy"]),
+                    float(row["total_y"]),  # type: ignore[arg-type]
+                    float(row["total_v_true"]),  # type: ignore[arg-type]
+                    {r: int(row.get(f"rank_{r}", 0)) for r in RANK_ORDER},  # type: ignore[call-overload]
+                )
+                for row in rows
+            ]
+        )
+
+    def merge(self, other: "SweepAggregate") -> None:
+        self.seasons += other.seasons
+        for name, agg in other.strategies.items():
+            self._strategy(name).merge(agg)
+        for key, diff in other.pairs.items():
+            if key not in self.pairs:
+                self.pairs[key] = PairedDifference()
+            self.pairs[key].merge(diff)
+
+    def to_dict(self) -> dict:
+        return {
+            "seasons": self.seasons,
+            "strategies": {name: agg.to_dict() for name, agg in self.strategies.items()},
+            "pairs": {key: diff.to_dict() for key, diff in self.pairs.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SweepAggregate":
+        aggregate = cls()
+        aggregate.seasons = int(data["seasons"])
+        aggregate.strategies = {name: StrategyAggregate.from_dict(v) for name, v in data["strategies"].items()}
+        aggregate.pairs = {key: PairedDifference.from_dict(v) for key, v in data["pairs"].items()}
+        return aggregate
+
+    def strategy_rows(self, quantiles: Sequence[float] = REPORT_QUANTILES) -> List[Dict[str, object]]:
+        rows: List[Dict[str, object]] = []
+        for name, agg in self.strategies.items():
+            row: Dict[str, object] = {
+                "strategy": name,
+                "n": agg.total_y.count,
+                "mean_total_y": agg.total_y.mean,
+                "std_total_y": agg.total_y.std,
+                "min_total_y": agg.total_y.min,
+                "max_total_y": agg.total_y.max,
+            }
+            for q in quantiles:
+                row[f"q{round(q * 100):02d}_total_y"] = agg.total_y_sketch.quantile(q)
+            row["mean_total_v_true"] = agg.total_v_true.mean
+            row["std_total_v_true"] = agg.total_v_true.std
+            for rank in RANK_ORDER:
+                row[f"rank_{rank}"] = agg.rank_counts.get(rank, 0)
+            rows.append(row)
+        return rows
+
+    def pair_rows(self) -> List[Dict[str, object]]:
+        rows: List[Dict[str, object]] = []
+        for key, diff in self.pairs.items():
+            a, b = key.split("|", 1)
+            rows.append(
+                {
+                    "strategy_a": a,
+                    "strategy_b": b,
+                    "n": diff.total_y.count,
+                    "mean_diff_total_y": diff.total_y.mean,
+                    "std_diff_total_y": diff.total_y.std,
+                    "stderr_diff_total_y": diff.total_y.stderr,
+                    "mean_diff_total_v_true": diff.total_v_true.mean,
+                    "stderr_diff_total_v_true": diff.total_v_true.stderr,
+                    "wins_a": diff.wins,
+                    "wins_b": diff.losses,
+                    "ties": diff.ties,
+                }
+            )
+        return rows
+
+
+def aggregate_seasons(seasons: Iterable[Sequence[StrategyResult]]) -> SweepAggregate:
+    aggregate = SweepAggregate()
+    for results in seasons:
+        aggregate.add_season(results)
+    return aggregate
+
+
+def summarize_aggregate(aggregate: SweepAggregate) -> str:
+    lines = [f"{aggregate.seasons} seasons"]
+    for row in aggregate.strategy_rows():
+        lines.append(
+            f"  {row['strategy']}: mean_total_y={row['mean_total_y']:.3f} (std {row['std_total_y']:.3f}, "
+            f"median~{row['q50_total_y']:.3f}) mean_total_v_true={row['mean_total_v_true']:.3f}"
+        )
+    for row in aggregate.pair_rows():
+        lines.append(
+            f"  {row['strategy_a']} - {row['strategy_b']}: {row['mean_diff_total_y']:+.3f} "
+            f"± {row['stderr_diff_total_y']:.3f} (wins {row['wins_a']}/{row['wins_b']}, ties {row['ties']})"
+        )
+    return "\n".join(lines)
+
+
+def save_aggregate_report(aggregate: SweepAggregate, outdir: str, prefix: str = "aggregate") -> None:
+    """`<prefix>.json` (mergeable state), `<prefix>_strategies.csv`, `<prefix>_pairs.csv`."""
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, f"{prefix}.json"), "w", encoding="utf-8") as f:
+        json.dump(aggregate.to_dict(), f, indent=2)
+    for suffix, rows in (("strategies", aggregate.strategy_rows()), ("pairs", aggregate.pair_rows())):
+        path = os.path.join(outdir, f"{prefix}_{suffix}.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if not rows:
+                continue
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
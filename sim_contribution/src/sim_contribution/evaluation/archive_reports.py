@@ -0,0 +1,174 @@
+"""Bounded-memory reports over a season archive (`log/archive.py`).
+
+`group_team_stats` is a streaming group-by over archived team records: per
+group of `GROUP_KEYS` values it keeps `RunningStats` of y and v_true and the
+rank histogram, merging each scanned batch's per-group statistics (Chan et
+al.), so memory is O(groups) whatever the archive size. `archive_index_partial`
+feeds the Phase A rows batch by batch into the mergeable index partials of
+`indices/partials.py` (pooled over the selected seasons; use
+`SeasonArchive.iter_seasons` for per-season indices or strategy replay).
+"""
+from __future__ import annotations
+
+import csv
+import os
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sim_contribution.evaluation.aggregation import RunningStats
+from sim_contribution.indices.partials import (
+    IndexPartial,
+    merge_partials,
+    pack_coalitions,
+    partial_from_arrays,
+    unpack_coalitions,
+)
+from sim_contribution.log.archive import DEFAULT_BATCH_ROWS, PHASE_A_STRATEGY, ArchiveFilter, SeasonArchive
+from sim_contribution.observation.ranking import RANK_ORDER
+
+GROUP_KEYS = ("config_hash", "seed", "strategy", "size", "coalition")
+
+
+@dataclass
+class TeamGroupStats:
+    y: RunningStats = field(default_factory=RunningStats)
+    v_true: RunningStats = field(default_factory=RunningStats)
+    rank_counts: np.ndarray = field(default_factory=lambda: np.zeros(len(RANK_ORDER), dtype=np.int64))
+
+    def merge(self, other: "TeamGroupStats") -> None:
+        self.y.merge(other.y)
+        self.v_true.merge(other.v_true)
+        self.rank_counts += other.rank_counts
+
+
+def _grouped_stats(values: np.ndarray, inverse: np.ndarray, n_groups: int) -> List[RunningStats]:
+    counts = np.bincount(inverse, minlength=n_groups)
+    means = np.bincount(inverse, weights=values, minlength=n_groups) / counts
+    m2 = np.bincount(inverse, weights=(values - means[inverse]) ** 2, minlength=n_groups)
+    lows = np.full(n_groups, np.inf)
+    highs = np.full(n_groups, -np.inf)
+    np.minimum.at(lows, inverse, values)
+    np.maximum.at(highs, inverse, values)
+    return [
+        RunningStats(count=int(c), mean=float(m), m2=float(s), min=float(lo), max=float(hi))
+        for c, m, s, lo, hi in zip(counts.tolist(), means.tolist(), m2.tolist(), lows.tolist(), highs.tolist())
+    ]
+
+
+def group_team_stats(
+    archive: SeasonArchive,
+    by: Sequence[str] = ("strategy", "size"),
+    where: ArchiveFilter = ArchiveFilter(),
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> Dict[Tuple, TeamGroupStats]:
+    """Statistics of the selected team records per distinct `by` key.
+
+    Keys hold ints, except "strategy" (its name) and "coalition" (sorted member tuple).
+    """
+    unknown = [key for key in by if key not in GROUP_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown group keys: {unknown} (expected some of {GROUP_KEYS})")
+    n_players, k_max = archive.n_players, archive.k_max
+    columns = {"y_obs", "v_true", "rank"} | {("members" if key == "coalition" else key) for key in by}
+    strategy_ids: Dict[str, int] = {}
+    groups: Dict[Tuple, TeamGroupStats] = {}
+
+    for batch in archive.scan(where, sorted(columns), batch_rows):
+        parts = []
+        for key in by:
+            if key == "strategy":
+                ids = np.array([strategy_ids.setdefault(name, len(strategy_ids)) for name in batch.strategies])
+                parts.append(ids[batch.columns["strategy"]])
+            elif key == "coalition":
+                members = np.full((batch.rows, k_max), -1, dtype=np.int64)
+                members[:, : batch.columns["members"].shape[1]] = batch.columns["members"]
+                parts.append(pack_coalitions(members, n_players))
+            else:
+                parts.append(batch.columns[key])
+        keys = np.stack(parts, axis=1).astype(np.int64) if parts else np.zeros((batch.rows, 0), dtype=np.int64)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        y = _grouped_stats(batch.columns["y_obs"], inverse, unique.shape[0])
+        v_true = _grouped_stats(batch.columns["v_true"], inverse, unique.shape[0])
+        ranks = np.bincount(
+            inverse * len(RANK_ORDER) + batch.columns["rank"], minlength=unique.shape[0] * len(RANK_ORDER)
+        ).reshape(-1, len(RANK_ORDER))
+        for g, key in enumerate(map(tuple, unique.tolist())):
+            stats = TeamGroupStats(y=y[g], v_true=v_true[g], rank_counts=ranks[g].astype(np.int64))
+            if key in groups:
+                groups[key].merge(stats)
+            else:
+                groups[key] = stats
+
+    names = sorted(strategy_ids, key=strategy_ids.get)
+    decoded: Dict[Tuple, TeamGroupStats] = {}
+    for key, stats in groups.items():
+        values = []
+        for name, value in zip(by, key):
+            if name == "strategy":
+                values.append(names[value])
+            elif name == "coalition":
+                members = unpack_coalitions(np.array([value]), n_players, k_max)[0].tolist()
+                values.append(tuple(m for m in members if m >= 0))
+            else:
+                values.append(value)
+        decoded[tuple(values)] = stats
+    return decoded
+
+
+def group_rows(groups: Dict[Tuple, TeamGroupStats], by: Sequence[str]) -> List[Dict[str, object]]:
+    rows = []
+    for key in sorted(groups):
+        stats = groups[key]
+        row: Dict[str, object] = {}
+        for name, value in zip(by, key):
+            row[name] = ",".join(map(str, value)) if name == "coalition" else value
+        row.update(
+            {
+                "teams": stats.y.count,
+                "mean_y": stats.y.mean,
+                "std_y": stats.y.std,
+                "min_y": stats.y.min,
+                "max_y": stats.y.max,
+                "mean_v_true": stats.v_true.mean,
+                "std_v_true": stats.v_true.std,
+            }
+        )
+        for rank, count in zip(RANK_ORDER, stats.rank_counts.tolist()):
+            row[f"rank_{rank}"] = count
+        rows.append(row)
+    return rows
+
+
+def save_group_report(rows: Sequence[Dict[str, object]], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if not rows:
+            return
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def archive_index_partial(
+    archive: SeasonArchive,
+    where: ArchiveFilter = ArchiveFilter(),
+    n_players: Optional[int] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> IndexPartial:
+    """Index partial of the selected Phase A rows, in archive order (first rows count across seasons)."""
+    where = replace(where, strategies=(PHASE_A_STRATEGY,))
+    n_players = archive.n_players if n_players is None else n_players
+    merged: Optional[IndexPartial] = None
+    offset = 0
+    for batch in archive.scan(where, ("members", "y_obs", "rank"), batch_rows):
+        partial = partial_from_arrays(
+            batch.columns["members"], batch.columns["y_obs"], batch.columns["rank"], n_players, archive.k_max, offset
+        )
+        offset += batch.rows
+        merged = partial if merged is None else merge_partials([merged, partial])
+    if merged is None:
+        raise ValueError("No Phase A rows match the filter")
+    return merged
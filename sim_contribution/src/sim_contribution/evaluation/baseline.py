@@ -0,0 +1,182 @@
+"""Random-partition baseline distribution of Σv_true.
+
+Samples many random feasible partitions with the size rules of
+`strategies.random_partition` (uniform player order; each team size drawn
+uniformly among the sizes that keep the remainder feasible), evaluates their
+Σv_true in batch and locates each strategy's partition in that distribution.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.types import StrategyResult
+from sim_contribution.players.types import TrueParams
+from sim_contribution.production.batch import batch_team_values
+
+BASELINE_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+@dataclass(frozen=True)
+class StrategyPercentile:
+    name: str
+    total_v_true: float
+    percentile: float
+    gap_to_best: float
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "total_v_true": self.total_v_true,
+            "percentile": self.percentile,
+            "gap_to_best": self.gap_to_best,
+        }
+
+
+@dataclass(frozen=True)
+class BaselineReport:
+    n_samples: int
+    mean: float
+    std: float
+    best: float
+    quantiles: Dict[float, float]
+    strategies: List[StrategyPercentile]
+
+    def to_dict(self) -> dict:
+        return {
+            "n_samples": self.n_samples,
+            "mean": self.mean,
+            "std": self.std,
+            "best": self.best,
+            "quantiles": {str(q): v for q, v in self.quantiles.items()},
+            "strategies": [s.to_dict() for s in self.strategies],
+        }
+
+
+def sample_size_patterns(n_players: int, n_samples: int, rng: np.random.Generator, config: Config) -> np.ndarray:
+    """Team sizes of `n_samples` random partitions, shape (n_samples, max_teams), 0-padded."""
+    lo, hi = config.team_size_min, config.team_size_max
+    max_teams = -(-n_players // max(lo, 1))
+    sizes = np.zeros((n_samples, max_teams), dtype=np.int64)
+    remaining = np.full(n_samples, n_players, dtype=np.int64)
+    candidates = np.arange(lo, hi + 1)
+
+    for step in range(max_teams):
+        active = remaining > 0
+        if not active.any():
+            break
+        last = remaining <= hi
+        left = remaining[:, None] - candidates[None, :]
+        feasible = (left == 0) | (left >= lo)
+        n_feasible = feasible.sum(axis=1)
+        pick = (rng.random(n_samples) * np.maximum(n_feasible, 1)).astype(np.int64)
+        # Index of the pick-th feasible candidate in each row.
+        chosen = np.argmax(np.cumsum(feasible, axis=1) > pick[:, None], axis=1)
+        size = np.where(n_feasible > 0, candidates[chosen], lo)
+        size = np.where(last, remaining, size)
+        size = np.where(active, np.minimum(size, remaining), 0)
+        sizes[:, step] = size
+        remaining -= size
+    return sizes
+
+
+def sample_random_partitions(
+    n_players: int, n_samples: int, rng: np.random.Generator, config: Config
+) -> np.ndarray:
+    """Random feasible partitions as a member array (n_samples, max_teams, k_max), -1 padded."""
+    sizes = sample_size_patterns(n_players, n_samples, rng, config)
+    order = np.argsort(rng.random((n_samples, n_players)), axis=1)
+
+    k_max = max(int(sizes.max(initial=0)), 1)
+    starts = np.cumsum(sizes, axis=1) - sizes
+    slot = np.arange(k_max)
+    position = starts[:, :, None] + slot[None, None, :]
+    valid = slot[None, None, :] < sizes[:, :, None]
+    rows = np.arange(n_samples)[:, None, None]
+    members = order[rows, np.where(valid, position, 0)]
+    return np.where(valid, members, -1)
+
+
+def sample_partition_totals(
+    true_params: TrueParams,
+    config: Config,
+    n_samples: int,
+    rng: np.random.Generator,
+    batch_size: int = 8192,
+) -> np.ndarray:
+    """Σv_true of `n_samples` random feasible partitions."""
+    abilities = true_params.abilities()
+    cooper = true_params.cooperativeness()
+    skills = true_params.skills()
+    affinity = np.asarray(true_params.affinity, dtype=float)
+    n_players = abilities.shape[0]
+
+    totals = np.empty(n_samples)
+    for start in range(0, n_samples, batch_size):
+        stop = min(start + batch_size, n_samples)
+        members = sample_random_partitions(n_players, stop - start, rng, config)
+        values = batch_team_values(members, abilities, cooper, skills, affinity, config)
+        totals[start:stop] = values.sum(axis=1)
+    return totals
+
+
+def percentile_of(totals: np.ndarray, value: float) -> float:
+    """Share (in %) of sampled partitions with Σv_true not above `value`."""
+    return float(100.0 * np.count_nonzero(totals <= value) / totals.size) if totals.size else float("nan")
+
+
+def random_baseline(
+    true_params: TrueParams,
+    strategy_results: Sequence[StrategyResult],
+    config: Config,
+    n_samples: int,
+    rng: np.random.Generator,
+) -> BaselineReport:
+    totals = sample_partition_totals(true_params, config, n_samples, rng)
+    best = float(totals.max())
+
+    strategies = []
+    for result in strategy_results:
+        total_v = float(sum(team.v_true for team in result.teams))
+        strategies.append(
+            StrategyPercentile(
+                name=result.name,
+                total_v_true=total_v,
+                percentile=percentile_of(totals, total_v),
+                gap_to_best=best - total_v,
+            )
+        )
+
+    return BaselineReport(
+        n_samples=int(totals.size),
+        mean=float(totals.mean()),
+        std=float(totals.std(ddof=0)),
+        best=best,
+        quantiles={q: float(np.quantile(totals, q)) for q in BASELINE_QUANTILES},
+        strategies=strategies,
+    )
+
+
+def summarize_baseline(report: BaselineReport) -> str:
+    lines = [
+        f"Random baseline ({report.n_samples} partitions): "
+        f"mean={report.mean:.3f} std={report.std:.3f} best={report.best:.3f}"
+    ]
+    for s in report.strategies:
+        lines.append(
+            f"  {s.name}: sum_v_true={s.total_v_true:.3f} "
+            f"percentile={s.percentile:.2f} gap_to_best={s.gap_to_best:.3f}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline_report(report: BaselineReport, outdir: str) -> None:
+    os.makedirs(outdir, exist_ok=True)
+    path = os.path.join(outdir, "phase_b_baseline.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report.to_dict(), f, indent=2)
@@ -0,0 +1,183 @@
+"""Phase A of many seasons at once, as arrays with a leading seasons axis.
+
+`simulate_batch` draws the parameters of S seasons in one call per array
+(`generate_true_params_batch`), evaluates every scheduled team of every season
+(`shared_team_breakdown` for a shared schedule, `batch_team_breakdown` for
+per-season ones), adds noise and computes each season's Phase A
+stats, z-scores and ranks along the seasons axis. The schedule is either
+shared, (M, T, k_max), or per season, (S, M, T, k_max); matches with fewer
+than T teams are padded with empty (-1) teams, which are masked out.
+
+The distributions are those of `run_phase_a`, but the draws are not: season s
+of a batch does not reproduce `run_phase_a(seed)` for any seed. Use
+`BatchedSeasons.columnar(s)` for the `ColumnarSeasonLog` of one season.
+With `Config.precision == "float32"` the per-team arrays are float32 and
+member ids compact integers; season stats accumulate in float64.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.runner import fixed_schedule
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.observation.ranking import assign_rank_codes
+from sim_contribution.observation.types import PhaseAStats
+from sim_contribution.players.param_generator import BatchedTrueParams, generate_true_params_batch, normal_draws
+from sim_contribution.precision import float_dtype, member_dtype
+from sim_contribution.production.batch import batch_team_breakdown, encode_schedule, shared_team_breakdown
+from sim_contribution.production.types import BREAKDOWN_KEYS
+from sim_contribution.rng import phase_a_streams
+
+
+@dataclass(frozen=True)
+class BatchedSeasons:
+    """Phase A of S seasons; team rows are (match, team slot) pairs, R = M * T."""
+
+    true_params: BatchedTrueParams
+    members: np.ndarray  # (R, k_max) shared or (S, R, k_max) per season
+    valid: np.ndarray  # (R,) or (S, R): row holds a team
+    v_true: np.ndarray  # (S, R), 0 on empty rows
+    y_obs: np.ndarray
+    z: np.ndarray
+    rank: np.ndarray  # (S, R) int8 codes into RANK_ORDER
+    breakdown: Dict[str, np.ndarray]  # BREAKDOWN_KEYS -> (S, R)
+    mean_y: np.ndarray  # (S,)
+    std_y: np.ndarray
+    n_team_slots: int
+    thresholds: tuple
+
+    @property
+    def n_seasons(self) -> int:
+        return int(self.v_true.shape[0])
+
+    def phase_a_stats(self, s: int) -> PhaseAStats:
+        return PhaseAStats(mean_y=float(self.mean_y[s]), std_y=float(self.std_y[s]), thresholds=self.thresholds)
+
+    def columnar(self, s: int) -> ColumnarSeasonLog:
+        valid = self.valid if self.valid.ndim == 1 else self.valid[s]
+        rows = np.flatnonzero(valid)
+        members = self.members if self.members.ndim == 2 else self.members[s]
+        return ColumnarSeasonLog(
+            match_id=rows // self.n_team_slots,
+            team_id=rows % self.n_team_slots,
+            members=members[rows],
+            v_true=self.v_true[s, rows],
+            y_obs=self.y_obs[s, rows],
+            z=self.z[s, rows],
+            rank=self.rank[s, rows],
+            breakdown=np.stack([self.breakdown[key][s, rows] for key in BREAKDOWN_KEYS], axis=-1),
+            phase_a_stats=self.phase_a_stats(s),
+        )
+
+
+def simulate_batch(
+    streams: Dict[str, np.random.Generator],
+    config: Config,
+    n_seasons: int,
+    schedule: np.ndarray,
+    relabel: bool = False,
+) -> BatchedSeasons:
+    """Phase A of `n_seasons` seasons; `streams` as returned by `phase_a_streams`.
+
+    With a shared schedule and `relabel`, each season plays the schedule with
+    its players relabelled by a random permutation (drawn from the schedule
+    stream); values are computed on the shared schedule with the parameters
+    permuted instead, which keeps the incidence-matrix fast path.
+    """
+    per_season = schedule.ndim == 4
+    if per_season and schedule.shape[0] != n_seasons:
+        raise ValueError(f"Per-season schedule has {schedule.shape[0]} seasons, expected {n_seasons}")
+    n_team_slots, k_max = schedule.shape[-2], schedule.shape[-1]
+    members = schedule.reshape((n_seasons, -1, k_max) if per_season else (-1, k_max))
+    valid = (members >= 0).any(axis=-1)
+
+    params = generate_true_params_batch(streams["params"], config, n_seasons)
+    if per_season:
+        parts = batch_team_breakdown(
+            members,
+            params.abilities,
+            params.cooperativeness,
+            params.skills,
+            params.affinity,
+            config,
+            per_season_members=True,
+        )
+    elif relabel:
+        n = config.n_players
+        # Slot p of the schedule is played by player labels[s, p].
+        labels = streams["schedule"].permuted(np.broadcast_to(np.arange(n), (n_seasons, n)), axis=1)
+        parts = shared_team_breakdown(
+            members,
+            np.take_along_axis(params.abilities, labels, axis=1),
+            np.take_along_axis(params.cooperativeness, labels, axis=1),
+            np.take_along_axis(params.skills, labels[:, :, None], axis=1),
+            params.affinity[np.arange(n_seasons)[:, None, None], labels[:, :, None], labels[:, None, :]],
+            config,
+        )
+        safe = np.where(members < 0, 0, members)
+        relabelled = np.take_along_axis(labels, safe.reshape(1, -1), axis=1).reshape((n_seasons,) + members.shape)
+        members = np.where(members < 0, -1, relabelled).astype(members.dtype, copy=False)
+        valid = np.broadcast_to(valid, (n_seasons, valid.size))
+    else:
+        parts = shared_team_breakdown(
+            members, params.abilities, params.cooperativeness, params.skills, params.affinity, config
+        )
+    dtype = float_dtype(config)
+    # Same summation order as `compute_team_value`.
+    v_true = parts["base"] + parts["diversity"] + parts["affinity"] + parts["cooperation"] + parts["comm_cost"]
+    v_true = v_true.astype(dtype, copy=False)
+    mask = np.broadcast_to(valid, v_true.shape)
+    noise = normal_draws(streams["noise"], 0.0, config.noise_sigma, v_true.shape, dtype)
+    y_obs = np.where(mask, v_true + noise, dtype.type(0.0))
+
+    # `compute_phase_a_stats` per season: population std, 1 when it is 0.
+    counts = mask.sum(axis=1)
+    mean_y = y_obs.sum(axis=1, dtype=np.float64) / np.maximum(counts, 1)
+    deviation = np.where(mask, y_obs - mean_y[:, None], 0.0)
+    std_y = np.sqrt((deviation**2).sum(axis=1) / np.maximum(counts, 1))
+    std_y = np.where(std_y == 0.0, 1.0, std_y)
+    z = (deviation / std_y[:, None]).astype(dtype, copy=False)
+
+    return BatchedSeasons(
+        true_params=params,
+        members=members,
+        valid=valid,
+        v_true=np.where(mask, v_true, dtype.type(0.0)),
+        y_obs=y_obs,
+        z=z,
+        rank=assign_rank_codes(z, config.rank_thresholds),
+        breakdown={key: parts[key].astype(dtype, copy=False) for key in BREAKDOWN_KEYS},
+        mean_y=mean_y,
+        std_y=std_y,
+        n_team_slots=n_team_slots,
+        thresholds=config.rank_thresholds,
+    )
+
+
+def iter_batches(
+    seed: int,
+    config: Config,
+    n_seasons: int,
+    batch_size: int = 4096,
+    schedule: Optional[np.ndarray] = None,
+    relabel: bool = False,
+) -> Iterator[BatchedSeasons]:
+    """`n_seasons` seasons in batches of at most `batch_size`.
+
+    Without `schedule`, every season shares the fixed schedule of `seed` (through
+    `config.schedule_library` when set); `relabel` relabels its players per
+    season (see `simulate_batch`).
+    """
+    if config.schedule_mode != "fixed":
+        raise ValueError("Batched seasons need a fixed schedule (schedule_mode='fixed')")
+    streams = phase_a_streams(seed, config)
+    if schedule is None:
+        schedule = encode_schedule(fixed_schedule(seed, streams["schedule"], config), dtype=member_dtype(config))
+    for start in range(0, n_seasons, batch_size):
+        size = min(batch_size, n_seasons - start)
+        batch_schedule = schedule[start : start + size] if schedule.ndim == 4 else schedule
+        yield simulate_batch(streams, config, size, batch_schedule, relabel=relabel)
@@ -0,0 +1,526 @@
+"""Fast paths registered with their reference implementations, and a sampled cross-checker.
+
+Every dual path takes `(season_log, true_params, seed, config)` and returns
+comparable results from its fast and its reference implementation:
+
+- `team_values`: `batch_team_breakdown` vs `compute_team_value` per team
+  (skipped without true parameters);
+- `phase_a_ranks`: vectorized Phase A stats, z-scores and rank codes (as in
+  `evaluation/batched.py`) vs `compute_phase_a_stats`, `z_score`, `assign_rank`;
+- `interaction_scores`, `pair_profile`: the indices from `IndexAggregates` vs
+  `compute_empirical_interaction_scores` and `compute_pair_profile` (serial
+  path, `index_workers=1`), compared exactly;
+- `index_partials`: indices merged from small-chunk `IndexPartial`s vs
+  `IndexAggregates`, compared exactly;
+- `strategy:<name>` for each of `FOLD_STRATEGIES`: the strategy on the
+  indices vs the built-in strategy on the log (same RNG seed), compared
+  exactly; this checks the index building, both sides share the kernels;
+- `scalar:greedy_interaction`, `scalar:lexcel_weber`: the built-in
+  strategy vs the scalar loops it replaced (`_reference_greedy_interaction`,
+  `_reference_lexcel_weber`: sort with shuffled ties, set-based conflicts),
+  compared exactly;
+- `incremental_deltas`: `IncrementalPartition.move_deltas`/`swap_deltas` of
+  a few sampled players (partition: the first match's teams, unseated players
+  alone) vs differences of `compute_team_value` (skipped without true
+  parameters).
+
+Floats are compared within `compare_close`'s tolerance. `team_values` and
+`incremental_deltas` also register an error bound: with
+`Config.precision == "float32"` the tolerance grows by
+`precision.team_value_error_bound` of the teams involved (zero in float64).
+
+`CrossChecker.check_season` runs each registered path on a sampled fraction
+(`rate`) of seasons; `CrossChecker.call` does the same for any one call (the
+fast result is returned). Mismatches are recorded and, with `dump_dir`, the
+inputs and both results are pickled there for replay.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import pickle
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.crossval import FOLD_STRATEGIES
+from sim_contribution.indices.aggregates import FoldIndices, IndexAggregates
+from sim_contribution.indices.empirical_interaction import compute_empirical_interaction_scores
+from sim_contribution.indices.pair_profile import compute_pair_profile, pair_from_linear_index, pair_profile_prior_vector
+from sim_contribution.indices.partials import compute_index_partials
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.observation.ranking import (
+    RANK_ORDER,
+    assign_rank,
+    assign_rank_codes,
+    compute_phase_a_stats,
+    z_score,
+)
+from sim_contribution.players.types import TrueParams
+from sim_contribution.precision import float_dtype, team_value_error_bound
+from sim_contribution.production.batch import batch_team_breakdown, encode_partition
+from sim_contribution.production.incremental import IncrementalPartition, true_value_model
+from sim_contribution.production.team_value import compute_team_value
+from sim_contribution.production.types import BREAKDOWN_KEYS
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.registry import BUILTIN_STRATEGIES
+from sim_contribution.strategies.types import StrategyFn
+
+SeasonPathFn = Callable[[SeasonLog, Optional[TrueParams], int, Config], Any]
+# (fast, reference) -> None when they agree, else a description of the first difference
+CompareFn = Callable[[Any, Any], Optional[str]]
+# The path's inputs -> absolute error bound of the fast result against the reference
+BoundFn = Callable[[SeasonLog, Optional[TrueParams], int, Config], float]
+
+COMPARE_RTOL = 1e-9
+COMPARE_ATOL = 1e-9
+
+
+def _difference(fast: Any, reference: Any, rtol: float, atol: float, path: str) -> Optional[str]:
+    if isinstance(fast, dict) and isinstance(reference, dict):
+        if fast.keys() != reference.keys():
+            missing = sorted(map(str, reference.keys() - fast.keys()))[:3]
+            extra = sorted(map(str, fast.keys() - reference.keys()))[:3]
+            return f"{path or 'result'}: keys differ (missing {missing}, extra {extra})"
+        for key in reference:
+            found = _difference(fast[key], reference[key], rtol, atol, f"{path}[{key!r}]")
+            if found is not None:
+                return found
+        return None
+    if isinstance(fast, (list, tuple)) and isinstance(reference, (list, tuple)):
+        if len(fast) != len(reference):
+            return f"{path or 'result'}: length {len(fast)} != {len(reference)}"
+        for idx, (a, b) in enumerate(zip(fast, reference)):
+            found = _difference(a, b, rtol, atol, f"{path}[{idx}]")
+            if found is not None:
+                return found
+        return None
+    if isinstance(fast, (np.ndarray, float, np.floating)) or isinstance(reference, (np.ndarray, float, np.floating)):
+        a, b = np.asarray(fast), np.asarray(reference)
+        if a.shape != b.shape:
+            return f"{path or 'result'}: shape {a.shape} != {b.shape}"
+        close = np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True) if a.dtype.kind in "fc" or b.dtype.kind in "fc" else a == b
+        if not np.all(close):
+            at = np.unravel_index(int(np.argmin(close)), a.shape) if a.ndim else ()
+            return f"{path or 'result'}{list(at) if at else ''}: {a[at]!r} != {b[at]!r}"
+        return None
+    if fast != reference:
+        return f"{path or 'result'}: {fast!r} != {reference!r}"
+    return None
+
+
+def compare_close(rtol: float = COMPARE_RTOL, atol: float = COMPARE_ATOL) -> CompareFn:
+    """Nested dicts/sequences with floats compared within tolerance, everything else exactly."""
+    return lambda fast, reference: _difference(fast, reference, rtol, atol, "")
+
+
+def compare_exact(fast: Any, reference: Any) -> Optional[str]:
+    return _difference(fast, reference, 0.0, 0.0, "")
+
+
+@dataclass(frozen=True)
+class DualPath:
+    name: str
+    fast: SeasonPathFn
+    reference: SeasonPathFn
+    compare: CompareFn
+    bound: Optional[BoundFn] = None
+
+    def comparator(self, args: tuple) -> CompareFn:
+        if self.bound is None:
+            return self.compare
+        return compare_close(atol=COMPARE_ATOL + self.bound(*args))
+
+
+DUAL_PATHS: Dict[str, DualPath] = {}
+
+
+def register_dual_path(
+    name: str,
+    fast: SeasonPathFn,
+    reference: SeasonPathFn,
+    compare: Optional[CompareFn] = None,
+    overwrite: bool = False,
+    bound: Optional[BoundFn] = None,
+) -> None:
+    """Register a dual path; with `bound`, results are compared by `compare_close` within that bound."""
+    if name in DUAL_PATHS and not overwrite:
+        raise ValueError(f"Dual path already registered: {name}")
+    if bound is not None and compare is not None:
+        raise ValueError("A dual path takes either `compare` or `bound`")
+    DUAL_PATHS[name] = DualPath(name, fast, reference, compare if compare is not None else compare_close(), bound)
+
+
+def get_dual_path(name: str) -> DualPath:
+    try:
+        return DUAL_PATHS[name]
+    except KeyError:
+        known = ", ".join(sorted(DUAL_PATHS))
+        raise KeyError(f"Unknown dual path {name!r} (registered: {known})") from None
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    name: str
+    label: str
+    detail: str
+    dump_path: Optional[str]
+
+
+class CrossChecker:
+    """Runs reference implementations next to fast paths on a sampled fraction of calls.
+
+    Thread-safe; sampling is reproducible for a given `seed` and call order.
+    """
+
+    def __init__(self, rate: float, seed: int = 0, dump_dir: Optional[str] = None) -> None:
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("Cross-check rate must be in [0, 1]")
+        self.rate = rate
+        self.dump_dir = dump_dir
+        self.mismatches: List[Mismatch] = []
+        # name -> [calls, checked, mismatches]
+        self.counts: Dict[str, List[int]] = {}
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def _sample(self, name: str) -> bool:
+        with self._lock:
+            counts = self.counts.setdefault(name, [0, 0, 0])
+            counts[0] += 1
+            sampled = self.rate >= 1.0 or (self.rate > 0.0 and self._rng.random() < self.rate)
+            if sampled:
+                counts[1] += 1
+            return sampled
+
+    def _record(self, path: DualPath, label: str, detail: str, args: tuple, fast: Any, reference: Any) -> None:
+        dump_path = None
+        with self._lock:
+            self.counts[path.name][2] += 1
+            index = len(self.mismatches)
+            if self.dump_dir:
+                os.makedirs(self.dump_dir, exist_ok=True)
+                safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in f"{path.name}_{label}")
+                dump_path = os.path.join(self.dump_dir, f"mismatch_{index:04d}_{safe}.pkl")
+            self.mismatches.append(Mismatch(path.name, label, detail, dump_path))
+        if dump_path is not None:
+            payload = {"name": path.name, "label": label, "detail": detail, "args": args, "fast": fast, "reference": reference}
+            with open(dump_path, "wb") as f:
+                pickle.dump(payload, f)
+
+    def _compare(self, path: DualPath, label: str, args: tuple, fast: Any) -> None:
+        # `args` were copied before the fast call, so the reference sees the same inputs.
+        reference = path.reference(*args)
+        detail = path.comparator(args)(fast, reference)
+        if detail is not None:
+            self._record(path, label, detail, args, fast, reference)
+
+    def call(self, name: str, *args: Any, label: str = "") -> Any:
+        """The fast path's result; on sampled calls the reference is run and compared too."""
+        path = get_dual_path(name)
+        if not self._sample(name):
+            return path.fast(*args)
+        saved = copy.deepcopy(args)
+        fast = path.fast(*args)
+        self._compare(path, label, saved, fast)
+        return fast
+
+    def check_season(
+        self, season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config
+    ) -> None:
+        """Run every registered dual path on this season with probability `rate` each."""
+        args = (season_log, true_params, seed, config)
+        for name, path in list(DUAL_PATHS.items()):
+            if self._sample(name):
+                self._compare(path, f"seed{seed}", args, path.fast(*args))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "paths": {
+                    name: {"calls": calls, "checked": checked, "mismatches": bad}
+                    for name, (calls, checked, bad) in sorted(self.counts.items())
+                },
+                "mismatches": [
+                    {"name": m.name, "label": m.label, "detail": m.detail, "dump": m.dump_path} for m in self.mismatches
+                ],
+            }
+
+    def save_report(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self) -> str:
+        checked = sum(counts[1] for counts in self.counts.values())
+        text = f"cross-check: {checked} checks over {len(self.counts)} paths, {len(self.mismatches)} mismatches"
+        for m in self.mismatches[:5]:
+            text += f"\n  {m.name} ({m.label}): {m.detail}" + (f" -> {m.dump_path}" if m.dump_path else "")
+        return text
+
+
+def load_mismatch(path: str) -> dict:
+    """A pickled mismatch: name, label, detail, args (the path's inputs), fast, reference."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _season_teams(season_log: SeasonLog) -> list:
+    return [team for match in season_log.matches for team in match.teams]
+
+
+def _fast_team_values(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    if true_params is None:
+        return None
+    members = encode_partition([team.members for team in _season_teams(season_log)])
+    parts = batch_team_breakdown(
+        members,
+        true_params.abilities(),
+        true_params.cooperativeness(),
+        true_params.skills(),
+        np.asarray(true_params.affinity, dtype=float),
+        config,
+    )
+    return {key: parts[key] for key in BREAKDOWN_KEYS}
+
+
+def _reference_team_values(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    if true_params is None:
+        return None
+    values = [compute_team_value(team.members, true_params, config) for team in _season_teams(season_log)]
+    return {key: np.array([value.breakdown[key] for value in values]) for key in BREAKDOWN_KEYS}
+
+
+def _team_values_bound(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> float:
+    if true_params is None or float_dtype(config) == np.float64:
+        return 0.0
+    return max(
+        (team_value_error_bound(team.members, true_params, config) for team in _season_teams(season_log)), default=0.0
+    )
+
+
+def _fast_phase_a_ranks(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    y = ColumnarSeasonLog.from_season_log(season_log).y_obs
+    mean_y = float(y.mean()) if y.size else 0.0
+    std_y = float(y.std()) if y.size else 0.0
+    std_y = std_y if std_y != 0.0 else 1.0
+    z = (y - mean_y) / std_y
+    return {"mean_y": mean_y, "std_y": std_y, "z": z, "rank": assign_rank_codes(z, config.rank_thresholds)}
+
+
+def _reference_phase_a_ranks(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    y = [team.y_obs for team in _season_teams(season_log)]
+    stats = compute_phase_a_stats(y, config)
+    z = [z_score(value, stats) for value in y]
+    ranks = [RANK_ORDER.index(assign_rank(value, stats.thresholds)) for value in z]
+    return {"mean_y": stats.mean_y, "std_y": stats.std_y, "z": np.array(z), "rank": np.array(ranks, dtype=np.int8)}
+
+
+def _fast_interaction_scores(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    return IndexAggregates.from_season_log(season_log, config).full().interaction_scores()
+
+
+def _serial(config: Config) -> Config:
+    return replace(config, index_workers=1)
+
+
+def _reference_interaction_scores(
+    season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config
+) -> Any:
+    return compute_empirical_interaction_scores(season_log, _serial(config))
+
+
+def _fast_pair_profile(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    indices = IndexAggregates.from_season_log(season_log, config).full()
+    n = config.n_players
+    prior = pair_profile_prior_vector(config)
+    profile = {(i, j): prior for i in range(n) for j in range(i + 1, n)}
+    left, right = pair_from_linear_index(indices.pair_index, n)
+    for i, j, counts in zip(left.tolist(), right.tolist(), indices.pair_counts.tolist()):
+        profile[(i, j)] = tuple(counts)
+    return profile
+
+
+def _reference_pair_profile(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    return compute_pair_profile(season_log, _serial(config))
+
+
+# Small enough that a season's partials are merged from several chunks.
+_PARTIAL_CHUNK_TEAMS = 8
+
+
+def _index_summary(indices: FoldIndices) -> Any:
+    return {
+        "coalitions": [tuple(m for m in row if m >= 0) for row in indices.coalitions[indices.order].tolist()],
+        "scores": indices.scores[indices.order],
+        "pair_index": indices.pair_index,
+        "pair_counts": indices.pair_counts,
+    }
+
+
+def _fast_index_partials(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    return _index_summary(compute_index_partials(season_log, config, chunk_teams=_PARTIAL_CHUNK_TEAMS).fold_indices(config))
+
+
+def _reference_index_partials(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    return _index_summary(IndexAggregates.from_season_log(season_log, config).full())
+
+
+def _fold_strategy_paths(name: str) -> tuple:
+    def fast(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+        indices = IndexAggregates.from_season_log(season_log, config).full()
+        return FOLD_STRATEGIES[name](indices, np.random.default_rng(seed), config)
+
+    def reference(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+        return BUILTIN_STRATEGIES[name](season_log, np.random.default_rng(seed), config)
+
+    return fast, reference
+
+
+def _reference_greedy_interaction(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    scores = compute_empirical_interaction_scores(season_log, config)
+    size_priority = {size: idx for idx, size in enumerate(config.greedy_size_priority)}
+
+    candidates = list(scores.items())
+    rng.shuffle(candidates)
+    candidates.sort(key=lambda item: (-item[1], size_priority.get(len(item[0]), len(size_priority))))
+
+    assigned = set()
+    partition: Partition = []
+    for team, score in candidates:
+        if all(member not in assigned for member in team):
+            partition.append(tuple(team))
+            assigned.update(team)
+
+    remaining = [p for p in range(config.n_players) if p not in assigned]
+    rng.shuffle(remaining)
+    while remaining:
+        if len(remaining) == 1:
+            team = (remaining.pop(),)
+        else:
+            team = (remaining.pop(), remaining.pop())
+        partition.append(team)
+    return partition
+
+
+def _reference_lexcel_weber(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    profile = compute_pair_profile(season_log, config)
+    pair_list = [((i, j), vec, sum(vec)) for (i, j), vec in profile.items()]
+
+    rng.shuffle(pair_list)
+    # The key draws one tie-break per pair, in shuffled order.
+    pair_list.sort(key=lambda item: tuple([-v for v in item[1]] + [-item[2], rng.random()]))
+
+    used = set()
+    pairs: Partition = []
+    for (i, j), vec, total in pair_list:
+        if i in used or j in used:
+            continue
+        pairs.append((i, j))
+        used.add(i)
+        used.add(j)
+        if len(pairs) == config.n_players // 2:
+            break
+    return pairs
+
+
+SCALAR_STRATEGIES: Dict[str, StrategyFn] = {
+    "greedy_interaction": _reference_greedy_interaction,
+    "lexcel_weber": _reference_lexcel_weber,
+}
+
+
+def _scalar_strategy_paths(name: str) -> tuple:
+    def fast(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+        return BUILTIN_STRATEGIES[name](season_log, np.random.default_rng(seed), config)
+
+    def reference(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+        return SCALAR_STRATEGIES[name](season_log, np.random.default_rng(seed), _serial(config))
+
+    return fast, reference
+
+
+_DELTA_PLAYERS = 4
+
+
+def _delta_inputs(season_log: SeasonLog, seed: int, config: Config) -> tuple:
+    n = config.n_players
+    teams = [tuple(team.members) for team in season_log.matches[0].teams] if season_log.matches else []
+    seated = {p for team in teams for p in team}
+    partition = teams + [(p,) for p in range(n) if p not in seated]
+    players = np.random.default_rng(seed).choice(n, size=min(_DELTA_PLAYERS, n), replace=False).tolist()
+    return partition, players
+
+
+def _fast_incremental_deltas(season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config) -> Any:
+    if true_params is None:
+        return None
+    partition, players = _delta_inputs(season_log, seed, config)
+    state = IncrementalPartition(true_value_model(true_params, config), partition)
+    return {
+        "move": np.array([state.move_deltas(p) for p in players]),
+        "swap": np.array([state.swap_deltas(p) for p in players]),
+    }
+
+
+def _reference_incremental_deltas(
+    season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config
+) -> Any:
+    if true_params is None:
+        return None
+    partition, players = _delta_inputs(season_log, seed, config)
+    n = config.n_players
+    # Slots as in `IncrementalPartition`: the teams, then empty slots up to n.
+    slots = [list(team) for team in partition] + [[] for _ in range(n - len(partition))]
+    team_of = {p: t for t, team in enumerate(slots) for p in team}
+
+    def value(members: List[int]) -> float:
+        return compute_team_value(members, true_params, config).value if members else 0.0
+
+    values = [value(team) for team in slots]
+    move = np.zeros((len(players), n))
+    swap = np.zeros((len(players), n))
+    for row, p in enumerate(players):
+        a = team_of[p]
+        without_p = [m for m in slots[a] if m != p]
+        for t in range(n):
+            if t != a:
+                move[row, t] = value(without_p) - values[a] + value(slots[t] + [p]) - values[t]
+        for q in range(n):
+            b = team_of[q]
+            if b != a:
+                without_q = [m for m in slots[b] if m != q]
+                swap[row, q] = value(without_p + [q]) - values[a] + value(without_q + [p]) - values[b]
+    return {"move": move, "swap": swap}
+
+
+def _incremental_deltas_bound(
+    season_log: SeasonLog, true_params: Optional[TrueParams], seed: int, config: Config
+) -> float:
+    if true_params is None or float_dtype(config) == np.float64:
+        return 0.0
+    partition, _ = _delta_inputs(season_log, seed, config)
+    # A delta is a sum of four team values, each of a team, a team joined by one
+    # player or a team with one member replaced (bounded by the team joined by it).
+    teams = [list(team) for team in partition]
+    teams += [list(team) + [q] for team in partition for q in range(config.n_players) if q not in team]
+    return 4.0 * max((team_value_error_bound(team, true_params, config) for team in teams), default=0.0)
+
+
+register_dual_path("team_values", _fast_team_values, _reference_team_values, bound=_team_values_bound)
+register_dual_path("phase_a_ranks", _fast_phase_a_ranks, _reference_phase_a_ranks)
+register_dual_path("interaction_scores", _fast_interaction_scores, _reference_interaction_scores, compare_exact)
+register_dual_path("pair_profile", _fast_pair_profile, _reference_pair_profile, compare_exact)
+register_dual_path("index_partials", _fast_index_partials, _reference_index_partials, compare_exact)
+for _name in FOLD_STRATEGIES:
+    register_dual_path(f"strategy:{_name}", *_fold_strategy_paths(_name), compare=compare_exact)
+for _name in SCALAR_STRATEGIES:
+    register_dual_path(f"scalar:{_name}", *_scalar_strategy_paths(_name), compare=compare_exact)
+register_dual_path(
+    "incremental_deltas", _fast_incremental_deltas, _reference_incremental_deltas, bound=_incremental_deltas_bound
+)
@@ -0,0 +1,253 @@
+"""Leave-one-match-out cross-validation of strategy decisions.
+
+Each Phase A match is dropped in turn and the strategy is re-run on the
+remaining log. The indices of a fold come from `IndexAggregates.without_match`
+(one index build for the whole season, then a cheap downdate per fold);
+`greedy_interaction`, `lexcel_weber`, `max_weight_pairing` and `random` run
+directly on those indices while the registry holds their built-ins
+(`fold_strategy`), other registered strategies (and built-ins replaced by
+`register_strategy`) on a `SeasonLog` rebuilt without the match. Every run
+of a strategy (full log and folds) uses the same RNG seed, so differences
+between folds come from the data, not from the random tie-breaks.
+
+Per fold we report the partition, its value under the fold's additive
+surrogate (`estimated_value_model`), its true value when the true parameters
+are known, and its agreement with the full-log partition (Rand index over
+player pairs, and the share of full-log teams kept). Per strategy we report how
+often each pair of players ends up on the same team across folds.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.indices.aggregates import FoldIndices, IndexAggregates
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.players.types import TrueParams
+from sim_contribution.production.batch import batch_team_values_for, encode_partition
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.greedy_interaction import greedy_interaction_from_arrays
+from sim_contribution.strategies.lexcel_weber_pairing import lexcel_weber_from_counts
+from sim_contribution.strategies.max_weight_pairing import max_weight_pairing_from_indices
+from sim_contribution.strategies.random_partition import random_partition
+from sim_contribution.strategies.registry import get_strategy, is_builtin_strategy
+
+FoldStrategyFn = Callable[[FoldIndices, np.random.Generator, Config], Partition]
+
+
+def _fold_greedy(indices: FoldIndices, rng: np.random.Generator, config: Config) -> Partition:
+    return greedy_interaction_from_arrays(*indices.candidates(), rng, config)
+
+
+def _fold_lexcel(indices: FoldIndices, rng: np.random.Generator, config: Config) -> Partition:
+    return lexcel_weber_from_counts(indices.pair_index, indices.pair_counts, rng, config)
+
+
+def _fold_max_weight(indices: FoldIndices, rng: np.random.Generator, config: Config) -> Partition:
+    return max_weight_pairing_from_indices(
+        lambda: (indices.pair_index, indices.pair_counts), indices.candidates, rng, config
+    )
+
+
+def _fold_random(indices: FoldIndices, rng: np.random.Generator, config: Config) -> Partition:
+    return random_partition(config.n_players, rng, config)
+
+
+# Strategies that only read the indices; equivalent to the registered functions.
+FOLD_STRATEGIES: Dict[str, FoldStrategyFn] = {
+    "greedy_interaction": _fold_greedy,
+    "lexcel_weber": _fold_lexcel,
+    "max_weight_pairing": _fold_max_weight,
+    "random": _fold_random,
+}
+
+
+def fold_strategy(name: str) -> Optional[FoldStrategyFn]:
+    """The indices-level implementation of `name`, or None when there is none or
+    the registered strategy is no longer the built-in it is equivalent to."""
+    fast = FOLD_STRATEGIES.get(name)
+    return fast if fast is not None and is_builtin_strategy(name) else None
+
+
+@dataclass(frozen=True)
+class FoldResult:
+    strategy: str
+    match_id: int
+    partition: Partition
+    predicted_value: float
+    true_value: Optional[float]
+    agreement: float
+    teams_kept: float
+
+    def to_row(self) -> Dict[str, object]:
+        return {
+            "strategy": self.strategy,
+            "left_out_match": self.match_id,
+            "partition": " | ".join(",".join(str(m) for m in team) for team in self.partition),
+            "predicted_value": self.predicted_value,
+            "true_value": self.true_value,
+            "agreement": self.agreement,
+            "teams_kept": self.teams_kept,
+        }
+
+
+@dataclass(frozen=True)
+class CrossValidationResult:
+    strategy: str
+    partition: Partition
+    predicted_value: float
+    true_value: Optional[float]
+    folds: List[FoldResult]
+    co_assignment: np.ndarray  # (n, n) share of folds placing i and j on the same team
+
+    def summary_row(self) -> Dict[str, object]:
+        agreement = np.array([fold.agreement for fold in self.folds])
+        kept = np.array([fold.teams_kept for fold in self.folds])
+        predicted = np.array([fold.predicted_value for fold in self.folds])
+        row: Dict[str, object] = {
+            "strategy": self.strategy,
+            "n_folds": len(self.folds),
+            "agreement_mean": float(agreement.mean()) if agreement.size else None,
+            "agreement_min": float(agreement.min()) if agreement.size else None,
+            "teams_kept_mean": float(kept.mean()) if kept.size else None,
+            "predicted_value": self.predicted_value,
+            "fold_predicted_mean": float(predicted.mean()) if predicted.size else None,
+            "fold_predicted_std": float(predicted.std()) if predicted.size else None,
+            "true_value": self.true_value,
+        }
+        if self.true_value is not None and self.folds:
+            true = np.array([fold.true_value for fold in self.folds])
+            row["fold_true_mean"] = float(true.mean())
+            row["fold_true_std"] = float(true.std())
+        else:
+            row["fold_true_mean"] = None
+            row["fold_true_std"] = None
+        return row
+
+
+def season_without_match(season_log: SeasonLog, match_id: int) -> SeasonLog:
+    return SeasonLog(
+        matches=[match for match in season_log.matches if match.match_id != match_id],
+        phase_a_stats=season_log.phase_a_stats,
+    )
+
+
+def _labels(partition: Partition, n_players: int) -> np.ndarray:
+    labels = np.full(n_players, -1, dtype=np.int64)
+    for team_id, team in enumerate(partition):
+        labels[list(team)] = team_id
+    return labels
+
+
+def _true_value(partition: Partition, true_params: Optional[TrueParams], config: Config) -> Optional[float]:
+    if true_params is None:
+        return None
+    return float(batch_team_values_for(encode_partition(partition), true_params, config).sum())
+
+
+def _predicted_value(partition: Partition, indices: FoldIndices) -> float:
+    return float(sum(indices.estimated_value(team) for team in partition))
+
+
+def cross_validate(
+    season_log: SeasonLog,
+    config: Config,
+    strategy_names: Sequence[str],
+    seed: int = 0,
+    true_params: Optional[TrueParams] = None,
+) -> List[CrossValidationResult]:
+    aggregates = IndexAggregates.from_season_log(season_log, config)
+    full = aggregates.full()
+    folds = [aggregates.without_match(m) for m in range(aggregates.n_matches)]
+    n = config.n_players
+    upper = np.triu_indices(n, k=1)
+
+    results: List[CrossValidationResult] = []
+    for name in strategy_names:
+        fast = fold_strategy(name)
+        strategy = get_strategy(name) if fast is None else None
+
+        def propose(indices: FoldIndices, log: Callable[[], SeasonLog]) -> Partition:
+            rng = np.random.default_rng(seed)
+            return fast(indices, rng, config) if fast is not None else strategy(log(), rng, config)
+
+        partition = propose(full, lambda: season_log)
+        labels = _labels(partition, n)
+        same = (labels[:, None] == labels[None, :])[upper]
+        teams = set(tuple(sorted(team)) for team in partition)
+
+        co_assignment = np.zeros((n, n))
+        fold_results: List[FoldResult] = []
+        for position, indices in enumerate(folds):
+            match_id = int(aggregates.match_ids[position])
+            fold_partition = propose(indices, lambda: season_without_match(season_log, match_id))
+            fold_labels = _labels(fold_partition, n)
+            fold_same = fold_labels[:, None] == fold_labels[None, :]
+            co_assignment += fold_same
+            fold_results.append(
+                FoldResult(
+                    strategy=name,
+                    match_id=match_id,
+                    partition=fold_partition,
+                    predicted_value=_predicted_value(fold_partition, indices),
+                    true_value=_true_value(fold_partition, true_params, config),
+                    agreement=float((fold_same[upper] == same).mean()) if same.size else 1.0,
+                    teams_kept=sum(tuple(sorted(team)) in teams for team in fold_partition) / max(len(teams), 1),
+                )
+            )
+        results.append(
+            CrossValidationResult(
+                strategy=name,
+                partition=partition,
+                predicted_value=_predicted_value(partition, full),
+                true_value=_true_value(partition, true_params, config),
+                folds=fold_results,
+                co_assignment=co_assignment / max(len(folds), 1),
+            )
+        )
+    return results
+
+
+def _write_rows(path: str, rows: List[Dict[str, object]]) -> None:
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_crossval_report(results: Sequence[CrossValidationResult], outdir: str) -> None:
+    """`crossval_folds.csv`, `crossval_summary.csv` and `crossval_coassign_<strategy>.csv`."""
+    os.makedirs(outdir, exist_ok=True)
+    _write_rows(os.path.join(outdir, "crossval_folds.csv"), [fold.to_row() for r in results for fold in r.folds])
+    _write_rows(os.path.join(outdir, "crossval_summary.csv"), [r.summary_row() for r in results])
+    for result in results:
+        np.savetxt(
+            os.path.join(outdir, f"crossval_coassign_{result.strategy}.csv"),
+            result.co_assignment,
+            delimiter=",",
+            fmt="%.6g",
+        )
+
+
+def summarize_crossval(results: Sequence[CrossValidationResult]) -> str:
+    lines = []
+    for result in results:
+        row = result.summary_row()
+        line = (
+            f"{result.strategy}: {row['n_folds']} folds, agreement mean={row['agreement_mean']:.3f} "
+            f"min={row['agreement_min']:.3f}, teams kept={row['teams_kept_mean']:.3f}, "
+            f"predicted={result.predicted_value:.3f} (folds {row['fold_predicted_mean']:.3f} ± {row['fold_predicted_std']:.3f})"
+            if result.folds
+            else f"{result.strategy}: no folds"
+        )
+        if result.true_value is not None and result.folds:
+            line += f", true={result.true_value:.3f} (folds {row['fold_true_mean']:.3f} ± {row['fold_true_std']:.3f})"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,200 @@
+"""Replay strategies against stored Phase A logs (no re-simulation).
+
+A season directory is any directory containing `phase_a_log.json` (as written by
+`save_phase_a_logs`). Each season is replayed with the `Config` saved next to
+it (`config.json`) unless one is given explicitly. When `true_params.json`
+sits next to it, the proposed partitions are also evaluated (Phase B) with
+`evaluate_partition`.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.runner import evaluate_partition, propose_partition
+from sim_contribution.log.loader import (
+    CONFIG_FILENAME,
+    PHASE_A_LOG_FILENAME,
+    load_config,
+    load_season_log,
+    load_true_params_if_present,
+)
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.observation.ranking import RANK_ORDER
+from sim_contribution.rng import stable_key
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.registry import get_strategy
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    season: str
+    strategy: str
+    partition: Partition
+    total_y: Optional[float]
+    total_v_true: Optional[float]
+    rank_counts: Optional[Dict[str, int]]
+
+    def to_row(self) -> Dict[str, object]:
+        row: Dict[str, object] = {
+            "season": self.season,
+            "strategy": self.strategy,
+            "partition": " | ".join(",".join(str(m) for m in team) for team in self.partition),
+            "total_y": self.total_y,
+            "total_v_true": self.total_v_true,
+        }
+        for rank in RANK_ORDER:
+            row[f"rank_{rank}"] = self.rank_counts.get(rank, 0) if self.rank_counts is not None else None
+        return row
+
+
+def discover_seasons(root: str) -> List[str]:
+    """Return season directories under `root` (sorted, relative to `root`)."""
+    seasons: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if PHASE_A_LOG_FILENAME in filenames:
+            seasons.append(os.path.relpath(dirpath, root))
+    return sorted(seasons)
+
+
+def replay_rng(seed: int, season: str, strategy: str) -> np.random.Generator:
+    # Keyed by (season, strategy) so results do not depend on worker scheduling
+    # or on which other strategies are replayed alongside.
+    return np.random.default_rng([seed, stable_key(season), stable_key(strategy)])
+
+
+def _check_players(season_log: SeasonLog, config: Config, season: str) -> None:
+    for match in season_log.matches:
+        for team in match.teams:
+            for member in team.members:
+                if member >= config.n_players:
+                    raise ValueError(
+                        f"Season {season!r} has player {member} but config.n_players={config.n_players}"
+                    )
+
+
+def replay_season(
+    root: str,
+    season: str,
+    strategy_names: Sequence[str],
+    config: Optional[Config] = None,
+    seed: int = 0,
+    evaluate: bool = True,
+) -> List[ReplayResult]:
+    """Replay one season; `config=None` uses the season's saved `config.json`."""
+    season_dir = os.path.join(root, season)
+    if config is None:
+        config = load_config(season_dir)
+    season_log = load_season_log(season_dir)
+    _check_players(season_log, config, season)
+    true_params = load_true_params_if_present(season_dir) if evaluate else None
+
+    results: List[ReplayResult] = []
+    for name in strategy_names:
+        rng = replay_rng(seed, season, name)
+        partition = propose_partition(get_strategy(name), season_log, rng, config)
+        if true_params is None:
+            results.append(ReplayResult(season, name, partition, None, None, None))
+            continue
+        evaluated = evaluate_partition(partition, true_params, season_log.phase_a_stats, rng, config, name)
+        results.append(
+            ReplayResult(
+                season=season,
+                strategy=name,
+                partition=partition,
+                total_y=evaluated.total_y,
+                total_v_true=float(sum(team.v_true for team in evaluated.teams)),
+                rank_counts=dict(evaluated.rank_counts),
+            )
+        )
+    return results
+
+
+def _replay_task(args: tuple) -> List[ReplayResult]:
+    return replay_season(*args)
+
+
+def iter_replay(
+    root: str,
+    strategy_names: Sequence[str],
+    config: Optional[Config] = None,
+    seed: int = 0,
+    workers: int = 1,
+    evaluate: bool = True,
+    seasons: Optional[Sequence[str]] = None,
+    chunksize: int = 64,
+) -> Iterator[ReplayResult]:
+    """Yield replay results season by season (in season order).
+
+    With `config=None` every season must have its `config.json`; missing ones are
+    reported before any season is replayed.
+    """
+    for name in strategy_names:
+        get_strategy(name)
+    if seasons is None:
+        seasons = discover_seasons(root)
+    if config is None:
+        missing = [season for season in seasons if not os.path.exists(os.path.join(root, season, CONFIG_FILENAME))]
+        if missing:
+            raise FileNotFoundError(
+                f"{len(missing)} season(s) under {root} have no {CONFIG_FILENAME} (first: {missing[0]!r}); "
+                "pass the Config they were simulated with"
+            )
+    tasks = [(root, season, tuple(strategy_names), config, seed, evaluate) for season in seasons]
+
+    if workers <= 1:
+        for task in tasks:
+            yield from _replay_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for results in pool.map(_replay_task, tasks, chunksize=chunksize):
+            yield from results
+
+
+def replay_directory(
+    root: str,
+    strategy_names: Sequence[str],
+    config: Optional[Config] = None,
+    seed: int = 0,
+    workers: int = 1,
+    evaluate: bool = True,
+) -> List[ReplayResult]:
+    return list(iter_replay(root, strategy_names, config, seed=seed, workers=workers, evaluate=evaluate))
+
+
+def save_replay_results(results: Sequence[ReplayResult], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rows = [result.to_row() for result in results]
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def summarize_replay(results: Sequence[ReplayResult]) -> str:
+    by_strategy: Dict[str, List[ReplayResult]] = {}
+    for result in results:
+        by_strategy.setdefault(result.strategy, []).append(result)
+
+    lines = []
+    for name, items in by_strategy.items():
+        lines.append(f"Strategy: {name}")
+        lines.append(f"  seasons: {len(items)}")
+        evaluated = [r for r in items if r.total_y is not None]
+        if evaluated:
+            mean_y = sum(float(r.total_y) for r in evaluated) / len(evaluated)
+            mean_v = sum(float(r.total_v_true) for r in evaluated) / len(evaluated)
+            lines.append(f"  evaluated: {len(evaluated)}")
+            lines.append(f"  mean total_y: {mean_y:.3f}")
+            lines.append(f"  mean total_v_true: {mean_v:.3f}")
+    return "\n".join(lines)
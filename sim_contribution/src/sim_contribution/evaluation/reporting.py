@@ -9,6 +9,7 @@ from sim_contribution.evaluation.types import ExperimentReport, StrategyResult
 from sim_contribution.log.schema import SeasonLog, TeamLog
 from sim_contribution.players.types import TrueParams
 from sim_contribution.config import Config
+from sim_contribution.indices.bootstrap import bootstrap_indices
 from sim_contribution.indices.empirical_interaction import compute_empirical_interaction_scores
 from sim_contribution.indices.pair_profile import compute_pair_profile
 from sim_contribution.observation.ranking import RANK_ORDER
@@ -113,6 +114,7 @@ def save_phase_a_indices(season_log: SeasonLog, config: Config, outdir: str) ->
 
     interaction_scores = compute_empirical_interaction_scores(season_log, config)
     pair_profiles = compute_pair_profile(season_log, config)
+    intervals = bootstrap_indices(season_log, config) if config.bootstrap_samples > 0 else None
 
     # Unified coalition list (size 1..3). For undefined metrics, use None (-> null in JSON).
     def _all_coalitions() -> List[tuple[int, ...]]:
@@ -166,6 +168,17 @@ def save_phase_a_indices(season_log: SeasonLog, config: Config, outdir: str) ->
             "rank_D": int(rank_counts["D"]),
             "rank_E": int(rank_counts["E"]),
         }
+        if intervals is not None:
+            score_ci = intervals.interaction_score.get(coalition)
+            mean_ci = intervals.mean_y_obs.get(coalition)
+            row["mean_y_obs_lo"] = mean_ci[0] if mean_ci is not None else None
+            row["mean_y_obs_hi"] = mean_ci[1] if mean_ci is not None else None
+            row["interaction_score_lo"] = score_ci[0] if score_ci is not None else None
+            row["interaction_score_hi"] = score_ci[1] if score_ci is not None else None
+            pair_ci = intervals.pair_profile.get((coalition[0], coalition[1]), (pair_vec, pair_vec)) if size == 2 else None
+            for idx, r in enumerate(RANK_ORDER):
+                row[f"pair_{r}_lo"] = int(pair_ci[0][idx]) if pair_ci is not None else None
+                row[f"pair_{r}_hi"] = int(pair_ci[1][idx]) if pair_ci is not None else None
         rows.append(row)
 
     json_path = os.path.join(outdir, "phase_a_indices.json")
@@ -192,7 +205,14 @@ def summarize_results(strategy_results: List[StrategyResult]) -> str:
     return "\n".join(lines)
 
 
-def save_all_outputs(report: ExperimentReport, outdir: str) -> None:
+def save_config(config: Config, outdir: str) -> None:
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config.to_dict(), f, indent=2)
+
+
+def save_all_outputs(report: ExperimentReport, outdir: str, config: Config) -> None:
+    save_config(config, outdir)
     save_phase_a_logs(report.season_log, outdir)
     save_phase_b_logs(report.strategy_results, outdir)
     save_true_params(report.true_params, outdir)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Callable, Dict, List
+import time
+from typing import Callable, Dict, List, Optional, Sequence
 import numpy as np
 
 from sim_contribution.config import Config
@@ -9,40 +10,60 @@ from sim_contribution.observation.noise import add_noise
 from sim_contribution.observation.ranking import assign_rank, compute_phase_a_stats, z_score
 from sim_contribution.players.param_generator import generate_true_params
 from sim_contribution.players.types import TrueParams
+from sim_contribution.precision import storage_float
 from sim_contribution.production.team_value import compute_team_value
+from sim_contribution.rng import phase_a_streams, schedule_seed
 from sim_contribution.schedule.generator import generate_schedule
-from sim_contribution.schedule.types import Partition
-from sim_contribution.strategies.greedy_interaction import greedy_interaction_partition
-from sim_contribution.strategies.lexcel_weber_pairing import lexcel_weber_pairing
-from sim_contribution.strategies.random_partition import random_partition
+from sim_contribution.schedule.library import ScheduleKey, open_library
+from sim_contribution.schedule.online import OnlineScheduler
+from sim_contribution.schedule.types import SCHEDULE_MODES, Partition, Schedule
+from sim_contribution.strategies.registry import DEFAULT_STRATEGIES, StrategyFn, get_strategy
 from sim_contribution.evaluation.types import ExperimentReport, StrategyResult
 
 
+def fixed_schedule(seed: int, rng: np.random.Generator, config: Config) -> Schedule:
+    """`generate_schedule`, through `config.schedule_library` when set."""
+    if not config.schedule_library:
+        return generate_schedule(rng, config)
+    if config.rng_streams != "named":
+        raise ValueError('schedule_library requires rng_streams="named"')
+    key = ScheduleKey.from_config(config, schedule_seed(seed, config))
+    return open_library(config.schedule_library).get_or_generate(key, rng, config)
+
+
 def run_phase_a(seed: int, config: Config) -> tuple[SeasonLog, TrueParams]:
-    rng = np.random.default_rng(seed)
-    true_params = generate_true_params(rng, config)
-    schedule = generate_schedule(rng, config)
+    if config.schedule_mode not in SCHEDULE_MODES:
+        raise ValueError(f"Unknown schedule_mode: {config.schedule_mode!r} (expected one of {SCHEDULE_MODES})")
+    streams = phase_a_streams(seed, config)
+    true_params = generate_true_params(streams["params"], config)
+    schedule = fixed_schedule(seed, streams["schedule"], config) if config.schedule_mode == "fixed" else None
+    scheduler = OnlineScheduler(config) if schedule is None else None
+    rng = streams["noise"]
+    stored = storage_float(config)
 
     raw_matches = []
     all_y = []
 
-    for match_id, partition in enumerate(schedule):
+    for match_id in range(config.n_matches):
+        partition = schedule[match_id] if scheduler is None else scheduler.next_partition(streams["schedule"])
         team_entries = []
         for team_id, members in enumerate(partition):
             team_value = compute_team_value(members, true_params, config)
-            y_obs = add_noise(team_value.value, rng, config.noise_sigma)
+            y_obs = stored(add_noise(team_value.value, rng, config.noise_sigma))
             team_entries.append(
                 {
                     "match_id": match_id,
                     "team_id": team_id,
                     "members": tuple(members),
-                    "v_true": team_value.value,
+                    "v_true": stored(team_value.value),
                     "y_obs": y_obs,
-                    "breakdown": team_value.breakdown,
+                    "breakdown": {key: stored(value) for key, value in team_value.breakdown.items()},
                 }
             )
             all_y.append(y_obs)
         raw_matches.append(team_entries)
+        if scheduler is not None:
+            scheduler.observe(partition, [entry["y_obs"] for entry in team_entries])
 
     phase_a_stats = compute_phase_a_stats(all_y, config)
 
@@ -50,7 +71,7 @@ def run_phase_a(seed: int, config: Config) -> tuple[SeasonLog, TrueParams]:
     for match_id, team_entries in enumerate(raw_matches):
         teams: List[TeamLog] = []
         for entry in team_entries:
-            z = z_score(entry["y_obs"], phase_a_stats)
+            z = stored(z_score(entry["y_obs"], phase_a_stats))
             rank = assign_rank(z, phase_a_stats.thresholds)
             teams.append(
                 TeamLog(
@@ -71,7 +92,7 @@ def run_phase_a(seed: int, config: Config) -> tuple[SeasonLog, TrueParams]:
 
 
 def propose_partition(
-    strategy_fn: Callable[[SeasonLog, np.random.Generator, Config], Partition],
+    strategy_fn: StrategyFn,
     season_log: SeasonLog,
     rng: np.random.Generator,
     config: Config,
@@ -119,32 +140,28 @@ def evaluate_partition(
     )
 
 
-def _strategy_random(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
-    return random_partition(config.n_players, rng, config)
-
-
-def _strategy_greedy(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
-    return greedy_interaction_partition(season_log, rng, config)
-
-
-def _strategy_lexcel(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
-    return lexcel_weber_pairing(season_log, rng, config)
-
-
-def run_experiment(seed: int, config: Config) -> ExperimentReport:
+def run_experiment(
+    seed: int,
+    config: Config,
+    strategy_names: Sequence[str] = DEFAULT_STRATEGIES,
+    record_stage: Optional[Callable[[str, float], None]] = None,
+) -> ExperimentReport:
+    """`record_stage(stage, seconds)`, if given, receives the wall time of
+    "phase_a", "propose:<strategy>" and "phase_b:<strategy>"."""
+    started = time.perf_counter()
     season_log, true_params = run_phase_a(seed, config)
+    if record_stage is not None:
+        record_stage("phase_a", time.perf_counter() - started)
 
-    strategy_fns = {
-        "random": _strategy_random,
-        "greedy_interaction": _strategy_greedy,
-        "lexcel_weber": _strategy_lexcel,
-    }
+    strategy_fns = {name: get_strategy(name) for name in strategy_names}
 
     rng = np.random.default_rng(seed + 1000)
     results: List[StrategyResult] = []
     for name, fn in strategy_fns.items():
         rng_strategy = np.random.default_rng(rng.integers(0, 2**32 - 1))
+        started = time.perf_counter()
         partition = propose_partition(fn, season_log, rng_strategy, config)
+        proposed = time.perf_counter()
         eval_result = evaluate_partition(
             partition,
             true_params,
@@ -153,6 +170,9 @@ def run_experiment(seed: int, config: Config) -> ExperimentReport:
             config,
             name,
         )
+        if record_stage is not None:
+            record_stage(f"propose:{name}", proposed - started)
+            record_stage(f"phase_b:{name}", time.perf_counter() - proposed)
         results.append(eval_result)
 
     return ExperimentReport(season_log=season_log, true_params=true_params, strategy_results=results)
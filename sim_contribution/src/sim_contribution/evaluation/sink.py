@@ -0,0 +1,317 @@
+"""Output sinks for finished `ExperimentReport`s.
+
+A sink receives `(report, label)` pairs, `label` naming the season (e.g. the
+season sub-directory). Concrete sinks write synchronously; `BackgroundSink`
+wraps any sink and performs its writes on a bounded queue so serialization
+overlaps with the computation of the next season:
+
+    sink = BackgroundSink(FanoutSink([SeasonFilesSink(root, config), ResultStoreSink(path)]))
+    with sink:
+        for seed in seeds:
+            sink.submit(run_experiment(seed, config), f"seed_{seed:06d}")
+
+`submit` blocks while `max_pending` writes are outstanding (backpressure).
+`flush()` waits for every pending write and raises `OutputWriteError` if any
+failed; leaving the `with` block flushes and closes.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing.util
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.reporting import save_all_outputs, save_phase_a_indices
+from sim_contribution.evaluation.types import ExperimentReport
+from sim_contribution.log.archive import DEFAULT_CHUNK_ROWS, ArchiveWriter
+
+
+class OutputWriteError(RuntimeError):
+    def __init__(self, failures: Sequence[Tuple[str, BaseException]]) -> None:
+        label, exc = failures[0]
+        super().__init__(f"{len(failures)} output write(s) failed; first: {label}: {exc!r}")
+        self.failures = list(failures)
+
+
+class OutputSink:
+    def submit(self, report: ExperimentReport, label: str) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class SeasonFilesSink(OutputSink):
+    """The per-season files of `run_one_season.py` under `root/label`.
+
+    `plots` is a `viz.plots.PLOT_LEVELS` level; with `plot_workers > 1` the
+    figures are rendered on a process pool kept for the sink's lifetime.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        config: Config,
+        indices: bool = True,
+        plots: str = "all",
+        plot_workers: int = 1,
+    ) -> None:
+        self.root = root
+        self.config = config
+        self.indices = indices
+        self.plots = plots
+        self.plot_workers = plot_workers
+        self._plot_pool: Optional[ProcessPoolExecutor] = None
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state["_plot_pool"] = None
+        return state
+
+    def submit(self, report: ExperimentReport, label: str) -> None:
+        outdir = os.path.join(self.root, label)
+        save_all_outputs(report, outdir, self.config)
+        if self.indices:
+            save_phase_a_indices(report.season_log, self.config, outdir)
+        if self.plots != "none":
+            from sim_contribution.viz.plots import plot_all
+
+            if self._plot_pool is None and self.plot_workers > 1:
+                self._plot_pool = ProcessPoolExecutor(max_workers=self.plot_workers)
+            plot_all(
+                report.true_params,
+                report.season_log,
+                report.strategy_results,
+                self.config,
+                outdir,
+                level=self.plots,
+                executor=self._plot_pool,
+            )
+
+    def close(self) -> None:
+        if self._plot_pool is not None:
+            self._plot_pool.shutdown(wait=True)
+            self._plot_pool = None
+
+
+class ResultStoreSink(OutputSink):
+    """Appends one JSON line per (season, strategy) to a results file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def submit(self, report: ExperimentReport, label: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lines = "".join(
+            json.dumps(result.summary_row(label)) + "\n" for result in report.strategy_results
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class ArchiveSink(OutputSink):
+    """Appends each season's Phase A and strategy teams to a season archive (`log/archive.py`).
+
+    The seed is read from the label (`seed_<n>`, as written by `run_seasons`).
+    Rows are buffered in this object, so it cannot run in a process-mode
+    `BackgroundSink`.
+    """
+
+    def __init__(self, root: str, config: Config, chunk_rows: int = DEFAULT_CHUNK_ROWS, prefix: str = "chunk") -> None:
+        self.config = config
+        self.writer = ArchiveWriter(root, chunk_rows=chunk_rows, prefix=prefix)
+
+    def submit(self, report: ExperimentReport, label: str) -> None:
+        match = re.search(r"seed_(\d+)$", label)
+        if match is None:
+            raise ValueError(f"Cannot read a seed from season label {label!r}")
+        self.writer.add_season(int(match.group(1)), self.config, report.season_log, report.strategy_results)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+
+class FanoutSink(OutputSink):
+    def __init__(self, sinks: Sequence[OutputSink]) -> None:
+        self.sinks = list(sinks)
+
+    def submit(self, report: ExperimentReport, label: str) -> None:
+        for sink in self.sinks:
+            sink.submit(report, label)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+def _write(sink: OutputSink, report: ExperimentReport, label: str) -> float:
+    started = time.perf_counter()
+    sink.submit(report, label)
+    return time.perf_counter() - started
+
+
+# The wrapped sink of a process-mode `BackgroundSink`, one copy per worker process.
+_WORKER_SINK: Optional[OutputSink] = None
+
+
+def _init_worker_sink(sink: OutputSink) -> None:
+    global _WORKER_SINK
+    _WORKER_SINK = sink
+    # Closed (e.g. its plot pool shut down) when the worker exits at pool shutdown,
+    # before the finalizers (priority 10) that close the plot pool's queues.
+    multiprocessing.util.Finalize(None, sink.close, exitpriority=100)
+
+
+def _worker_write(report: ExperimentReport, label: str) -> float:
+    assert _WORKER_SINK is not None
+    return _write(_WORKER_SINK, report, label)
+
+
+_STOP = object()
+
+
+class BackgroundSink(OutputSink):
+    """Runs another sink's writes off the calling thread.
+
+    mode="thread": one writer thread (matplotlib's pyplot is not thread-safe,
+    so writes are serialized). mode="process": a process pool with `workers`
+    processes; the wrapped sink is pickled once to each worker (and closed when
+    the pool shuts down), each report to the worker that writes it.
+    `observer(label, seconds)` is called with the duration of every successful
+    write (from the writer thread, or from the caller when collecting process
+    results).
+    """
+
+    def __init__(
+        self,
+        inner: OutputSink,
+        max_pending: int = 4,
+        mode: str = "thread",
+        workers: int = 1,
+        observer: Optional[Callable[[str, float], None]] = None,
+    ) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown background sink mode: {mode}")
+        self.inner = inner
+        self.mode = mode
+        self.observer = observer
+        self._failures: List[Tuple[str, BaseException]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures: Dict[Future, str] = {}
+
+        if mode == "thread":
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+            self._thread.start()
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_sink, initargs=(inner,))
+
+    @property
+    def pending(self) -> int:
+        if self._queue is not None:
+            return self._queue.unfinished_tasks
+        return len(self._futures)
+
+    def _record(self, label: str, exc: BaseException) -> None:
+        with self._lock:
+            self._failures.append((label, exc))
+
+    def _raise_failures(self) -> None:
+        with self._lock:
+            failures, self._failures = self._failures, []
+        if failures:
+            raise OutputWriteError(failures) from failures[0][1]
+
+    def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                report, label = item
+                try:
+                    elapsed = _write(self.inner, report, label)
+                except Exception as exc:  # surfaced by flush()/submit()
+                    self._record(label, exc)
+                else:
+                    if self.observer is not None:
+                        self.observer(label, elapsed)
+            finally:
+                self._queue.task_done()
+
+    def _collect(self, block: bool) -> None:
+        futures = list(self._futures)
+        if block:
+            wait(futures)
+        for future in futures:
+            if not future.done():
+                continue
+            label = self._futures.pop(future)
+            exc = future.exception()
+            if exc is not None:
+                self._record(label, exc)
+            elif self.observer is not None:
+                self.observer(label, future.result())
+
+    def submit(self, report: ExperimentReport, label: str) -> None:
+        if self._closed:
+            raise RuntimeError("Sink is closed")
+        if self._pool is not None:
+            self._collect(block=False)
+        self._raise_failures()
+        if self._queue is not None:
+            self._queue.put((report, label))
+            return
+        assert self._pool is not None
+        self._slots.acquire()
+        future = self._pool.submit(_worker_write, report, label)
+        self._futures[future] = label
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.join()
+        else:
+            self._collect(block=True)
+        self.inner.flush()
+        self._raise_failures()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            if self._queue is not None and self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+            self.inner.close()
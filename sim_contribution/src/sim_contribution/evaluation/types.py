@@ -25,6 +25,18 @@ class StrategyResult:
             "rank_counts": dict(self.rank_counts),
         }
 
+    def summary_row(self, season: str) -> Dict[str, object]:
+        row: Dict[str, object] = {
+            "season": season,
+            "strategy": self.name,
+            "partition": " | ".join(",".join(str(m) for m in team) for team in self.partition),
+            "total_y": self.total_y,
+            "total_v_true": float(sum(team.v_true for team in self.teams)),
+        }
+        for rank, count in self.rank_counts.items():
+            row[f"rank_{rank}"] = count
+        return row
+
 
 @dataclass(frozen=True)
 class ExperimentReport:
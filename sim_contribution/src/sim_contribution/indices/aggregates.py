@@ -0,0 +1,353 @@
+"""Downdatable sufficient statistics of the Phase A indices.
+
+`IndexAggregates` holds what the interaction scores and pair profiles are
+computed from: per-coalition observation counts and y sums, per-size counts and
+y sums (the `base(|T|)` baselines) and observed pair rank counts, together with
+each match's rows. `without_match(m)` subtracts one match's contribution, so
+the indices of every leave-one-match-out fold cost O(teams in the match) on the
+sums plus one vectorized score pass, instead of a rebuild from the `SeasonLog`.
+`with_match(match)` adds a new match the same way, as a new snapshot (earlier
+snapshots stay valid; only the latest one can be extended).
+
+y sums are kept exact (`ExactSums`) and rounded once, so every fold's sums
+are `math.fsum` of its own observations, the same bits as on a rebuilt log.
+
+Coalitions are numbered in first-observation order, the iteration order of
+`compute_empirical_interaction_scores`; a fold keeps that order among its own
+observations, so strategies see their candidates exactly as on a rebuilt log.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.indices.exact_sums import ExactSums, exact_sums
+from sim_contribution.indices.pair_profile import pair_linear_index
+from sim_contribution.indices.types import InteractionScores
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.log.schema import MatchLog, SeasonLog
+from sim_contribution.observation.ranking import RANK_ORDER
+
+
+@dataclass(frozen=True)
+class FoldIndices:
+    """Indices of one fold (or of the whole log), ready for the strategies."""
+
+    coalitions: np.ndarray  # (K, k_max) sorted members, -1 padded (all coalitions of the season)
+    order: np.ndarray  # observed coalition ids in first-observation order
+    scores: np.ndarray  # (K,) interaction score, 0 for unobserved coalitions
+    size_base: np.ndarray  # base(|T|) indexed by size, 0 for unobserved sizes
+    pair_index: np.ndarray  # sorted linear indices of observed pairs
+    pair_counts: np.ndarray  # (len(pair_index), 5)
+    lookup: Optional[Dict[Tuple[int, ...], int]]  # None: built from `coalitions` on first use
+
+    @cached_property
+    def _ids(self) -> Dict[Tuple[int, ...], int]:
+        if self.lookup is not None:
+            return self.lookup
+        return {tuple(m for m in row if m >= 0): c for c, row in enumerate(self.coalitions.tolist())}
+
+    def candidates(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(members, sizes, values) in the encoding of `greedy_interaction_from_arrays`."""
+        members = self.coalitions[self.order]
+        return members, (members >= 0).sum(axis=1), self.scores[self.order]
+
+    def interaction_scores(self) -> InteractionScores:
+        keys = [tuple(m for m in row if m >= 0) for row in self.coalitions[self.order].tolist()]
+        return dict(zip(keys, self.scores[self.order].tolist()))
+
+    def score_of(self, coalition: Sequence[int]) -> float:
+        # `lookup` is shared with later snapshots, which only add ids >= K.
+        index = self._ids.get(tuple(sorted(coalition)))
+        return float(self.scores[index]) if index is not None and index < self.scores.size else 0.0
+
+    def estimated_value(self, team: Sequence[int]) -> float:
+        """`v_hat(T)` of `estimated_value_model`: base(|T|) plus unary and pair scores."""
+        members = sorted(team)
+        base = float(self.size_base[len(members)]) if len(members) < self.size_base.size else 0.0
+        value = base + sum(self.score_of((i,)) for i in members)
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                value += self.score_of((members[a], members[b]))
+        return value
+
+
+def fold_indices(
+    coalitions: np.ndarray,
+    counts: np.ndarray,
+    sums: np.ndarray,
+    size_counts: np.ndarray,
+    size_sums: np.ndarray,
+    pair_index: np.ndarray,
+    pair_counts: np.ndarray,
+    first_seen: np.ndarray,
+    lookup: Optional[Dict[Tuple[int, ...], int]],
+    alpha: float,
+) -> FoldIndices:
+    """Indices from the sufficient statistics (float counts; coalitions not observed have count 0)."""
+    size_base = np.divide(size_sums, size_counts, out=np.zeros_like(size_sums), where=size_counts > 0)
+    observed = counts > 0
+    sizes = (coalitions >= 0).sum(axis=1)
+    # Same operations as compute_empirical_interaction_scores.
+    safe = np.where(observed, counts, 1.0)
+    raw = sums / safe - size_base[sizes]
+    scores = np.where(observed, counts / (safe + alpha) * raw, 0.0)
+    ids = np.flatnonzero(observed)
+    kept_pairs = pair_counts.sum(axis=1) > 0
+    return FoldIndices(
+        coalitions=coalitions,
+        order=ids[np.argsort(first_seen[ids], kind="stable")],
+        scores=scores,
+        size_base=size_base,
+        pair_index=pair_index[kept_pairs],
+        pair_counts=pair_counts[kept_pairs],
+        lookup=lookup,
+    )
+
+
+_NO_ROW = np.iinfo(np.int64).max
+
+
+def _pair_observations(members: np.ndarray, n_players: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(row, linear pair index) of every pair inside the teams of `members`, sorted by row."""
+    empty = np.zeros(0, dtype=np.int64)
+    rows, left, right = [empty], [empty], [empty]
+    for a in range(members.shape[1]):
+        for b in range(a + 1, members.shape[1]):
+            present = np.flatnonzero((members[:, a] >= 0) & (members[:, b] >= 0))
+            rows.append(present)
+            left.append(members[present, a])
+            right.append(members[present, b])
+    row = np.concatenate(rows)
+    by_row = np.argsort(row, kind="stable")
+    return row[by_row], pair_linear_index(np.concatenate(left)[by_row], np.concatenate(right)[by_row], n_players)
+
+
+@dataclass(frozen=True)
+class IndexAggregates:
+    n_players: int
+    alpha: float
+    match_ids: np.ndarray  # (M,) match id of each match position
+    match_starts: np.ndarray  # (M + 1,) team row range of each match
+    coalitions: np.ndarray  # (K, k_max) in first-observation order
+    team_coalition: np.ndarray  # (n_teams,) coalition id of each row
+    team_size: np.ndarray
+    y: np.ndarray
+    first_row: np.ndarray  # (K,) first and second row observing each coalition
+    second_row: np.ndarray  # (_NO_ROW where there is none)
+    counts: np.ndarray  # (K,)
+    sums: np.ndarray  # (K,) y sums, rounded from `y_sums`
+    y_sums: ExactSums
+    size_counts: np.ndarray  # indexed by size
+    size_sums: np.ndarray
+    size_y_sums: ExactSums
+    pair_index: np.ndarray  # (P,) sorted linear pair indices
+    pair_counts: np.ndarray  # (P, 5)
+    pair_linear: np.ndarray  # linear pair index of each pair observation, sorted by team row
+    pair_rank: np.ndarray
+    pair_starts: np.ndarray  # (M + 1,) pair observation range of each match
+    lookup: Dict[Tuple[int, ...], int]  # append-only, shared by all snapshots
+
+    @property
+    def n_matches(self) -> int:
+        return int(self.match_ids.size)
+
+    @classmethod
+    def from_season_log(cls, season_log: SeasonLog | ColumnarSeasonLog, config: Config) -> "IndexAggregates":
+        log = season_log if isinstance(season_log, ColumnarSeasonLog) else ColumnarSeasonLog.from_season_log(season_log)
+        members = log.sorted_members()
+        n_teams = log.n_teams
+        rows = np.arange(n_teams)
+
+        starts = np.flatnonzero(np.r_[True, np.diff(log.match_id) != 0]) if n_teams else rows
+        match_ids = log.match_id[starts]
+        if np.unique(match_ids).size != match_ids.size:
+            raise ValueError("Teams of a match must be stored contiguously")
+        match_starts = np.r_[starts, n_teams]
+
+        unique, inverse = np.unique(members, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        first = np.full(unique.shape[0], n_teams, dtype=np.int64)
+        np.minimum.at(first, inverse, rows)
+        later = rows != first[inverse]
+        second = np.full(unique.shape[0], _NO_ROW, dtype=np.int64)
+        np.minimum.at(second, inverse[later], rows[later])
+        # Renumber coalitions by first observation.
+        by_first = np.argsort(first, kind="stable")
+        renumber = np.empty_like(by_first)
+        renumber[by_first] = np.arange(by_first.size)
+        coalitions = unique[by_first]
+        team_coalition = renumber[inverse]
+
+        team_size = (members >= 0).sum(axis=1)
+        n_sizes = int(team_size.max()) + 1 if n_teams else 1
+        y = np.asarray(log.y_obs, dtype=float)
+
+        pair_row, linear = _pair_observations(members, config.n_players)
+        pair_index, pair_slot = np.unique(linear, return_inverse=True)
+        pair_slot = pair_slot.reshape(-1)
+        pair_rank = log.rank[pair_row].astype(np.int64)
+        pair_counts = np.zeros((pair_index.size, len(RANK_ORDER)), dtype=np.int64)
+        np.add.at(pair_counts, (pair_slot, pair_rank), 1)
+        y_sums = exact_sums(y, team_coalition, coalitions.shape[0])
+        size_y_sums = exact_sums(y, team_size, n_sizes)
+
+        return cls(
+            n_players=config.n_players,
+            alpha=config.interaction_alpha,
+            match_ids=match_ids,
+            match_starts=match_starts,
+            coalitions=coalitions,
+            team_coalition=team_coalition,
+            team_size=team_size,
+            y=y,
+            first_row=first[by_first],
+            second_row=second[by_first],
+            counts=np.bincount(team_coalition, minlength=coalitions.shape[0]).astype(float),
+            sums=y_sums.rounded(),
+            y_sums=y_sums,
+            size_counts=np.bincount(team_size, minlength=n_sizes).astype(float),
+            size_sums=size_y_sums.rounded(),
+            size_y_sums=size_y_sums,
+            pair_index=pair_index,
+            pair_counts=pair_counts,
+            pair_linear=linear,
+            pair_rank=pair_rank,
+            pair_starts=np.searchsorted(pair_row, match_starts),
+            lookup={tuple(m for m in row if m >= 0): c for c, row in enumerate(coalitions.tolist())},
+        )
+
+    def _indices(
+        self,
+        counts: np.ndarray,
+        sums: np.ndarray,
+        size_counts: np.ndarray,
+        size_sums: np.ndarray,
+        pair_counts: np.ndarray,
+        first_seen: np.ndarray,
+    ) -> FoldIndices:
+        return fold_indices(
+            self.coalitions,
+            counts,
+            sums,
+            size_counts,
+            size_sums,
+            self.pair_index,
+            pair_counts,
+            first_seen,
+            self.lookup,
+            self.alpha,
+        )
+
+    def full(self) -> FoldIndices:
+        return self._indices(
+            self.counts, self.sums, self.size_counts, self.size_sums, self.pair_counts, self.first_row
+        )
+
+    def without_match(self, match: int) -> FoldIndices:
+        """Indices with the match at position `match` (0..n_matches-1) left out."""
+        lo, hi = int(self.match_starts[match]), int(self.match_starts[match + 1])
+        # A coalition appears at most once per match (a match is a partition).
+        dropped = self.team_coalition[lo:hi]
+        counts = self.counts.copy()
+        sums = self.sums.copy()
+        counts[dropped] -= 1.0
+        sums[dropped] = (self.y_sums.take(dropped) - exact_sums(self.y[lo:hi])).rounded()
+        size_counts = self.size_counts - np.bincount(self.team_size[lo:hi], minlength=self.size_counts.size)
+        size_sums = (
+            self.size_y_sums - exact_sums(self.y[lo:hi], self.team_size[lo:hi], self.size_counts.size)
+        ).rounded()
+        p_lo, p_hi = int(self.pair_starts[match]), int(self.pair_starts[match + 1])
+        pair_counts = self.pair_counts.copy()
+        slots = np.searchsorted(self.pair_index, self.pair_linear[p_lo:p_hi])
+        np.subtract.at(pair_counts, (slots, self.pair_rank[p_lo:p_hi]), 1)
+        first_seen = self.first_row.copy()
+        moved = dropped[first_seen[dropped] >= lo]
+        first_seen[moved] = self.second_row[moved]
+        return self._indices(counts, sums, size_counts, size_sums, pair_counts, first_seen)
+
+    def with_match(self, match: MatchLog) -> "IndexAggregates":
+        """A new snapshot with `match` appended (ranks as stored in its `TeamLog`s)."""
+        k_old = int(self.coalitions.shape[0])
+        if len(self.lookup) != k_old:
+            raise ValueError("Only the latest snapshot can be extended")
+        if np.any(self.match_ids == match.match_id):
+            raise ValueError(f"Match {match.match_id} is already in the log")
+        teams = [tuple(sorted(int(m) for m in team.members)) for team in match.teams]
+        if len(set(teams)) != len(teams):
+            raise ValueError(f"Match {match.match_id} repeats a team")
+        if not teams:
+            raise ValueError(f"Match {match.match_id} has no teams")
+        n_old = int(self.y.size)
+        y = np.array([team.y_obs for team in match.teams], dtype=float)
+        sizes = np.array([len(team) for team in teams], dtype=np.int64)
+        rank_code = {r: idx for idx, r in enumerate(RANK_ORDER)}
+        ranks = np.array([rank_code[team.rank] for team in match.teams], dtype=np.int64)
+
+        k_max = max([self.coalitions.shape[1], *sizes.tolist()])
+        members = np.full((len(teams), k_max), -1, dtype=np.int64)
+        for row, team in enumerate(teams):
+            members[row, : len(team)] = team
+        coalition = np.array([self.lookup.get(team, -1) for team in teams], dtype=np.int64)
+        new_rows = np.flatnonzero(coalition < 0)
+        coalition[new_rows] = k_old + np.arange(new_rows.size)
+        # Added to the shared lookup only once the snapshot is built, so a failed append changes nothing.
+        added = {teams[row]: int(coalition[row]) for row in new_rows.tolist()}
+        coalitions = np.full((k_old + new_rows.size, k_max), -1, dtype=np.int64)
+        coalitions[:k_old, : self.coalitions.shape[1]] = self.coalitions
+        coalitions[k_old:] = members[new_rows]
+
+        rows = n_old + np.arange(len(teams), dtype=np.int64)
+        first_row = np.r_[self.first_row, rows[new_rows]]
+        second_row = np.r_[self.second_row, np.full(new_rows.size, _NO_ROW, dtype=np.int64)]
+        seen_once = (coalition < k_old) & (second_row[coalition] == _NO_ROW)
+        second_row[coalition[seen_once]] = rows[seen_once]
+
+        n_coalitions = coalitions.shape[0]
+        n_sizes = max(self.size_counts.size, int(sizes.max(initial=0)) + 1)
+        counts = np.r_[self.counts, np.zeros(new_rows.size)] + np.bincount(coalition, minlength=n_coalitions)
+        y_sums = self.y_sums.with_groups(n_coalitions) + exact_sums(y, coalition, n_coalitions)
+        sums = np.r_[self.sums, np.zeros(new_rows.size)]
+        sums[coalition] = y_sums.take(coalition).rounded()
+        size_counts = np.zeros(n_sizes)
+        size_counts[: self.size_counts.size] = self.size_counts
+        size_counts += np.bincount(sizes, minlength=n_sizes)
+        size_y_sums = self.size_y_sums.with_groups(n_sizes) + exact_sums(y, sizes, n_sizes)
+
+        pair_row, linear = _pair_observations(members, self.n_players)
+        pair_rank = ranks[pair_row]
+        pair_index = np.union1d(self.pair_index, linear)
+        pair_counts = np.zeros((pair_index.size, len(RANK_ORDER)), dtype=np.int64)
+        pair_counts[np.searchsorted(pair_index, self.pair_index)] = self.pair_counts
+        np.add.at(pair_counts, (np.searchsorted(pair_index, linear), pair_rank), 1)
+
+        snapshot = IndexAggregates(
+            n_players=self.n_players,
+            alpha=self.alpha,
+            match_ids=np.r_[self.match_ids, match.match_id],
+            match_starts=np.r_[self.match_starts, n_old + len(teams)],
+            coalitions=coalitions,
+            team_coalition=np.r_[self.team_coalition, coalition],
+            team_size=np.r_[self.team_size, sizes],
+            y=np.r_[self.y, y],
+            first_row=first_row,
+            second_row=second_row,
+            counts=counts,
+            sums=sums,
+            y_sums=y_sums,
+            size_counts=size_counts,
+            size_sums=size_y_sums.rounded(),
+            size_y_sums=size_y_sums,
+            pair_index=pair_index,
+            pair_counts=pair_counts,
+            pair_linear=np.r_[self.pair_linear, linear],
+            pair_rank=np.r_[self.pair_rank, pair_rank],
+            pair_starts=np.r_[self.pair_starts, self.pair_starts[-1] + linear.size],
+            lookup=self.lookup,
+        )
+        self.lookup.update(added)
+        return snapshot
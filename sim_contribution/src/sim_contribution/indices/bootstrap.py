@@ -0,0 +1,280 @@
+"""Bootstrap confidence intervals of the Phase A indices.
+
+Phase A matches (or individual teams, `unit="team"`) are resampled with
+replacement `n_samples` times. A resample is a row of multinomial unit
+weights, so a block of resamples is a (samples x n_units) matrix `W`, and every
+statistic the indices are built from is a column of `W @ X`, where `X` holds
+the per-unit contributions:
+
+- coalition counts and y sums (team -> coalition indicator, times y)
+- team counts and y sums per size (for the `base(|T|)` baselines)
+- (pair, rank) cell counts of the pair profile
+
+`X` is dense when it is small (matches); otherwise (teams) the product is taken
+as grouped sums over the sparse contributions without building `X`.
+
+Scores and means are recomputed from those sums exactly as in
+`compute_empirical_interaction_scores`; a coalition missing from a resample has
+score 0 (shrinkage weight 0) and no mean. Pairs missing from a resample get the
+prior vector, as in `compute_pair_profile`. Intervals are percentile intervals
+(inverted CDF for the integer pair counts).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.indices.pair_profile import pair_from_linear_index, pair_linear_index, pair_profile_prior_vector
+from sim_contribution.indices.types import RankVector
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.observation.ranking import RANK_ORDER
+
+BOOTSTRAP_UNITS = ("match", "team")
+_BLOCK_SAMPLES = 256
+# Dense X is used while it has at most this many entries per contribution.
+_DENSE_RATIO = 32
+
+Interval = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class BootstrapIntervals:
+    n_samples: int
+    level: float
+    unit: str
+    interaction_score: Dict[Tuple[int, ...], Interval]
+    mean_y_obs: Dict[Tuple[int, ...], Interval]
+    pair_profile: Dict[Tuple[int, int], Tuple[RankVector, RankVector]]
+
+
+@dataclass(frozen=True)
+class _Design:
+    """Per-unit contributions `X` as (unit, column, value) triplets, sorted by column."""
+
+    n_units: int
+    unit: np.ndarray
+    value: np.ndarray
+    column_starts: np.ndarray
+    dense: Optional[np.ndarray]
+    coalitions: np.ndarray  # (K, k_max) sorted members, -1 padded
+    size_slot: np.ndarray  # (K,) size column of each coalition
+    n_sizes: int
+    pairs: np.ndarray  # (P,) linear indices of observed pairs
+    pair_cells: np.ndarray  # (G,) observed pair slot * 5 + rank
+    pair_group_starts: np.ndarray  # first cell of each pair slot
+
+    @property
+    def n_coalitions(self) -> int:
+        return int(self.coalitions.shape[0])
+
+    def weighted_sums(self, unit_weights: np.ndarray) -> np.ndarray:
+        """`unit_weights @ X`."""
+        if self.dense is not None:
+            return unit_weights @ self.dense
+        return np.add.reduceat(unit_weights[:, self.unit] * self.value, self.column_starts, axis=1)
+
+
+def _build_design(log: ColumnarSeasonLog, n_players: int, unit: str) -> _Design:
+    members = log.sorted_members()
+    n_teams = log.n_teams
+    if unit == "match":
+        _, team_unit = np.unique(log.match_id, return_inverse=True)
+        team_unit = team_unit.reshape(-1)
+    else:
+        team_unit = np.arange(n_teams)
+    n_units = int(team_unit.max()) + 1 if n_teams else 0
+
+    coalitions, coalition = np.unique(members, axis=0, return_inverse=True)
+    coalition = coalition.reshape(-1)
+    n_coalitions = coalitions.shape[0]
+    size_values, size = np.unique((members >= 0).sum(axis=1), return_inverse=True)
+    size = size.reshape(-1)
+    n_sizes = size_values.size
+
+    empty = np.zeros(0, dtype=np.int64)
+    rows, left, right = [empty], [empty], [empty]
+    for a in range(members.shape[1]):
+        for b in range(a + 1, members.shape[1]):
+            present = np.flatnonzero((members[:, a] >= 0) & (members[:, b] >= 0))
+            rows.append(present)
+            left.append(members[present, a])
+            right.append(members[present, b])
+    pair_rows = np.concatenate(rows)
+    pairs, pair_slot = np.unique(
+        pair_linear_index(np.concatenate(left), np.concatenate(right), n_players), return_inverse=True
+    )
+    cell = pair_slot.reshape(-1) * len(RANK_ORDER) + log.rank[pair_rows].astype(np.int64)
+    pair_cells, cell_column = np.unique(cell, return_inverse=True)
+
+    # Columns: [coalition counts | coalition y sums | size counts | size y sums | pair cells]
+    offsets = np.cumsum([0, n_coalitions, n_coalitions, n_sizes, n_sizes])
+    y = log.y_obs
+    ones = np.ones(n_teams)
+    column = np.concatenate(
+        [coalition, offsets[1] + coalition, offsets[2] + size, offsets[3] + size, offsets[4] + cell_column.reshape(-1)]
+    )
+    unit_of = np.concatenate([team_unit, team_unit, team_unit, team_unit, team_unit[pair_rows]])
+    value = np.concatenate([ones, y, ones, y, np.ones(pair_rows.size)])
+    n_columns = int(offsets[4]) + pair_cells.size
+
+    order = np.argsort(column, kind="stable")
+    column, unit_of, value = column[order], unit_of[order], value[order]
+    dense = None
+    if n_units * n_columns <= _DENSE_RATIO * column.size:
+        dense = np.zeros((n_units, n_columns))
+        np.add.at(dense, (unit_of, column), value)
+
+    return _Design(
+        n_units=n_units,
+        unit=unit_of,
+        value=value,
+        column_starts=np.flatnonzero(np.r_[True, np.diff(column) != 0]) if column.size else empty,
+        dense=dense,
+        coalitions=coalitions,
+        size_slot=np.searchsorted(size_values, (coalitions >= 0).sum(axis=1)),
+        n_sizes=n_sizes,
+        pairs=pairs,
+        pair_cells=pair_cells,
+        pair_group_starts=np.flatnonzero(np.r_[True, np.diff(pair_cells // len(RANK_ORDER)) != 0])
+        if pair_cells.size
+        else empty,
+    )
+
+
+def interaction_replicates(design: _Design, sums: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Interaction scores and mean y per coalition from rows of `design.weighted_sums`."""
+    k, s = design.n_coalitions, design.n_sizes
+    counts, y_sums = sums[:, :k], sums[:, k : 2 * k]
+    size_counts, size_sums = sums[:, 2 * k : 2 * k + s], sums[:, 2 * k + s : 2 * k + 2 * s]
+    base = np.divide(size_sums, size_counts, out=np.zeros_like(size_sums), where=size_counts > 0)[:, design.size_slot]
+    # w * (mean - base) with w = n / (n + alpha)
+    denom = counts + alpha
+    scores = np.divide(y_sums - counts * base, denom, out=np.zeros_like(y_sums), where=denom > 0)
+    means = np.divide(y_sums, counts, out=np.full_like(y_sums, np.nan), where=counts > 0)
+    return scores, means
+
+
+def pair_cell_replicates(design: _Design, sums: np.ndarray, prior: RankVector) -> Tuple[np.ndarray, np.ndarray]:
+    """Counts of the observed (pair, rank) cells and the mask of absent pairs, per row of `sums`.
+
+    Cells never observed are 0 whenever their pair is present, so only the
+    observed ones (`design.pair_cells`) are materialized.
+    """
+    cells = np.rint(sums[:, 2 * design.n_coalitions + 2 * design.n_sizes :]).astype(np.int64)
+    if cells.shape[1] == 0:
+        return cells, np.zeros((sums.shape[0], 0), dtype=bool)
+    absent = np.add.reduceat(cells, design.pair_group_starts, axis=1) == 0
+    if any(prior):
+        prior_values = np.asarray(prior, dtype=np.int64)[design.pair_cells % len(RANK_ORDER)]
+        cells = np.where(absent[:, design.pair_cells // len(RANK_ORDER)], prior_values, cells)
+    return cells, absent
+
+
+class _CountHistogram:
+    """Per-column histogram of non-negative integer replicates (exact quantiles, O(columns) memory)."""
+
+    def __init__(self, n_columns: int) -> None:
+        self.hist = np.zeros((n_columns, 1), dtype=np.int64)
+        self.n = 0
+
+    def add(self, values: np.ndarray) -> None:
+        n_columns = self.hist.shape[0]
+        top = int(values.max(initial=0)) + 1
+        if top > self.hist.shape[1]:
+            self.hist = np.pad(self.hist, ((0, 0), (0, max(top, 2 * self.hist.shape[1]) - self.hist.shape[1])))
+        width = self.hist.shape[1]
+        flat = (np.arange(n_columns, dtype=np.int64) * width + values).ravel()
+        self.hist += np.bincount(flat, minlength=n_columns * width).reshape(n_columns, width)
+        self.n += values.shape[0]
+
+    def quantile(self, q: float) -> np.ndarray:
+        target = max(int(np.ceil(q * self.n)), 1)
+        return np.argmax(np.cumsum(self.hist, axis=1) >= target, axis=1)
+
+
+def _percentiles(values: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+    """(len(qs), columns) percentiles with linear interpolation, ignoring NaN (NaN for all-NaN columns)."""
+    ordered = np.sort(values, axis=0)
+    valid = (~np.isnan(values)).sum(axis=0)
+    last = np.maximum(valid - 1, 0)
+    position = np.asarray(qs, dtype=float)[:, None] * last[None, :]
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, last[None, :])
+    low = np.take_along_axis(ordered, below, axis=0)
+    high = np.take_along_axis(ordered, above, axis=0)
+    return np.where(valid > 0, low + (high - low) * (position - below), np.nan)
+
+
+def _absent_cell_quantile(absent_counts: np.ndarray, prior: RankVector, n: int, q: float) -> np.ndarray:
+    """Quantile of a cell that is 0 when its pair is present and the prior value when absent."""
+    target = max(int(np.ceil(q * n)), 1)
+    prior_values = np.asarray(prior, dtype=np.int64)
+    return np.where((target > n - absent_counts)[:, None], prior_values[None, :], 0)
+
+
+def bootstrap_indices(
+    season_log: SeasonLog | ColumnarSeasonLog,
+    config: Config,
+    n_samples: Optional[int] = None,
+    unit: Optional[str] = None,
+    level: Optional[float] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> BootstrapIntervals:
+    """Percentile intervals of the interaction scores, mean y and pair rank counts.
+
+    Defaults come from `config.bootstrap_*`.
+    """
+    n_samples = config.bootstrap_samples if n_samples is None else n_samples
+    unit = config.bootstrap_unit if unit is None else unit
+    level = config.bootstrap_level if level is None else level
+    rng = np.random.default_rng(config.bootstrap_seed) if rng is None else rng
+    if unit not in BOOTSTRAP_UNITS:
+        raise ValueError(f"Unknown bootstrap unit: {unit}")
+    if n_samples <= 0:
+        raise ValueError("n_samples must be positive")
+    if not 0.0 < level < 1.0:
+        raise ValueError("level must be in (0, 1)")
+
+    log = season_log if isinstance(season_log, ColumnarSeasonLog) else ColumnarSeasonLog.from_season_log(season_log)
+    design = _build_design(log, config.n_players, unit)
+    prior = pair_profile_prior_vector(config)
+
+    scores = np.empty((n_samples, design.n_coalitions))
+    means = np.empty((n_samples, design.n_coalitions))
+    pair_hist = _CountHistogram(design.pair_cells.size)
+    absent_counts = np.zeros(design.pairs.size, dtype=np.int64)
+    probabilities = np.full(design.n_units, 1.0 / max(design.n_units, 1))
+    for start in range(0, n_samples, _BLOCK_SAMPLES):
+        stop = min(start + _BLOCK_SAMPLES, n_samples)
+        unit_weights = rng.multinomial(design.n_units, probabilities, size=stop - start).astype(float)
+        sums = design.weighted_sums(unit_weights)
+        scores[start:stop], means[start:stop] = interaction_replicates(design, sums, config.interaction_alpha)
+        cells, absent = pair_cell_replicates(design, sums, prior)
+        pair_hist.add(cells)
+        absent_counts += absent.sum(axis=0)
+
+    tail = (1.0 - level) / 2.0
+    score_lo, score_hi = _percentiles(scores, (tail, 1.0 - tail))
+    mean_lo, mean_hi = _percentiles(means, (tail, 1.0 - tail))
+    pair_lo = _absent_cell_quantile(absent_counts, prior, n_samples, tail)
+    pair_hi = _absent_cell_quantile(absent_counts, prior, n_samples, 1.0 - tail)
+    pair_lo.reshape(-1)[design.pair_cells] = pair_hist.quantile(tail)
+    pair_hi.reshape(-1)[design.pair_cells] = pair_hist.quantile(1.0 - tail)
+
+    keys = [tuple(m for m in row if m >= 0) for row in design.coalitions.tolist()]
+    pair_i, pair_j = pair_from_linear_index(design.pairs, config.n_players)
+    return BootstrapIntervals(
+        n_samples=n_samples,
+        level=level,
+        unit=unit,
+        interaction_score={key: (float(score_lo[c]), float(score_hi[c])) for c, key in enumerate(keys)},
+        mean_y_obs={key: (float(mean_lo[c]), float(mean_hi[c])) for c, key in enumerate(keys)},
+        pair_profile={
+            (int(i), int(j)): (tuple(int(v) for v in pair_lo[p]), tuple(int(v) for v in pair_hi[p]))
+            for p, (i, j) in enumerate(zip(pair_i.tolist(), pair_j.tolist()))
+        },
+    )
@@ -2,9 +2,13 @@
 
 This is an observational, decision-making proxy. It is NOT the true contribution
 metric used in later research, and it should not be interpreted as such.
+
+y sums are `math.fsum` (correctly rounded), so they do not depend on the order
+of the observations; `indices/partials.py` reproduces them from any chunking.
 """
 from __future__ import annotations
 
+import math
 from collections import defaultdict
 from typing import Dict, List, Tuple
 
@@ -22,23 +26,33 @@ def _collect_team_observations(season_log: SeasonLog) -> Dict[Tuple[int, ...], L
     return observations
 
 
-def compute_empirical_interaction_scores(
-    season_log: SeasonLog, config: Config
-) -> InteractionScores:
-    observations = _collect_team_observations(season_log)
-
+def _size_means(observations: Dict[Tuple[int, ...], List[float]]) -> Dict[int, float]:
     size_totals: Dict[int, List[float]] = defaultdict(list)
     for team_key, values in observations.items():
         size_totals[len(team_key)].extend(values)
 
-    size_means: Dict[int, float] = {
-        size: (sum(vals) / len(vals) if vals else 0.0) for size, vals in size_totals.items()
-    }
+    return {size: (math.fsum(vals) / len(vals) if vals else 0.0) for size, vals in size_totals.items()}
+
+
+def compute_size_baselines(season_log: SeasonLog) -> Dict[int, float]:
+    """`base(|T|)`: mean observed y of teams with the same size."""
+    return _size_means(_collect_team_observations(season_log))
+
+
+def compute_empirical_interaction_scores(
+    season_log: SeasonLog, config: Config
+) -> InteractionScores:
+    if config.index_workers > 1:
+        from sim_contribution.indices.partials import season_index_partial
+
+        return season_index_partial(season_log, config).fold_indices(config).interaction_scores()
+    observations = _collect_team_observations(season_log)
+    size_means = _size_means(observations)
 
     scores: InteractionScores = {}
     for team_key, values in observations.items():
         n_obs = len(values)
-        mean_y = sum(values) / n_obs if n_obs > 0 else 0.0
+        mean_y = math.fsum(values) / n_obs if n_obs > 0 else 0.0
         base = size_means.get(len(team_key), 0.0)
         raw = mean_y - base
         w = n_obs / (n_obs + config.interaction_alpha)
@@ -0,0 +1,162 @@
+"""Grouped float64 sums that are exact, so they merge in any order and chunking.
+
+A finite value m * 2**e (m an integer of at most 53 bits) is spread over
+32-bit limbs of one fixed binary grid: limb q holds bits 32q..32q+31 of the
+value scaled by 2**_OFFSET. Grouped sums are int64 limb sums, which add and
+subtract exactly whatever the order; `ExactSums.rounded` converts each group's
+total to the nearest float64 (ties to even), i.e. `math.fsum` of the group's
+values. Each value adds less than 2**33 to a limb, so a group holds up to 2**30
+values; results in the subnormal range may be off by one unit in the last place.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Smallest exponent e of m * 2**e over finite doubles (subnormals included) is -1126.
+_OFFSET = 1126
+_LIMB_BITS = 32
+_LIMB_MASK = (1 << _LIMB_BITS) - 1
+
+
+@dataclass(frozen=True)
+class ExactSums:
+    base: int  # grid index of limbs[:, 0]
+    limbs: np.ndarray  # (groups, L) int64
+
+    @property
+    def n_groups(self) -> int:
+        return int(self.limbs.shape[0])
+
+    def _window(self, base: int, width: int) -> np.ndarray:
+        out = np.zeros((self.n_groups, width), dtype=np.int64)
+        start = self.base - base
+        out[:, start : start + self.limbs.shape[1]] = self.limbs
+        return out
+
+    def _aligned(self, other: "ExactSums") -> tuple:
+        base = min(self.base, other.base)
+        width = max(self.base + self.limbs.shape[1], other.base + other.limbs.shape[1]) - base
+        return base, self._window(base, width), other._window(base, width)
+
+    def __add__(self, other: "ExactSums") -> "ExactSums":
+        base, a, b = self._aligned(other)
+        return ExactSums(base, a + b)
+
+    def __sub__(self, other: "ExactSums") -> "ExactSums":
+        base, a, b = self._aligned(other)
+        return ExactSums(base, a - b)
+
+    def take(self, groups: np.ndarray) -> "ExactSums":
+        return ExactSums(self.base, self.limbs[groups])
+
+    def with_groups(self, n_groups: int) -> "ExactSums":
+        """The same sums padded with empty groups up to `n_groups`."""
+        limbs = np.zeros((n_groups, self.limbs.shape[1]), dtype=np.int64)
+        limbs[: self.n_groups] = self.limbs
+        return ExactSums(self.base, limbs)
+
+    def grouped(self, groups: np.ndarray, n_groups: int) -> "ExactSums":
+        """Sums of the rows of each group (row r adds into group `groups[r]`)."""
+        limbs = np.zeros((n_groups, self.limbs.shape[1]), dtype=np.int64)
+        np.add.at(limbs, np.asarray(groups, dtype=np.int64), self.limbs)
+        return ExactSums(self.base, limbs)
+
+    def rounded(self) -> np.ndarray:
+        """Each group's sum rounded to the nearest float64."""
+        n = self.n_groups
+        if n == 0 or self.limbs.shape[1] == 0:
+            return np.zeros(n)
+        # Two zero limbs below (so three limbs always exist from the top one down)
+        # and two above (room for the carries).
+        limbs = np.zeros((n, self.limbs.shape[1] + 4), dtype=np.int64)
+        limbs[:, 2:-2] = self.limbs
+        base = self.base - 2
+        _normalize(limbs)
+        negative = limbs[:, -1] < 0
+        if negative.any():
+            limbs[negative] = -limbs[negative]
+            _normalize(limbs)
+
+        nonzero = limbs != 0
+        top = limbs.shape[1] - 1 - np.argmax(nonzero[:, ::-1], axis=1)
+        rows = np.arange(n)
+        t2 = limbs[rows, top].astype(np.uint64)
+        t1 = limbs[rows, np.maximum(top - 1, 0)].astype(np.uint64)
+        t0 = limbs[rows, np.maximum(top - 2, 0)].astype(np.uint64)
+        below = np.cumsum(nonzero, axis=1)
+        sticky = (top >= 3) & (below[rows, np.maximum(top - 3, 0)] > 0)
+
+        hi = (t2 << np.uint64(_LIMB_BITS)) | t1
+        bits = np.frexp(t2.astype(float))[1].astype(np.int64) + _LIMB_BITS  # bit length of hi, 33..64
+        # Mantissa: the leading 53 bits of hi:t0; the rest decides the rounding.
+        from_hi = bits > 53
+        shift_hi = np.where(from_hi, bits - 53, 0).astype(np.uint64)
+        take_lo = np.where(from_hi, 0, 53 - bits).astype(np.uint64)
+        mantissa = np.where(
+            from_hi,
+            hi >> shift_hi,
+            (hi << take_lo) | (t0 >> (np.uint64(_LIMB_BITS) - take_lo)),
+        )
+        one = np.uint64(1)
+        rest_bits = np.where(from_hi, shift_hi, np.uint64(_LIMB_BITS) - take_lo)
+        rest = np.where(from_hi, hi & ((one << shift_hi) - one), t0 & ((one << rest_bits) - one))
+        half = one << (rest_bits - one)
+        sticky = sticky | np.where(from_hi, t0 != 0, False)
+        up = (rest > half) | ((rest == half) & (sticky | ((mantissa & one) == one)))
+        mantissa = mantissa + up.astype(np.uint64)
+
+        # hi:t0 is scaled by the grid position of limb top - 2.
+        exponent = _LIMB_BITS * (top - 2 + base) - _OFFSET + np.where(from_hi, _LIMB_BITS + bits - 53, _LIMB_BITS - (53 - bits))
+        values = np.ldexp(mantissa.astype(float), exponent)
+        values[~nonzero.any(axis=1)] = 0.0
+        return np.where(negative, -values, values)
+
+
+def stack(parts: Sequence[ExactSums]) -> ExactSums:
+    """The groups of all `parts`, one after the other."""
+    base = min(p.base for p in parts)
+    width = max(p.base + p.limbs.shape[1] for p in parts) - base
+    return ExactSums(base, np.concatenate([p._window(base, width) for p in parts]))
+
+
+def _normalize(limbs: np.ndarray) -> None:
+    """Carry in place so every limb but the last is in [0, 2**32)."""
+    for j in range(limbs.shape[1] - 1):
+        carry = limbs[:, j] >> _LIMB_BITS
+        limbs[:, j] -= carry << _LIMB_BITS
+        limbs[:, j + 1] += carry
+
+
+def exact_sums(values: np.ndarray, groups: Optional[np.ndarray] = None, n_groups: Optional[int] = None) -> ExactSums:
+    """Exact sums of `values` per group (`groups[i]` in 0..n_groups-1; default: one group per value)."""
+    values = np.asarray(values, dtype=float).reshape(-1)
+    if not np.all(np.isfinite(values)):
+        raise ValueError("Exact sums need finite values")
+    if groups is None:
+        groups = np.arange(values.size)
+        n_groups = values.size if n_groups is None else n_groups
+    groups = np.asarray(groups, dtype=np.int64).reshape(-1)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if groups.size else 0
+
+    fraction, exponent = np.frexp(values)
+    mantissa = np.ldexp(fraction, 53).astype(np.int64)  # exact: |mantissa| < 2**53
+    position = exponent.astype(np.int64) - 53 + _OFFSET
+    limb = position // _LIMB_BITS
+    shift = position % _LIMB_BITS
+    # mantissa = high * 2**32 + low, 0 <= low < 2**32; low << shift < 2**63.
+    low = (mantissa & _LIMB_MASK) << shift
+    high = (mantissa >> _LIMB_BITS) << shift
+
+    if values.size == 0:
+        return ExactSums(0, np.zeros((n_groups, 0), dtype=np.int64))
+    base = int(limb.min())
+    limbs = np.zeros((n_groups, int(limb.max()) - base + 3), dtype=np.int64)
+    column = limb - base
+    np.add.at(limbs, (groups, column), low & _LIMB_MASK)
+    np.add.at(limbs, (groups, column + 1), (low >> _LIMB_BITS) + (high & _LIMB_MASK))
+    np.add.at(limbs, (groups, column + 2), high >> _LIMB_BITS)
+    return ExactSums(base, limbs)
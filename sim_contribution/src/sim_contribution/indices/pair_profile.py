@@ -3,13 +3,33 @@ from __future__ import annotations
 from collections import defaultdict
 from typing import Dict, Tuple
 
+import numpy as np
+
 from sim_contribution.config import Config
 from sim_contribution.indices.types import PairProfile, RankVector
 from sim_contribution.log.schema import SeasonLog
 from sim_contribution.observation.ranking import RANK_ORDER
 
 
+def pair_profile_prior_vector(config: Config) -> RankVector:
+    """Rank vector assigned to pairs never observed together."""
+    if config.pair_profile_prior == "uniform" and config.pair_profile_prior_strength > 0:
+        base = int(config.pair_profile_prior_strength)
+        return (base, base, base, base, base)
+    return (0, 0, 0, 0, 0)
+
+
 def compute_pair_profile(season_log: SeasonLog, config: Config) -> PairProfile:
+    if config.index_workers > 1:
+        prior = pair_profile_prior_vector(config)
+        n = config.n_players
+        profile = {(i, j): prior for i in range(n) for j in range(i + 1, n)}
+        index, observed = observed_pair_counts(season_log, config)
+        left, right = pair_from_linear_index(index, n)
+        for i, j, vec in zip(left.tolist(), right.tolist(), observed.tolist()):
+            profile[(i, j)] = tuple(vec)
+        return profile
+
     counts: Dict[Tuple[int, int], Dict[str, int]] = defaultdict(lambda: {r: 0 for r in RANK_ORDER})
 
     for match in season_log.matches:
@@ -21,6 +41,7 @@ def compute_pair_profile(season_log: SeasonLog, config: Config) -> PairProfile:
                     key = (min(i, j), max(i, j))
                     counts[key][team.rank] += 1
 
+    prior = pair_profile_prior_vector(config)
     profile: PairProfile = {}
     for i in range(config.n_players):
         for j in range(i + 1, config.n_players):
@@ -28,10 +49,62 @@ def compute_pair_profile(season_log: SeasonLog, config: Config) -> PairProfile:
             if key in counts:
                 vec = tuple(counts[key][r] for r in RANK_ORDER)
             else:
-                if config.pair_profile_prior == "uniform" and config.pair_profile_prior_strength > 0:
-                    base = int(config.pair_profile_prior_strength)
-                    vec = (base, base, base, base, base)
-                else:
-                    vec = (0, 0, 0, 0, 0)
+                vec = prior
             profile[key] = vec
     return profile
+
+
+def pair_offsets(n_players: int) -> np.ndarray:
+    """Row offsets of the upper-triangular pair enumeration (0,1), (0,2), ..., (n-2,n-1)."""
+    i = np.arange(n_players, dtype=np.int64)
+    return i * (2 * n_players - i - 1) // 2
+
+
+def pair_linear_index(i: np.ndarray, j: np.ndarray, n_players: int) -> np.ndarray:
+    lo = np.minimum(i, j)
+    hi = np.maximum(i, j)
+    return pair_offsets(n_players)[lo] + (hi - lo - 1)
+
+
+def pair_from_linear_index(index: np.ndarray, n_players: int) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = pair_offsets(n_players)
+    i = np.searchsorted(offsets, index, side="right") - 1
+    j = index - offsets[i] + i + 1
+    return i, j
+
+
+def compute_observed_pair_counts(season_log: SeasonLog, n_players: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rank counts of observed pairs only (no prior, no unobserved pairs).
+
+    Returns `(index, counts)` where `index` holds the sorted linear pair indices
+    (see `pair_linear_index`) and `counts[p]` the (A,B,C,D,E) counts of pair `index[p]`.
+    """
+    rank_code = {r: idx for idx, r in enumerate(RANK_ORDER)}
+    left, right, codes = [], [], []
+    for match in season_log.matches:
+        for team in match.teams:
+            members = team.members
+            code = rank_code[team.rank]
+            for i_idx in range(len(members)):
+                for j_idx in range(i_idx + 1, len(members)):
+                    left.append(members[i_idx])
+                    right.append(members[j_idx])
+                    codes.append(code)
+
+    linear = pair_linear_index(
+        np.asarray(left, dtype=np.int64), np.asarray(right, dtype=np.int64), n_players
+    )
+    index, inverse = np.unique(linear, return_inverse=True)
+    counts = np.zeros((index.size, len(RANK_ORDER)), dtype=np.int64)
+    np.add.at(counts, (inverse, np.asarray(codes, dtype=np.int64)), 1)
+    return index, counts
+
+
+def observed_pair_counts(season_log: SeasonLog, config: Config) -> Tuple[np.ndarray, np.ndarray]:
+    """`compute_observed_pair_counts`, from `indices/partials.py` when `config.index_workers > 1`."""
+    if config.index_workers > 1:
+        from sim_contribution.indices.partials import season_index_partial
+
+        partial = season_index_partial(season_log, config)
+        return partial.pair_index, partial.pair_counts
+    return compute_observed_pair_counts(season_log, config.n_players)
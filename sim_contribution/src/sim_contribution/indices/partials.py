@@ -0,0 +1,211 @@
+"""Mergeable partial aggregates of the Phase A indices (map-reduce over log chunks).
+
+An `IndexPartial` holds the sufficient statistics of `IndexAggregates` for a
+range of team rows, keyed sparsely: per coalition (members packed into one
+int64 key) the count, y sum and first row; per size the count and y sum; per
+observed pair (linear pair index) the (A,B,C,D,E) counts. y sums are exact
+(`ExactSums`). `merge_partials` merges by key: counts and sums add, first
+rows take the minimum; nothing is rounded until `fold_indices`.
+
+`compute_index_partials` cuts a log into chunks of `chunk_teams` rows, builds
+their partials (in a process pool with `workers > 1`, the log published once
+in shared memory) and merges them. Since every statistic is exact, the
+indices are bit for bit those of `IndexAggregates` and
+`compute_empirical_interaction_scores` (whose y sums are `math.fsum`) for any
+`chunk_teams` and `workers`. `season_index_partial` runs it with the
+config's `index_chunk_teams` and `index_workers`; the index builders
+(`compute_empirical_interaction_scores`, `compute_pair_profile`,
+`observed_pair_counts`, and `interaction_candidates` for the greedy and
+max-weight strategies) use it when `index_workers > 1`.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.indices.aggregates import FoldIndices, _pair_observations, fold_indices
+from sim_contribution.indices.exact_sums import ExactSums, exact_sums, stack
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.observation.ranking import RANK_ORDER
+from sim_contribution.parallel.shared_memory import SharedArrayStore, attach_season_log, publish_season_log
+
+DEFAULT_CHUNK_TEAMS = 1 << 18
+
+
+@dataclass(frozen=True)
+class IndexPartial:
+    n_players: int
+    k_max: int
+    coalition_keys: np.ndarray  # (K,) sorted packed keys (see `pack_coalitions`)
+    counts: np.ndarray  # (K,) int64
+    sums: ExactSums  # (K,) y sums
+    first_row: np.ndarray  # (K,) first team row (of the whole log) observing each coalition
+    size_counts: np.ndarray  # (k_max + 1,) int64, indexed by size
+    size_sums: ExactSums
+    pair_index: np.ndarray  # (P,) sorted linear pair indices
+    pair_counts: np.ndarray  # (P, 5) int64
+
+    def coalitions(self) -> np.ndarray:
+        return unpack_coalitions(self.coalition_keys, self.n_players, self.k_max)
+
+    def fold_indices(self, config: Config) -> FoldIndices:
+        """Indices of the merged log, as `IndexAggregates.full()`."""
+        by_first = np.argsort(self.first_row, kind="stable")
+        return fold_indices(
+            unpack_coalitions(self.coalition_keys[by_first], self.n_players, self.k_max),
+            self.counts[by_first].astype(float),
+            self.sums.take(by_first).rounded(),
+            self.size_counts.astype(float),
+            self.size_sums.rounded(),
+            self.pair_index,
+            self.pair_counts,
+            np.arange(by_first.size),
+            None,
+            config.interaction_alpha,
+        )
+
+
+def _check_packable(n_players: int, k_max: int) -> None:
+    if k_max * np.log2(n_players + 1) >= 63:
+        raise ValueError(f"Coalitions of {k_max} out of {n_players} players do not fit an int64 key")
+
+
+def pack_coalitions(members: np.ndarray, n_players: int) -> np.ndarray:
+    """One int64 per row of sorted, -1 padded members (digits m + 1 in base n_players + 1, first member highest)."""
+    _check_packable(n_players, members.shape[1])
+    keys = np.zeros(members.shape[0], dtype=np.int64)
+    for a in range(members.shape[1]):
+        keys = keys * (n_players + 1) + (members[:, a].astype(np.int64) + 1)
+    return keys
+
+
+def unpack_coalitions(keys: np.ndarray, n_players: int, k_max: int) -> np.ndarray:
+    members = np.empty((keys.size, k_max), dtype=np.int64)
+    rest = keys.copy()
+    for a in range(k_max - 1, -1, -1):
+        rest, digit = np.divmod(rest, n_players + 1)
+        members[:, a] = digit - 1
+    return members
+
+
+def index_partial(log: ColumnarSeasonLog, n_players: int, k_max: int, row_offset: int = 0) -> IndexPartial:
+    """Partial of every row of `log`; `row_offset` is the position of its first row in the whole log."""
+    return partial_from_arrays(log.sorted_members(), log.y_obs, log.rank, n_players, k_max, row_offset)
+
+
+def partial_from_arrays(
+    sorted_members: np.ndarray, y_obs: np.ndarray, rank: np.ndarray, n_players: int, k_max: int, row_offset: int = 0
+) -> IndexPartial:
+    """Partial of team rows given as columns (members sorted per row, -1 padded at the end)."""
+    members = np.full((sorted_members.shape[0], k_max), -1, dtype=np.int64)
+    members[:, : sorted_members.shape[1]] = sorted_members
+    keys = pack_coalitions(members, n_players)
+    coalition_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    y = np.asarray(y_obs, dtype=float)
+    sizes = (members >= 0).sum(axis=1)
+
+    pair_row, linear = _pair_observations(members, n_players)
+    pair_index, pair_slot = np.unique(linear, return_inverse=True)
+    pair_counts = np.zeros((pair_index.size, len(RANK_ORDER)), dtype=np.int64)
+    np.add.at(pair_counts, (pair_slot.reshape(-1), np.asarray(rank)[pair_row].astype(np.int64)), 1)
+
+    return IndexPartial(
+        n_players=n_players,
+        k_max=k_max,
+        coalition_keys=coalition_keys,
+        counts=np.bincount(inverse, minlength=coalition_keys.size).astype(np.int64),
+        sums=exact_sums(y, inverse, coalition_keys.size),
+        first_row=first.astype(np.int64) + row_offset,
+        size_counts=np.bincount(sizes, minlength=k_max + 1).astype(np.int64),
+        size_sums=exact_sums(y, sizes, k_max + 1),
+        pair_index=pair_index,
+        pair_counts=pair_counts,
+    )
+
+
+def merge_partials(partials: Sequence[IndexPartial]) -> IndexPartial:
+    """Merge by key (exact, so the order of `partials` does not matter)."""
+    if not partials:
+        raise ValueError("No partials to merge")
+    n_players, k_max = partials[0].n_players, partials[0].k_max
+    if any(p.n_players != n_players or p.k_max != k_max for p in partials):
+        raise ValueError("Partials of different n_players or k_max cannot be merged")
+    if len(partials) == 1:
+        return partials[0]
+
+    coalition_keys, inverse = np.unique(np.concatenate([p.coalition_keys for p in partials]), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.zeros(coalition_keys.size, dtype=np.int64)
+    np.add.at(counts, inverse, np.concatenate([p.counts for p in partials]))
+    sums = stack([p.sums for p in partials]).grouped(inverse, coalition_keys.size)
+    first_row = np.full(coalition_keys.size, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first_row, inverse, np.concatenate([p.first_row for p in partials]))
+
+    size_counts = np.zeros(k_max + 1, dtype=np.int64)
+    size_sums = partials[0].size_sums
+    for p in partials:
+        size_counts += p.size_counts
+    for p in partials[1:]:
+        size_sums = size_sums + p.size_sums
+
+    pair_index, pair_slot = np.unique(np.concatenate([p.pair_index for p in partials]), return_inverse=True)
+    pair_counts = np.zeros((pair_index.size, len(RANK_ORDER)), dtype=np.int64)
+    np.add.at(pair_counts, pair_slot.reshape(-1), np.concatenate([p.pair_counts for p in partials]))
+
+    return IndexPartial(
+        n_players=n_players,
+        k_max=k_max,
+        coalition_keys=coalition_keys,
+        counts=counts,
+        sums=sums,
+        first_row=first_row,
+        size_counts=size_counts,
+        size_sums=size_sums,
+        pair_index=pair_index,
+        pair_counts=pair_counts,
+    )
+
+
+def chunk_bounds(n_teams: int, chunk_teams: int) -> List[Tuple[int, int]]:
+    if chunk_teams < 1:
+        raise ValueError(f"chunk_teams must be positive, got {chunk_teams}")
+    return [(start, min(start + chunk_teams, n_teams)) for start in range(0, max(n_teams, 1), chunk_teams)]
+
+
+def _partial_task(args: tuple) -> IndexPartial:
+    handle, start, stop, n_players, k_max = args
+    return index_partial(attach_season_log(handle).rows(start, stop), n_players, k_max, row_offset=start)
+
+
+def compute_index_partials(
+    season_log: SeasonLog | ColumnarSeasonLog,
+    config: Config,
+    chunk_teams: int = DEFAULT_CHUNK_TEAMS,
+    workers: int = 1,
+) -> IndexPartial:
+    """Merged partial of the whole log, mapped over chunks of `chunk_teams` rows."""
+    log = season_log if isinstance(season_log, ColumnarSeasonLog) else ColumnarSeasonLog.from_season_log(season_log)
+    n_players, k_max = config.n_players, int(log.members.shape[1])
+    _check_packable(n_players, k_max)
+    bounds = chunk_bounds(log.n_teams, chunk_teams)
+    if workers <= 1 or len(bounds) == 1:
+        partials = [index_partial(log.rows(start, stop), n_players, k_max, start) for start, stop in bounds]
+        return merge_partials(partials)
+
+    with SharedArrayStore() as store:
+        handle = publish_season_log(store, log)
+        tasks = [(handle, start, stop, n_players, k_max) for start, stop in bounds]
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            partials = list(pool.map(_partial_task, tasks))
+    return merge_partials(partials)
+
+
+def season_index_partial(season_log: SeasonLog | ColumnarSeasonLog, config: Config) -> IndexPartial:
+    """`compute_index_partials` with the config's `index_chunk_teams` and `index_workers`."""
+    return compute_index_partials(season_log, config, config.index_chunk_teams, config.index_workers)
@@ -0,0 +1,382 @@
+"""On-disk season archive: chunked, memory-mapped team records with predicate pushdown.
+
+One row per team record: the Phase A teams of a season (strategy
+`PHASE_A_STRATEGY`) and the Phase B teams of each strategy's partition
+(match_id -1). Rows are stored in chunk directories of whole seasons:
+
+    root/chunk_000000/meta.json    rows, strategy code table, zone map (seed range,
+                                   config hashes, strategies, team sizes, k_max,
+                                   max player id)
+    root/chunk_000000/seasons.json Phase A stats of its seasons (read by `iter_seasons` only)
+    root/chunk_000000/<column>.npy one file per column of `COLUMNS`
+
+`ArchiveWriter` buffers whole seasons and writes a chunk once `chunk_rows`
+rows are buffered (into a temporary directory renamed into place, so readers
+never see partial chunks). `SeasonArchive.scan` memory-maps the columns of
+each chunk (`np.load(mmap_mode="r")`), skips chunks whose zone map excludes
+the `ArchiveFilter`, evaluates the predicate on the filter's columns and
+copies only the selected rows of the requested columns, `batch_rows` rows
+of the chunk at a time. Memory is bounded by the batch (and, for
+`iter_seasons`, one season), not by the archive.
+
+The breakdown of v(T) is not archived; logs rebuilt by `iter_seasons` carry
+NaN breakdowns.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.log.schema import SeasonLog, TeamLog
+from sim_contribution.observation.ranking import RANK_ORDER
+from sim_contribution.observation.types import PhaseAStats
+from sim_contribution.production.types import BREAKDOWN_KEYS
+
+META_FILENAME = "meta.json"
+SEASONS_FILENAME = "seasons.json"
+PHASE_A_STRATEGY = "phase_a"
+DEFAULT_CHUNK_ROWS = 1 << 20
+DEFAULT_BATCH_ROWS = 1 << 18
+
+COLUMN_DTYPES: Dict[str, str] = {
+    "seed": "int64",
+    "config_hash": "int64",
+    "strategy": "int16",  # code into the chunk's `strategies`
+    "match_id": "int32",
+    "team_id": "int32",
+    "size": "int8",
+    "members": "int32",  # (rows, k_max), sorted, -1 padded
+    "y_obs": "float64",
+    "v_true": "float64",
+    "z": "float64",
+    "rank": "int8",  # code into RANK_ORDER
+}
+COLUMNS = tuple(COLUMN_DTYPES)
+# `Config` fields left out of `config_hash`: how a season is computed (worker
+# counts, chunk sizes, the online scheduler's wall-clock budget, where the
+# schedule library lives), not what is simulated.
+EXECUTION_FIELDS = ("index_workers", "index_chunk_teams", "online_decision_seconds", "schedule_library")
+
+
+def config_hash(config: Config) -> int:
+    """Stable 63-bit hash of the `Config` fields other than `EXECUTION_FIELDS`."""
+    fields = dataclasses.asdict(config)
+    for name in EXECUTION_FIELDS:
+        del fields[name]
+    text = json.dumps(fields, sort_keys=True, default=str)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+
+def _season_key(config_hash_value: int, seed: int) -> str:
+    return f"{config_hash_value}:{seed}"
+
+
+def _team_columns(teams: Sequence[TeamLog]) -> Dict[str, np.ndarray]:
+    k_max = max((len(team.members) for team in teams), default=0)
+    members = np.full((len(teams), k_max), -1, dtype=np.int32)
+    for row, team in enumerate(teams):
+        members[row, : len(team.members)] = sorted(team.members)
+    rank_code = {r: idx for idx, r in enumerate(RANK_ORDER)}
+    return {
+        "match_id": np.array([team.match_id for team in teams], dtype=np.int32),
+        "team_id": np.array([team.team_id for team in teams], dtype=np.int32),
+        "size": np.array([len(team.members) for team in teams], dtype=np.int8),
+        "members": members,
+        "y_obs": np.array([team.y_obs for team in teams], dtype=float),
+        "v_true": np.array([team.v_true for team in teams], dtype=float),
+        "z": np.array([team.z for team in teams], dtype=float),
+        "rank": np.array([rank_code[team.rank] for team in teams], dtype=np.int8),
+    }
+
+
+class ArchiveWriter:
+    """Appends seasons to the archive at `root`; chunks are named `<prefix>_<n>`.
+
+    Concurrent writers into one archive need distinct prefixes.
+    """
+
+    def __init__(self, root: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, prefix: str = "chunk") -> None:
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.prefix = prefix
+        os.makedirs(root, exist_ok=True)
+        existing = [name[len(prefix) + 1 :] for name in os.listdir(root) if name.startswith(f"{prefix}_")]
+        self._next_chunk = max((int(n) + 1 for n in existing if n.isdigit()), default=0)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._parts: List[Dict[str, np.ndarray]] = []
+        self._rows = 0
+        self._strategies: Dict[str, int] = {}
+        self._seasons: Dict[str, dict] = {}
+
+    def _append(self, seed: int, hash_value: int, strategy: str, teams: Sequence[TeamLog]) -> None:
+        if not teams:
+            return
+        columns = _team_columns(teams)
+        rows = len(teams)
+        code = self._strategies.setdefault(strategy, len(self._strategies))
+        columns["seed"] = np.full(rows, seed, dtype=np.int64)
+        columns["config_hash"] = np.full(rows, hash_value, dtype=np.int64)
+        columns["strategy"] = np.full(rows, code, dtype=np.int16)
+        self._parts.append(columns)
+        self._rows += rows
+
+    def add_season(
+        self,
+        seed: int,
+        config: Config,
+        season_log: SeasonLog,
+        strategy_results: Sequence = (),
+    ) -> None:
+        """Phase A teams of `season_log` and the teams of each `StrategyResult`."""
+        hash_value = config_hash(config)
+        self._append(seed, hash_value, PHASE_A_STRATEGY, [team for match in season_log.matches for team in match.teams])
+        for result in strategy_results:
+            if result.name == PHASE_A_STRATEGY:
+                raise ValueError(f"Strategy name {PHASE_A_STRATEGY!r} is reserved for Phase A rows")
+            self._append(seed, hash_value, result.name, result.teams)
+        self._seasons[_season_key(hash_value, seed)] = season_log.phase_a_stats.to_dict()
+        if self._rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._parts:
+            return
+        k_max = max(part["members"].shape[1] for part in self._parts)
+        columns: Dict[str, np.ndarray] = {}
+        for name, dtype in COLUMN_DTYPES.items():
+            if name == "members":
+                columns[name] = np.full((self._rows, k_max), -1, dtype=dtype)
+                start = 0
+                for part in self._parts:
+                    columns[name][start : start + len(part[name]), : part[name].shape[1]] = part[name]
+                    start += len(part[name])
+            else:
+                columns[name] = np.concatenate([part[name] for part in self._parts]).astype(dtype, copy=False)
+        meta = {
+            "rows": self._rows,
+            "k_max": k_max,
+            "strategies": sorted(self._strategies, key=self._strategies.get),
+            "seed_min": int(columns["seed"].min()),
+            "seed_max": int(columns["seed"].max()),
+            "config_hashes": sorted({int(h) for h in np.unique(columns["config_hash"])}),
+            "sizes": [int(s) for s in np.unique(columns["size"])],
+            "max_member": int(columns["members"].max(initial=-1)),
+        }
+
+        name = f"{self.prefix}_{self._next_chunk:06d}"
+        tmp = os.path.join(self.root, f".tmp-{name}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for column, values in columns.items():
+            np.save(os.path.join(tmp, f"{column}.npy"), values)
+        with open(os.path.join(tmp, SEASONS_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(self._seasons, f)
+        with open(os.path.join(tmp, META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.rename(tmp, os.path.join(self.root, name))
+        self._next_chunk += 1
+        self._reset()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+@dataclass(frozen=True)
+class ArchiveFilter:
+    """Row predicate; `None` fields select everything. `seed_range` is half-open."""
+
+    seed_range: Optional[Tuple[int, int]] = None
+    seeds: Optional[Tuple[int, ...]] = None
+    config_hashes: Optional[Tuple[int, ...]] = None
+    strategies: Optional[Tuple[str, ...]] = None
+    sizes: Optional[Tuple[int, ...]] = None
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Columns the row predicate reads."""
+        used = []
+        if self.seed_range is not None or self.seeds is not None:
+            used.append("seed")
+        if self.config_hashes is not None:
+            used.append("config_hash")
+        if self.strategies is not None:
+            used.append("strategy")
+        if self.sizes is not None:
+            used.append("size")
+        return tuple(used)
+
+    def admits_chunk(self, meta: Mapping) -> bool:
+        """False when the chunk's zone map rules out every row."""
+        lo, hi = meta["seed_min"], meta["seed_max"]
+        if self.seed_range is not None and (self.seed_range[1] <= lo or self.seed_range[0] > hi):
+            return False
+        if self.seeds is not None and not any(lo <= seed <= hi for seed in self.seeds):
+            return False
+        if self.config_hashes is not None and not set(self.config_hashes) & set(meta["config_hashes"]):
+            return False
+        if self.strategies is not None and not set(self.strategies) & set(meta["strategies"]):
+            return False
+        if self.sizes is not None and not set(self.sizes) & set(meta["sizes"]):
+            return False
+        return True
+
+    def row_mask(self, columns: Mapping[str, np.ndarray], meta: Mapping, n_rows: int) -> np.ndarray:
+        """Mask over `n_rows` rows given (at least) the columns of `self.columns`."""
+        mask = np.ones(n_rows, dtype=bool)
+        if self.seed_range is not None:
+            mask &= (columns["seed"] >= self.seed_range[0]) & (columns["seed"] < self.seed_range[1])
+        if self.seeds is not None:
+            mask &= np.isin(columns["seed"], self.seeds)
+        if self.config_hashes is not None:
+            mask &= np.isin(columns["config_hash"], np.array(self.config_hashes, dtype=np.int64))
+        if self.strategies is not None:
+            codes = [code for code, name in enumerate(meta["strategies"]) if name in self.strategies]
+            mask &= np.isin(columns["strategy"], codes)
+        if self.sizes is not None:
+            mask &= np.isin(columns["size"], self.sizes)
+        return mask
+
+
+@dataclass(frozen=True)
+class ArchiveBatch:
+    """Selected rows of one chunk; `strategy` codes index `strategies`."""
+
+    chunk: str
+    strategies: Tuple[str, ...]
+    columns: Dict[str, np.ndarray]
+
+    @property
+    def rows(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+
+@dataclass(frozen=True)
+class ArchivedSeason:
+    seed: int
+    config_hash: int
+    log: ColumnarSeasonLog  # Phase A rows (breakdown NaN)
+
+
+class SeasonArchive:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        names = sorted(
+            name
+            for name in os.listdir(root)
+            if not name.startswith(".") and os.path.isfile(os.path.join(root, name, META_FILENAME))
+        )
+        self.chunks: List[Tuple[str, dict]] = []
+        for name in names:
+            with open(os.path.join(root, name, META_FILENAME), "r", encoding="utf-8") as f:
+                self.chunks.append((name, json.load(f)))
+
+    @property
+    def rows(self) -> int:
+        return sum(int(meta["rows"]) for _, meta in self.chunks)
+
+    @property
+    def k_max(self) -> int:
+        return max((int(meta["k_max"]) for _, meta in self.chunks), default=0)
+
+    @property
+    def n_players(self) -> int:
+        """One more than the largest archived player id."""
+        return max((int(meta["max_member"]) for _, meta in self.chunks), default=-1) + 1
+
+    def strategies(self) -> List[str]:
+        return sorted({name for _, meta in self.chunks for name in meta["strategies"]})
+
+    def _open(self, chunk: str, column: str) -> np.ndarray:
+        return np.load(os.path.join(self.root, chunk, f"{column}.npy"), mmap_mode="r")
+
+    def scan(
+        self,
+        where: ArchiveFilter = ArchiveFilter(),
+        columns: Sequence[str] = COLUMNS,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+    ) -> Iterator[ArchiveBatch]:
+        """Selected rows of `columns`, chunk by chunk in at most `batch_rows`-row slices of each chunk."""
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown archive columns: {sorted(unknown)} (expected some of {COLUMNS})")
+        for chunk, meta in self.chunks:
+            if not where.admits_chunk(meta):
+                continue
+            predicate = {name: self._open(chunk, name) for name in where.columns}
+            data = {name: predicate[name] if name in predicate else self._open(chunk, name) for name in columns}
+            strategies = tuple(meta["strategies"])
+            for start in range(0, int(meta["rows"]), batch_rows):
+                stop = min(start + batch_rows, int(meta["rows"]))
+                window = {name: column[start:stop] for name, column in predicate.items()}
+                mask = where.row_mask(window, meta, stop - start)
+                if not mask.any():
+                    continue
+                selected = {name: np.asarray(column[start:stop][mask]) for name, column in data.items()}
+                yield ArchiveBatch(chunk=chunk, strategies=strategies, columns=selected)
+
+    def iter_seasons(
+        self, where: ArchiveFilter = ArchiveFilter(), batch_rows: int = DEFAULT_BATCH_ROWS
+    ) -> Iterator[ArchivedSeason]:
+        """Phase A log of every selected season, one season in memory at a time.
+
+        `where.strategies` and `where.sizes` are ignored (a season's log is all
+        of its Phase A rows).
+        """
+        where = dataclasses.replace(where, strategies=(PHASE_A_STRATEGY,), sizes=None)
+        columns = ("seed", "config_hash", "match_id", "team_id", "members", "y_obs", "v_true", "z", "rank")
+        season_stats: Dict[str, dict] = {}
+        pending: List[Dict[str, np.ndarray]] = []
+        current: Optional[Tuple[str, int, int]] = None
+
+        def emit() -> Iterator[ArchivedSeason]:
+            if current is None or not pending:
+                return
+            chunk, hash_value, seed = current
+            if chunk not in season_stats:
+                season_stats.clear()
+                with open(os.path.join(self.root, chunk, SEASONS_FILENAME), "r", encoding="utf-8") as f:
+                    season_stats[chunk] = json.load(f)
+            stats = PhaseAStats.from_dict(season_stats[chunk][_season_key(hash_value, seed)])
+            merged = {name: np.concatenate([part[name] for part in pending]) for name in columns}
+            n = len(merged["seed"])
+            log = ColumnarSeasonLog(
+                match_id=merged["match_id"].astype(np.int64),
+                team_id=merged["team_id"].astype(np.int64),
+                members=merged["members"].astype(np.int64),
+                v_true=merged["v_true"],
+                y_obs=merged["y_obs"],
+                z=merged["z"],
+                rank=merged["rank"],
+                breakdown=np.full((n, len(BREAKDOWN_KEYS)), np.nan),
+                phase_a_stats=stats,
+            )
+            yield ArchivedSeason(seed=seed, config_hash=hash_value, log=log)
+
+        for batch in self.scan(where, columns, batch_rows):
+            keys = np.stack([batch.columns["config_hash"], batch.columns["seed"]], axis=1)
+            # Rows of a season are contiguous within a chunk; split the batch where the season changes.
+            cuts = np.flatnonzero((keys[1:] != keys[:-1]).any(axis=1)) + 1
+            for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, batch.rows]):
+                key = (batch.chunk, int(keys[lo, 0]), int(keys[lo, 1]))
+                if key != current:
+                    yield from emit()
+                    pending, current = [], key
+                pending.append({name: values[lo:hi] for name, values in batch.columns.items()})
+        yield from emit()
@@ -0,0 +1,125 @@
+"""Columnar (structure-of-arrays) form of a `SeasonLog`.
+
+One row per observed team. Members are stored as an (n_teams, k_max) array
+padded with -1, ranks as int8 codes into `RANK_ORDER` and the breakdown as an
+(n_teams, 5) array in `BREAKDOWN_KEYS` order. Conversion to and from
+`SeasonLog` is lossless; `with_precision` stores the arrays in the dtypes of
+`Config.precision` (lossless too for logs of `run_phase_a` in that precision).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.log.schema import MatchLog, SeasonLog, TeamLog
+from sim_contribution.observation.ranking import RANK_ORDER
+from sim_contribution.observation.types import PhaseAStats
+from sim_contribution.precision import float_dtype, member_dtype
+from sim_contribution.production.types import BREAKDOWN_KEYS
+
+COLUMN_NAMES = ("match_id", "team_id", "members", "v_true", "y_obs", "z", "rank", "breakdown")
+
+
+@dataclass(frozen=True)
+class ColumnarSeasonLog:
+    match_id: np.ndarray
+    team_id: np.ndarray
+    members: np.ndarray
+    v_true: np.ndarray
+    y_obs: np.ndarray
+    z: np.ndarray
+    rank: np.ndarray
+    breakdown: np.ndarray
+    phase_a_stats: PhaseAStats
+
+    @property
+    def n_teams(self) -> int:
+        return int(self.match_id.shape[0])
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return (self.members >= 0).sum(axis=1)
+
+    def sorted_members(self) -> np.ndarray:
+        """`members` with each row sorted ascending (padding kept at the end)."""
+        sentinel = np.iinfo(self.members.dtype).max
+        members = np.sort(np.where(self.members < 0, sentinel, self.members), axis=1)
+        return np.where(members == sentinel, -1, members)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in COLUMN_NAMES}
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], phase_a_stats: PhaseAStats) -> "ColumnarSeasonLog":
+        return cls(phase_a_stats=phase_a_stats, **{name: columns[name] for name in COLUMN_NAMES})
+
+    @classmethod
+    def from_season_log(cls, season_log: SeasonLog) -> "ColumnarSeasonLog":
+        teams = [team for match in season_log.matches for team in match.teams]
+        k_max = max((len(team.members) for team in teams), default=0)
+        members = np.full((len(teams), k_max), -1, dtype=np.int64)
+        for row, team in enumerate(teams):
+            members[row, : len(team.members)] = team.members
+        rank_code = {r: idx for idx, r in enumerate(RANK_ORDER)}
+        return cls(
+            match_id=np.array([t.match_id for t in teams], dtype=np.int64),
+            team_id=np.array([t.team_id for t in teams], dtype=np.int64),
+            members=members,
+            v_true=np.array([t.v_true for t in teams], dtype=float),
+            y_obs=np.array([t.y_obs for t in teams], dtype=float),
+            z=np.array([t.z for t in teams], dtype=float),
+            rank=np.array([rank_code[t.rank] for t in teams], dtype=np.int8),
+            breakdown=np.array(
+                [[t.breakdown.get(key, 0.0) for key in BREAKDOWN_KEYS] for t in teams], dtype=float
+            ).reshape(len(teams), len(BREAKDOWN_KEYS)),
+            phase_a_stats=season_log.phase_a_stats,
+        )
+
+    def with_precision(self, config: Config) -> "ColumnarSeasonLog":
+        """Floats in `float_dtype(config)`, ids in `member_dtype(config)` (arrays already in them are shared)."""
+        floats, ids = float_dtype(config), member_dtype(config)
+        columns = self.columns()
+        # Team ids are below n_players; match ids are not bounded by it.
+        columns["match_id"] = columns["match_id"].astype(np.promote_types(ids, np.int32), copy=False)
+        for name in ("team_id", "members"):
+            columns[name] = columns[name].astype(ids, copy=False)
+        for name in ("v_true", "y_obs", "z", "breakdown"):
+            columns[name] = columns[name].astype(floats, copy=False)
+        return ColumnarSeasonLog.from_columns(columns, self.phase_a_stats)
+
+    def rows(self, start: int, stop: int) -> "ColumnarSeasonLog":
+        """Team rows `start:stop` (views; same Phase A stats)."""
+        columns = {name: column[start:stop] for name, column in self.columns().items()}
+        return ColumnarSeasonLog.from_columns(columns, self.phase_a_stats)
+
+    def team_members(self) -> List[Tuple[int, ...]]:
+        return [tuple(m for m in row if m >= 0) for row in self.members.tolist()]
+
+    def to_season_log(self) -> SeasonLog:
+        matches: List[MatchLog] = []
+        teams: List[TeamLog] = []
+        current = None
+        for row, members in enumerate(self.team_members()):
+            match_id = int(self.match_id[row])
+            if current is not None and match_id != current:
+                matches.append(MatchLog(match_id=current, teams=teams))
+                teams = []
+            current = match_id
+            teams.append(
+                TeamLog(
+                    match_id=match_id,
+                    team_id=int(self.team_id[row]),
+                    members=members,
+                    v_true=float(self.v_true[row]),
+                    y_obs=float(self.y_obs[row]),
+                    z=float(self.z[row]),
+                    rank=RANK_ORDER[int(self.rank[row])],
+                    breakdown={key: float(self.breakdown[row, idx]) for idx, key in enumerate(BREAKDOWN_KEYS)},
+                )
+            )
+        if current is not None:
+            matches.append(MatchLog(match_id=current, teams=teams))
+        return SeasonLog(matches=matches, phase_a_stats=self.phase_a_stats)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Optional
+
+from sim_contribution.config import Config
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.observation.types import PhaseAStats
+from sim_contribution.players.types import TrueParams
+
+PHASE_A_LOG_FILENAME = "phase_a_log.json"
+TRUE_PARAMS_FILENAME = "true_params.json"
+CONFIG_FILENAME = "config.json"
+
+
+def _read_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_season_log(path: str) -> SeasonLog:
+    """Load a `SeasonLog` written by `save_phase_a_logs` (file or season directory)."""
+    if os.path.isdir(path):
+        path = os.path.join(path, PHASE_A_LOG_FILENAME)
+    return SeasonLog.from_dict(_read_json(path))
+
+
+def load_phase_a_stats(path: str) -> PhaseAStats:
+    if os.path.isdir(path):
+        path = os.path.join(path, PHASE_A_LOG_FILENAME)
+    return PhaseAStats.from_dict(_read_json(path)["phase_a_stats"])
+
+
+def load_config(path: str) -> Config:
+    """The `Config` a season was simulated with (`config.json`, file or season directory)."""
+    if os.path.isdir(path):
+        path = os.path.join(path, CONFIG_FILENAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No {CONFIG_FILENAME} at {path}: the season was saved without its Config, pass one explicitly (--config)"
+        )
+    return Config.from_dict(_read_json(path))
+
+
+def load_true_params(path: str) -> TrueParams:
+    if os.path.isdir(path):
+        path = os.path.join(path, TRUE_PARAMS_FILENAME)
+    return TrueParams.from_dict(_read_json(path))
+
+
+def load_true_params_if_present(season_dir: str) -> Optional[TrueParams]:
+    path = os.path.join(season_dir, TRUE_PARAMS_FILENAME)
+    if not os.path.exists(path):
+        return None
+    return load_true_params(path)
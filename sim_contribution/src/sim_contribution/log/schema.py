@@ -34,6 +34,19 @@ class TeamLog:
             "breakdown": dict(self.breakdown),
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "TeamLog":
+        return cls(
+            match_id=int(data["match_id"]),
+            team_id=int(data["team_id"]),
+            members=tuple(int(m) for m in data["members"]),
+            v_true=float(data["v_true"]),
+            y_obs=float(data["y_obs"]),
+            z=float(data["z"]),
+            rank=str(data["rank"]),
+            breakdown={str(k): float(v) for k, v in data.get("breakdown", {}).items()},
+        )
+
 
 @dataclass(frozen=True)
 class MatchLog:
@@ -46,6 +59,13 @@ class MatchLog:
             "teams": [team.to_dict() for team in self.teams],
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "MatchLog":
+        return cls(
+            match_id=int(data["match_id"]),
+            teams=[TeamLog.from_dict(team) for team in data["teams"]],
+        )
+
 
 @dataclass(frozen=True)
 class SeasonLog:
@@ -57,3 +77,10 @@ class SeasonLog:
             "matches": [match.to_dict() for match in self.matches],
             "phase_a_stats": self.phase_a_stats.to_dict(),
         }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SeasonLog":
+        return cls(
+            matches=[MatchLog.from_dict(match) for match in data["matches"]],
+            phase_a_stats=PhaseAStats.from_dict(data["phase_a_stats"]),
+        )
@@ -27,3 +27,12 @@ def assign_rank(z: float, thresholds: Tuple[Tuple[str, float], ...]) -> str:
         if z >= cutoff:
             return label
     return "E"
+
+
+def assign_rank_codes(z: np.ndarray, thresholds: Tuple[Tuple[str, float], ...]) -> np.ndarray:
+    """Vectorized `assign_rank`, as int8 codes into `RANK_ORDER`."""
+    codes = np.full(np.shape(z), RANK_ORDER.index("E"), dtype=np.int8)
+    # Later thresholds first, so the first matching threshold wins as in `assign_rank`.
+    for label, cutoff in reversed(thresholds):
+        codes[z >= cutoff] = RANK_ORDER.index(label)
+    return codes
@@ -16,3 +16,11 @@ class PhaseAStats:
             "std_y": self.std_y,
             "thresholds": list(self.thresholds),
         }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PhaseAStats":
+        return cls(
+            mean_y=float(data["mean_y"]),
+            std_y=float(data["std_y"]),
+            thresholds=tuple((str(label), float(cutoff)) for label, cutoff in data["thresholds"]),
+        )
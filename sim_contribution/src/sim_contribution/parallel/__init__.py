@@ -0,0 +1 @@
+"""Subpackage."""
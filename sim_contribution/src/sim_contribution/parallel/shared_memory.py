@@ -0,0 +1,154 @@
+"""Zero-copy transport of season arrays to worker processes.
+
+The parent publishes arrays once into `multiprocessing.shared_memory` segments
+(owned by a `SharedArrayStore`, which unlinks them on exit); tasks carry only a
+small picklable handle, and workers attach read-only NumPy views:
+
+    with SharedArrayStore() as store:
+        handle = publish_true_params(store, true_params)
+        with ProcessPoolExecutor() as pool:
+            pool.map(task, [(handle, partition) for partition in partitions])
+
+    def task(args):
+        handle, partition = args
+        true_params = attach_true_params(handle)  # views, no copy
+        ...
+
+Worker-side segments are cached per process, so repeated tasks with the same
+handle attach only once. The store must outlive every task using its handles.
+"""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from sim_contribution.log.columnar import COLUMN_NAMES, ColumnarSeasonLog
+from sim_contribution.observation.types import PhaseAStats
+from sim_contribution.players.types import PlayerParams, TrueParams
+
+_TRUE_PARAMS_ARRAYS = ("abilities", "cooperativeness", "skills", "affinity")
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    segment: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedTrueParamsHandle:
+    arrays: Dict[str, SharedArraySpec]
+
+
+@dataclass(frozen=True)
+class SharedSeasonLogHandle:
+    arrays: Dict[str, SharedArraySpec]
+    phase_a_stats: PhaseAStats
+
+
+class SharedArrayStore:
+    """Owner of published segments; closes and unlinks them on `close()` / exit."""
+
+    def __init__(self) -> None:
+        self._segments: List[shared_memory.SharedMemory] = []
+        if sys.version_info < (3, 13):
+            # Pools created after this point inherit the tracker instead of starting
+            # their own, which would unlink attached segments when a worker exits.
+            resource_tracker.ensure_running()
+
+    def publish(self, array: np.ndarray) -> SharedArraySpec:
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments.append(segment)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+        view[...] = array
+        del view
+        return SharedArraySpec(segment=segment.name, shape=tuple(array.shape), dtype=array.dtype.str)
+
+    def close(self) -> None:
+        while self._segments:
+            segment = self._segments.pop()
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "SharedArrayStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# Segments attached by this process, kept open for the lifetime of the process.
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching also registers the segment with the resource
+    # tracker; pool workers share the parent's tracker, so this is a no-op
+    # there and the owner's unlink stays the only cleanup.
+    return shared_memory.SharedMemory(name=name)
+
+
+def attach_array(spec: SharedArraySpec) -> np.ndarray:
+    segment = _ATTACHED.get(spec.segment)
+    if segment is None:
+        segment = _open_segment(spec.segment)
+        _ATTACHED[spec.segment] = segment
+    view = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=segment.buf)
+    view.flags.writeable = False
+    return view
+
+
+def detach_all() -> None:
+    """Close every segment attached by this process (views must be dropped first)."""
+    while _ATTACHED:
+        _, segment = _ATTACHED.popitem()
+        segment.close()
+
+
+def publish_true_params(store: SharedArrayStore, true_params: TrueParams) -> SharedTrueParamsHandle:
+    arrays = {
+        "abilities": true_params.abilities(),
+        "cooperativeness": true_params.cooperativeness(),
+        "skills": true_params.skills(),
+        "affinity": np.asarray(true_params.affinity),
+    }
+    return SharedTrueParamsHandle(arrays={name: store.publish(arrays[name]) for name in _TRUE_PARAMS_ARRAYS})
+
+
+def attach_true_params(handle: SharedTrueParamsHandle) -> TrueParams:
+    """`TrueParams` whose skill vectors and affinity are read-only shared views."""
+    views = {name: attach_array(handle.arrays[name]) for name in _TRUE_PARAMS_ARRAYS}
+    players = [
+        PlayerParams(
+            player_id=i,
+            ability=float(views["abilities"][i]),
+            cooperativeness=float(views["cooperativeness"][i]),
+            skill=views["skills"][i],
+        )
+        for i in range(views["abilities"].shape[0])
+    ]
+    return TrueParams(players=players, affinity=views["affinity"])
+
+
+def publish_season_log(store: SharedArrayStore, season_log: ColumnarSeasonLog) -> SharedSeasonLogHandle:
+    columns = season_log.columns()
+    return SharedSeasonLogHandle(
+        arrays={name: store.publish(columns[name]) for name in COLUMN_NAMES},
+        phase_a_stats=season_log.phase_a_stats,
+    )
+
+
+def attach_season_log(handle: SharedSeasonLogHandle) -> ColumnarSeasonLog:
+    columns = {name: attach_array(spec) for name, spec in handle.arrays.items()}
+    return ColumnarSeasonLog.from_columns(columns, handle.phase_a_stats)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 import numpy as np
 
 from sim_contribution.config import Config
 from sim_contribution.players.types import PlayerParams, TrueParams
+from sim_contribution.precision import float_dtype
 
 
 def generate_true_params(rng: np.random.Generator, config: Config) -> TrueParams:
@@ -20,13 +23,69 @@ def generate_true_params(rng: np.random.Generator, config: Config) -> TrueParams
             affinity[i, j] = val
             affinity[j, i] = val
 
+    # Stored in the configured precision; the draws do not depend on it.
+    dtype = float_dtype(config)
+    abilities, cooper = abilities.astype(dtype), cooper.astype(dtype)
     players = [
         PlayerParams(
             player_id=i,
             ability=float(abilities[i]),
             cooperativeness=float(cooper[i]),
-            skill=skills[i].astype(float),
+            skill=skills[i].astype(dtype),
         )
         for i in range(config.n_players)
     ]
-    return TrueParams(players=players, affinity=affinity)
+    return TrueParams(players=players, affinity=affinity.astype(dtype, copy=False))
+
+
+@dataclass(frozen=True)
+class BatchedTrueParams:
+    """True parameters of S seasons stacked along a leading axis."""
+
+    abilities: np.ndarray  # (S, n)
+    cooperativeness: np.ndarray  # (S, n)
+    skills: np.ndarray  # (S, n, d)
+    affinity: np.ndarray  # (S, n, n), symmetric with zero diagonal
+
+    @property
+    def n_seasons(self) -> int:
+        return int(self.abilities.shape[0])
+
+    def season(self, s: int) -> TrueParams:
+        players = [
+            PlayerParams(
+                player_id=i,
+                ability=float(self.abilities[s, i]),
+                cooperativeness=float(self.cooperativeness[s, i]),
+                skill=self.skills[s, i].copy(),
+            )
+            for i in range(self.abilities.shape[1])
+        ]
+        return TrueParams(players=players, affinity=self.affinity[s].copy())
+
+
+def normal_draws(rng: np.random.Generator, loc: float, scale: float, size: tuple, dtype: np.dtype) -> np.ndarray:
+    """`rng.normal` in `dtype`; float32 draws are generated as float32 (other values than float64 draws)."""
+    if dtype == np.float64:
+        return rng.normal(loc, scale, size=size)
+    draws = rng.standard_normal(size=size, dtype=dtype)
+    draws *= dtype.type(scale)
+    draws += dtype.type(loc)
+    return draws
+
+
+def generate_true_params_batch(rng: np.random.Generator, config: Config, n_seasons: int) -> BatchedTrueParams:
+    """Same distributions as `generate_true_params`, one draw per array for all seasons."""
+    n = config.n_players
+    dtype = float_dtype(config)
+    abilities = normal_draws(rng, config.ability_mean, config.ability_std, (n_seasons, n), dtype)
+    if config.ability_positive:
+        abilities = np.abs(abilities)
+    cooper = normal_draws(rng, config.coop_mean, config.coop_std, (n_seasons, n), dtype)
+    skills = normal_draws(rng, 0.0, 1.0, (n_seasons, n, config.skill_dim), dtype)
+    upper_i, upper_j = np.triu_indices(n, k=1)
+    values = normal_draws(rng, 0.0, config.sigma_h, (n_seasons, upper_i.size), dtype)
+    affinity = np.zeros((n_seasons, n, n), dtype=dtype)
+    affinity[:, upper_i, upper_j] = values
+    affinity[:, upper_j, upper_i] = values
+    return BatchedTrueParams(abilities=abilities, cooperativeness=cooper, skills=skills, affinity=affinity)
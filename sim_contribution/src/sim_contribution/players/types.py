@@ -26,3 +26,17 @@ class TrueParams:
 
     def skills(self) -> np.ndarray:
         return np.vstack([p.skill for p in self.players])
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrueParams":
+        players = [
+            PlayerParams(
+                player_id=int(p["player_id"]),
+                ability=float(p["ability"]),
+                cooperativeness=float(p["cooperativeness"]),
+                skill=np.asarray(p["skill"], dtype=float),
+            )
+            for p in data["players"]
+        ]
+        affinity = np.asarray(data["affinity"], dtype=float).reshape(len(players), len(players))
+        return cls(players=players, affinity=affinity)
@@ -0,0 +1,80 @@
+"""Storage precision of arrays (`Config.precision`).
+
+"float64" (the default) keeps every array in float64 and member ids in int64.
+"float32" stores the true parameters (skills, affinity; abilities and
+cooperativeness are rounded to float32 values), the Phase A log values
+(v_true, y_obs, z, breakdown), columnar logs and the batched simulator's
+arrays in float32, and member ids in the smallest signed integer type that
+holds `n_players` (int16 up to 32767 players, else int32). The random draws of
+`run_phase_a` are the same in both modes. Sums over a season (Phase A stats,
+index aggregates, Σy) and `compute_team_value` accumulate in float64.
+
+Error bound. Rounding x to float32 moves it by at most u|x|, u = 2^-24. v(T)
+is linear in the abilities, cooperativeness and affinities, and the cosine of
+two skill vectors whose components move by at most u relative moves by at
+most 4u, so, up to float64 rounding,
+
+    |v32(T) - v64(T)| <= u (Σ|a_i| + λ_coop g(|T|) Σ|c_i| + Σ|h_ij| + 4 λ_div + |v(T)|)
+
+(`team_value_error_bound`; the last term is the rounding of the stored value),
+about 1e-6 for a 3-player team with the default parameters, and
+|y32 - y64| <= |v32 - v64| + u|y|. This is checked against float64 runs by
+`scripts/check_precision.py`. z-scores then differ by about 1e-7 relative, so
+a rank flips only for a team within that distance of a threshold.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+import numpy as np
+
+from sim_contribution.config import PRECISION_MODES, Config
+from sim_contribution.players.types import TrueParams
+
+FLOAT32_ROUNDOFF = 2.0**-24
+
+
+def check_precision(config: Config) -> None:
+    if config.precision not in PRECISION_MODES:
+        raise ValueError(f"Unknown precision: {config.precision!r} (expected one of {PRECISION_MODES})")
+
+
+def float_dtype(config: Config) -> np.dtype:
+    check_precision(config)
+    return np.dtype(np.float32 if config.precision == "float32" else np.float64)
+
+
+def member_dtype(config: Config) -> np.dtype:
+    """Dtype of member id arrays (-1 padded)."""
+    check_precision(config)
+    if config.precision == "float64":
+        return np.dtype(np.int64)
+    for dtype in (np.int16, np.int32):
+        if config.n_players <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def storage_float(config: Config) -> Callable[[float], float]:
+    """Rounds a Python float to the storage precision (the identity for float64)."""
+    if float_dtype(config) == np.float64:
+        return float
+    return lambda value: float(np.float32(value))
+
+
+def team_value_error_bound(members: Iterable[int], true_params: TrueParams, config: Config) -> float:
+    """Bound on |v(T)| computed from float32-rounded parameters minus the float64 v(T)."""
+    member_list = list(members)
+    size = len(member_list)
+    abilities = sum(abs(true_params.players[i].ability) for i in member_list)
+    cooperativeness = sum(abs(true_params.players[i].cooperativeness) for i in member_list)
+    affinity = sum(
+        abs(float(true_params.affinity[member_list[a], member_list[b]]))
+        for a in range(size)
+        for b in range(a + 1, size)
+    )
+    coop_weight = config.lambda_coop * abs(float(config.g_map.get(size, 0.0)))
+    # |v(T)| is bounded by the sum of its terms' magnitudes.
+    value = abilities + coop_weight * cooperativeness + affinity + 2.0 * config.lambda_div + config.kappa * size * (size - 1) / 2
+    diversity = 4.0 * config.lambda_div if size >= 2 else 0.0
+    return FLOAT32_ROUNDOFF * (abilities + coop_weight * cooperativeness + affinity + diversity + value)
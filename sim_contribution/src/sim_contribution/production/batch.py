@@ -0,0 +1,211 @@
+"""Vectorized team values for many teams (and optionally many seasons) at once.
+
+Teams are encoded as an int array of member ids with shape (..., k_max), padded
+with -1. Player parameters are either those of one season (abilities (n,),
+skills (n, d), affinity (n, n)) or stacked along a leading seasons axis
+(abilities (S, n), ...). The components follow `compute_team_value`; an empty
+team (all padding) has value 0.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.players.types import TrueParams
+from sim_contribution.schedule.types import Partition, Schedule
+
+
+def _take(param: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """param: (S, n, *rest), idx: (S, L) -> (S, L, *rest)."""
+    expand = idx.reshape(idx.shape + (1,) * (param.ndim - 2))
+    return np.take_along_axis(param, expand, axis=1)
+
+
+def _as_float64(*params: np.ndarray) -> tuple:
+    # float64 accumulation, whatever the storage precision of the parameters.
+    return tuple(np.asarray(param).astype(np.float64, copy=False) for param in params)
+
+
+def batch_team_breakdown(
+    members: np.ndarray,
+    abilities: np.ndarray,
+    cooperativeness: np.ndarray,
+    skills: np.ndarray,
+    affinity: np.ndarray,
+    config: Config,
+    per_season_members: bool = False,
+    eps: float = 1e-8,
+) -> Dict[str, np.ndarray]:
+    """Breakdown components of v(T) for every team in `members`.
+
+    Unbatched parameters: result shape `members.shape[:-1]`. Batched parameters
+    (leading S axis): `members` is shared, (..., k_max), giving (S, ...), or,
+    with `per_season_members=True`, (S, ..., k_max), giving (S, ...).
+    Computed in float64 whatever the storage precision of the parameters, as
+    `compute_team_value` is; callers cast what they store.
+    """
+    # Compact (int16/int32) ids would overflow in the flat pair index below.
+    members = np.asarray(members, dtype=np.intp)
+    abilities, cooperativeness, skills, affinity = _as_float64(abilities, cooperativeness, skills, affinity)
+    batched = abilities.ndim == 2
+    if not batched:
+        abilities, cooperativeness = abilities[None], cooperativeness[None]
+        skills, affinity = skills[None], affinity[None]
+    n_seasons, n_players = abilities.shape
+    k_max = members.shape[-1]
+
+    if batched and per_season_members:
+        team_shape = members.shape[:-1]
+        idx = members.reshape(n_seasons, -1, k_max)
+    else:
+        team_shape = ((n_seasons,) if batched else ()) + members.shape[:-1]
+        idx = np.broadcast_to(members.reshape(1, -1, k_max), (n_seasons, members[..., 0].size, k_max))
+    n_teams = idx.shape[1]
+
+    valid = idx >= 0
+    safe = np.where(valid, idx, 0)
+    size = valid.sum(axis=-1)
+    flat = safe.reshape(n_seasons, -1)
+
+    base = np.where(valid, _take(abilities, flat).reshape(safe.shape), 0.0).sum(axis=-1)
+    coop_sum = np.where(valid, _take(cooperativeness, flat).reshape(safe.shape), 0.0).sum(axis=-1)
+
+    vectors = _take(skills, flat).reshape(safe.shape + (skills.shape[-1],))
+    norms = np.linalg.norm(vectors, axis=-1) + eps
+    aff_flat = affinity.reshape(n_seasons, n_players * n_players)
+    sim_sum = np.zeros((n_seasons, n_teams))
+    aff_sum = np.zeros((n_seasons, n_teams))
+    for i_idx in range(k_max):
+        for j_idx in range(i_idx + 1, k_max):
+            both = valid[..., i_idx] & valid[..., j_idx]
+            dots = np.einsum("...d,...d->...", vectors[..., i_idx, :], vectors[..., j_idx, :])
+            sim = dots / (norms[..., i_idx] * norms[..., j_idx])
+            sim_sum += np.where(both, sim, 0.0)
+            pair = np.take_along_axis(aff_flat, safe[..., i_idx] * n_players + safe[..., j_idx], axis=1)
+            aff_sum += np.where(both, pair, 0.0)
+
+    n_pairs = size * (size - 1) / 2.0
+    mean_sim = np.divide(sim_sum, n_pairs, out=np.zeros_like(sim_sum), where=n_pairs > 0)
+    g = np.array([float(config.g_map.get(k, 0.0)) for k in range(k_max + 1)])
+
+    present = size > 0
+    components = {
+        "base": base,
+        "diversity": np.where(present, config.lambda_div * (1.0 - mean_sim), 0.0),
+        "affinity": aff_sum,
+        "cooperation": config.lambda_coop * coop_sum * g[size],
+        "comm_cost": -(config.kappa * n_pairs),
+    }
+    return {key: value.reshape(team_shape) for key, value in components.items()}
+
+
+def shared_team_breakdown(
+    members: np.ndarray,
+    abilities: np.ndarray,
+    cooperativeness: np.ndarray,
+    skills: np.ndarray,
+    affinity: np.ndarray,
+    config: Config,
+    eps: float = 1e-8,
+) -> Dict[str, np.ndarray]:
+    """`batch_team_breakdown` for batched parameters (S, n, ...) and one shared (R, k_max) `members`.
+
+    Per-team sums become products with incidence matrices of the teams' members
+    and pairs, so the cost per season is a few small matrix products instead of
+    gathers per team slot. Sums are in another order than `compute_team_value`
+    (equal up to rounding). Result shape (S, R), in float64 whatever the
+    storage precision of the parameters.
+    """
+    members = np.asarray(members, dtype=np.intp)
+    abilities, cooperativeness, skills, affinity = _as_float64(abilities, cooperativeness, skills, affinity)
+    n_players = abilities.shape[1]
+    n_teams, k_max = members.shape
+    valid = members >= 0
+    size = valid.sum(axis=1)
+    dtype = np.dtype(np.float64)
+
+    member_incidence = np.zeros((n_players, n_teams), dtype=dtype)
+    rows, slots = np.nonzero(valid)
+    member_incidence[members[rows, slots], rows] = 1.0
+    pair_left, pair_right, pair_team = [], [], []
+    for i_idx in range(k_max):
+        for j_idx in range(i_idx + 1, k_max):
+            both = np.flatnonzero(valid[:, i_idx] & valid[:, j_idx])
+            left, right = members[both, i_idx], members[both, j_idx]
+            pair_left.append(np.minimum(left, right))
+            pair_right.append(np.maximum(left, right))
+            pair_team.append(both)
+    left = np.concatenate(pair_left) if pair_left else np.zeros(0, dtype=np.int64)
+    right = np.concatenate(pair_right) if pair_right else np.zeros(0, dtype=np.int64)
+    team = np.concatenate(pair_team) if pair_team else np.zeros(0, dtype=np.int64)
+    pairs, pair_slot = np.unique(left * n_players + right, return_inverse=True)
+    pair_incidence = np.zeros((pairs.size, n_teams), dtype=dtype)
+    np.add.at(pair_incidence, (pair_slot.reshape(-1), team), 1.0)
+    pair_i, pair_j = pairs // n_players, pairs % n_players
+
+    unit = skills / (np.linalg.norm(skills, axis=-1, keepdims=True) + dtype.type(eps))
+    pair_sim = np.einsum("spd,spd->sp", unit[:, pair_i], unit[:, pair_j])
+    sim_sum = pair_sim @ pair_incidence
+    aff_sum = affinity[:, pair_i, pair_j] @ pair_incidence
+
+    n_pairs = size * (size - 1) / 2.0
+    mean_sim = np.divide(sim_sum, n_pairs, out=np.zeros_like(sim_sum), where=n_pairs > 0)
+    g = np.array([float(config.g_map.get(k, 0.0)) for k in range(k_max + 1)])
+    present = size > 0
+    return {
+        "base": abilities @ member_incidence,
+        "diversity": np.where(present, config.lambda_div * (1.0 - mean_sim), 0.0),
+        "affinity": aff_sum,
+        "cooperation": config.lambda_coop * (cooperativeness @ member_incidence) * g[size],
+        "comm_cost": np.broadcast_to(-(config.kappa * n_pairs), sim_sum.shape),
+    }
+
+
+def batch_team_values(
+    members: np.ndarray,
+    abilities: np.ndarray,
+    cooperativeness: np.ndarray,
+    skills: np.ndarray,
+    affinity: np.ndarray,
+    config: Config,
+    per_season_members: bool = False,
+) -> np.ndarray:
+    parts = batch_team_breakdown(
+        members, abilities, cooperativeness, skills, affinity, config, per_season_members=per_season_members
+    )
+    # Same summation order as `compute_team_value`.
+    return parts["base"] + parts["diversity"] + parts["affinity"] + parts["cooperation"] + parts["comm_cost"]
+
+
+def batch_team_values_for(members: np.ndarray, true_params: TrueParams, config: Config) -> np.ndarray:
+    return batch_team_values(
+        members,
+        true_params.abilities(),
+        true_params.cooperativeness(),
+        true_params.skills(),
+        np.asarray(true_params.affinity, dtype=float),
+        config,
+    )
+
+
+def encode_partition(partition: Partition, k_max: Optional[int] = None, dtype: np.dtype = np.int64) -> np.ndarray:
+    """Encode a partition as a (n_teams, k_max) member array padded with -1."""
+    if k_max is None:
+        k_max = max((len(team) for team in partition), default=0)
+    members = np.full((len(partition), k_max), -1, dtype=dtype)
+    for t, team in enumerate(partition):
+        members[t, : len(team)] = team
+    return members
+
+
+def encode_schedule(schedule: Schedule, k_max: Optional[int] = None, dtype: np.dtype = np.int64) -> np.ndarray:
+    """Encode a schedule as a (n_matches, max teams per match, k_max) array padded with -1."""
+    if k_max is None:
+        k_max = max((len(team) for partition in schedule for team in partition), default=0)
+    n_teams = max((len(partition) for partition in schedule), default=0)
+    members = np.full((len(schedule), n_teams, k_max), -1, dtype=dtype)
+    for m, partition in enumerate(schedule):
+        members[m, : len(partition)] = encode_partition(partition, k_max, dtype)
+    return members
@@ -0,0 +1,224 @@
+"""Incremental team values for partition refinement.
+
+`TeamValueModel` is the additive form shared by the true production model and
+the estimated (observation-based) surrogates:
+
+    v(T) = sum_i unary_i + weight_coef(|T|) * sum_i weight_i
+         + lambda_div * (1 - mean_cos(T)) + sum_{i<j} pair_ij + size_term(|T|)
+
+with `v(empty) = 0`. Mean cosine similarity is kept in O(d) through the sum of
+unit skill vectors: sum_{i<j} u_i.u_j = (|sum u|^2 - sum |u_i|^2) / 2.
+
+`IncrementalPartition` keeps per-team running sums (size, unary, weight, unit
+vectors, |u|^2, pair total) plus the affinity row sums `R[t, p] = sum_{j in t}
+pair_pj`, so the delta of moving or swapping a player costs O(d + k) and the
+deltas against every team (or every other player) are evaluated in one
+vectorized pass. Memory is O(n^2) for the pair matrix and row sums.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.players.types import TrueParams
+from sim_contribution.schedule.types import Partition
+
+
+@dataclass(frozen=True)
+class TeamValueModel:
+    unary: np.ndarray
+    weight: np.ndarray
+    unit: np.ndarray
+    pair: np.ndarray
+    lambda_div: float
+    weight_coef: np.ndarray
+    size_term: np.ndarray
+
+    @property
+    def n_players(self) -> int:
+        return int(self.unary.shape[0])
+
+    def team_values(
+        self,
+        size: np.ndarray,
+        sum_unary: np.ndarray,
+        sum_weight: np.ndarray,
+        sum_unit_sq: np.ndarray,
+        sum_uu: np.ndarray,
+        pair_total: np.ndarray,
+    ) -> np.ndarray:
+        size = np.asarray(size)
+        safe = np.maximum(size, 2)
+        mean_cos = np.where(size >= 2, (sum_unit_sq - sum_uu) / (safe * (safe - 1)), 0.0)
+        value = (
+            sum_unary
+            + self.weight_coef[size] * sum_weight
+            + self.lambda_div * (1.0 - mean_cos)
+            + pair_total
+            + self.size_term[size]
+        )
+        return np.where(size > 0, value, 0.0)
+
+
+def true_value_model(true_params: TrueParams, config: Config, eps: float = 1e-8) -> TeamValueModel:
+    """The generative model `compute_team_value` as a `TeamValueModel`."""
+    n = len(true_params.players)
+    # float64 accumulation, whatever the storage precision of the skills.
+    skills = true_params.skills().astype(np.float64, copy=False)
+    norms = np.linalg.norm(skills, axis=1) + eps
+    sizes = np.arange(n + 1)
+    return TeamValueModel(
+        unary=true_params.abilities(),
+        weight=true_params.cooperativeness(),
+        unit=skills / norms[:, None],
+        pair=np.asarray(true_params.affinity, dtype=float),
+        lambda_div=float(config.lambda_div),
+        weight_coef=np.array([config.lambda_coop * float(config.g_map.get(int(k), 0.0)) for k in sizes]),
+        size_term=-config.kappa * sizes * (sizes - 1) / 2.0,
+    )
+
+
+class IncrementalPartition:
+    def __init__(self, model: TeamValueModel, partition: Partition) -> None:
+        n = model.n_players
+        self.model = model
+        self.team_of = np.full(n, -1, dtype=np.int64)
+        # One slot per player is enough for any partition; empty slots act as new teams.
+        self.members: List[List[int]] = [[] for _ in range(n)]
+        self.size = np.zeros(n, dtype=np.int64)
+        self.sum_unary = np.zeros(n)
+        self.sum_weight = np.zeros(n)
+        self.sum_unit = np.zeros((n, model.unit.shape[1]))
+        self.sum_uu = np.zeros(n)
+        self.pair_total = np.zeros(n)
+        self.row_sums = np.zeros((n, n))
+        self._uu = np.einsum("ij,ij->i", model.unit, model.unit)
+
+        for slot, team in enumerate(partition):
+            for p in team:
+                self._add(int(p), slot)
+
+    def _add(self, p: int, t: int) -> None:
+        m = self.model
+        self.pair_total[t] += self.row_sums[t, p]
+        self.row_sums[t] += m.pair[p]
+        self.members[t].append(p)
+        self.team_of[p] = t
+        self.size[t] += 1
+        self.sum_unary[t] += m.unary[p]
+        self.sum_weight[t] += m.weight[p]
+        self.sum_unit[t] += m.unit[p]
+        self.sum_uu[t] += self._uu[p]
+
+    def _remove(self, p: int, t: int) -> None:
+        m = self.model
+        self.row_sums[t] -= m.pair[p]
+        self.pair_total[t] -= self.row_sums[t, p]
+        self.members[t].remove(p)
+        self.team_of[p] = -1
+        self.size[t] -= 1
+        self.sum_unary[t] -= m.unary[p]
+        self.sum_weight[t] -= m.weight[p]
+        self.sum_unit[t] -= m.unit[p]
+        self.sum_uu[t] -= self._uu[p]
+
+    def _values(self, idx, size, sum_unit) -> np.ndarray:
+        return self.model.team_values(
+            size,
+            self.sum_unary[idx],
+            self.sum_weight[idx],
+            np.einsum("...j,...j->...", sum_unit, sum_unit),
+            self.sum_uu[idx],
+            self.pair_total[idx],
+        )
+
+    def team_value_array(self) -> np.ndarray:
+        return self._values(slice(None), self.size, self.sum_unit)
+
+    def total_value(self) -> float:
+        return float(self.team_value_array().sum())
+
+    def move_deltas(self, p: int) -> np.ndarray:
+        """Change of the total value when `p` moves to each slot (current slot: 0)."""
+        m = self.model
+        src = int(self.team_of[p])
+        current = self.team_value_array()
+
+        size_in = self.size + 1
+        unit_in = self.sum_unit + m.unit[p]
+        gain = m.team_values(
+            size_in,
+            self.sum_unary + m.unary[p],
+            self.sum_weight + m.weight[p],
+            np.einsum("ij,ij->i", unit_in, unit_in),
+            self.sum_uu + self._uu[p],
+            self.pair_total + self.row_sums[:, p],
+        ) - current
+
+        unit_out = self.sum_unit[src] - m.unit[p]
+        loss = m.team_values(
+            self.size[src] - 1,
+            self.sum_unary[src] - m.unary[p],
+            self.sum_weight[src] - m.weight[p],
+            float(unit_out @ unit_out),
+            self.sum_uu[src] - self._uu[p],
+            self.pair_total[src] - self.row_sums[src, p],
+        ) - current[src]
+
+        deltas = gain + loss
+        deltas[src] = 0.0
+        return deltas
+
+    def swap_deltas(self, p: int) -> np.ndarray:
+        """Change of the total value when `p` swaps teams with each player (own team: 0)."""
+        m = self.model
+        a = int(self.team_of[p])
+        b = self.team_of
+        current = self.team_value_array()
+        h_pq = m.pair[p]
+
+        # Team of p after the swap: A - p + q.
+        unit_a = self.sum_unit[a] - m.unit[p] + m.unit
+        value_a = m.team_values(
+            np.full(b.shape, self.size[a]),
+            self.sum_unary[a] - m.unary[p] + m.unary,
+            self.sum_weight[a] - m.weight[p] + m.weight,
+            np.einsum("ij,ij->i", unit_a, unit_a),
+            self.sum_uu[a] - self._uu[p] + self._uu,
+            self.pair_total[a] - self.row_sums[a, p] + self.row_sums[a] - h_pq,
+        )
+        # Team of q after the swap: B - q + p.
+        unit_b = self.sum_unit[b] - m.unit + m.unit[p]
+        value_b = m.team_values(
+            self.size[b],
+            self.sum_unary[b] - m.unary + m.unary[p],
+            self.sum_weight[b] - m.weight + m.weight[p],
+            np.einsum("ij,ij->i", unit_b, unit_b),
+            self.sum_uu[b] - self._uu + self._uu[p],
+            self.pair_total[b] - self.row_sums[b, np.arange(b.size)] + self.row_sums[b, p] - h_pq,
+        )
+
+        deltas = value_a - current[a] + value_b - current[b]
+        deltas[b == a] = 0.0
+        return deltas
+
+    def move(self, p: int, t: int) -> None:
+        self._remove(p, int(self.team_of[p]))
+        self._add(p, t)
+
+    def swap(self, p: int, q: int) -> None:
+        a, b = int(self.team_of[p]), int(self.team_of[q])
+        self._remove(p, a)
+        self._remove(q, b)
+        self._add(p, b)
+        self._add(q, a)
+
+    def partition(self) -> Partition:
+        return [tuple(team) for team in self.members if team]
+
+
+def partition_value(model: TeamValueModel, partition: Sequence[Sequence[int]]) -> float:
+    return IncrementalPartition(model, [tuple(team) for team in partition]).total_value()
@@ -16,7 +16,8 @@ def compute_team_value(members: Iterable[int], true_params: TrueParams, config:
 
     abilities = [true_params.players[i].ability for i in member_list]
     cooper = [true_params.players[i].cooperativeness for i in member_list]
-    skills = np.vstack([true_params.players[i].skill for i in member_list])
+    # float64 accumulation, whatever the storage precision of the skills.
+    skills = np.vstack([true_params.players[i].skill for i in member_list]).astype(float, copy=False)
 
     base = float(np.sum(abilities))
     diversity = config.lambda_div * diversity_score(skills)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict
 
+BREAKDOWN_KEYS = ("base", "diversity", "affinity", "cooperation", "comm_cost")
+
 
 @dataclass(frozen=True)
 class TeamValue:
@@ -0,0 +1,45 @@
+"""Named random streams.
+
+Each stream is seeded with `SeedSequence([seed, stable_key(name)])`, so a
+stream depends only on its seed and its name: drawing more or fewer numbers
+from one stream (e.g. `generate_true_params` with another `skill_dim`) never
+shifts another.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Dict
+
+import numpy as np
+
+from sim_contribution.config import Config
+
+# Config.rng_streams values: independent Phase A streams / one generator for all of Phase A (outputs before streams)
+RNG_STREAM_MODES = ("named", "shared")
+PHASE_A_STREAMS = ("params", "schedule", "noise")
+
+
+def stable_key(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def named_rng(seed: int, name: str) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence([seed, stable_key(name)]))
+
+
+def schedule_seed(seed: int, config: Config) -> int:
+    """`config.schedule_seed` when set (>= 0), else the season seed."""
+    return config.schedule_seed if config.schedule_seed >= 0 else seed
+
+
+def phase_a_streams(seed: int, config: Config) -> Dict[str, np.random.Generator]:
+    if config.rng_streams not in RNG_STREAM_MODES:
+        raise ValueError(f"Unknown rng_streams: {config.rng_streams!r} (expected one of {RNG_STREAM_MODES})")
+    if config.rng_streams == "shared":
+        rng = np.random.default_rng(seed)
+        return {name: rng for name in PHASE_A_STREAMS}
+    return {
+        "params": named_rng(seed, "params"),
+        "schedule": named_rng(schedule_seed(seed, config), "schedule"),
+        "noise": named_rng(seed, "noise"),
+    }
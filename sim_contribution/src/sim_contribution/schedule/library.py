@@ -0,0 +1,115 @@
+"""On-disk library of precomputed Phase A schedules.
+
+A schedule produced by `generate_schedule` depends only on the schedule
+stream and on the fields in `ScheduleKey`, so with named RNG streams
+(`Config.rng_streams="named"`) it can be searched once and reused: every
+season of a sweep with a fixed `schedule_seed` shares one schedule, whatever
+its player population.
+
+    library = open_library("schedules")
+    schedule = library.get_or_generate(ScheduleKey.from_config(config, 7), rng, config)
+
+Entries are JSON files named after their key, written through a temporary
+file (named per host, process and thread) and `os.replace`, so concurrent
+workers generating the same entry are harmless (they write identical content).
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.schedule.generator import generate_schedule
+from sim_contribution.schedule.types import Schedule
+
+
+@dataclass(frozen=True)
+class ScheduleKey:
+    n_players: int
+    n_matches: int
+    team_size_min: int
+    team_size_max: int
+    schedule_candidates: int
+    schedule_seed: int
+
+    @classmethod
+    def from_config(cls, config: Config, schedule_seed: int) -> "ScheduleKey":
+        return cls(
+            n_players=config.n_players,
+            n_matches=config.n_matches,
+            team_size_min=config.team_size_min,
+            team_size_max=config.team_size_max,
+            schedule_candidates=config.schedule_candidates,
+            schedule_seed=schedule_seed,
+        )
+
+    @property
+    def filename(self) -> str:
+        return (
+            f"schedule_n{self.n_players}_m{self.n_matches}_size{self.team_size_min}-{self.team_size_max}"
+            f"_c{self.schedule_candidates}_seed{self.schedule_seed}.json"
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ScheduleLibrary:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._cache: Dict[ScheduleKey, Schedule] = {}
+
+    def path(self, key: ScheduleKey) -> str:
+        return os.path.join(self.root, key.filename)
+
+    def get(self, key: ScheduleKey) -> Optional[Schedule]:
+        if key in self._cache:
+            return self._cache[key]
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data["key"] != key.to_dict():
+            raise ValueError(f"Schedule library entry {path} does not match its key")
+        schedule = [[tuple(int(m) for m in team) for team in partition] for partition in data["schedule"]]
+        self._cache[key] = schedule
+        return schedule
+
+    def put(self, key: ScheduleKey, schedule: Schedule) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(key)
+        tmp = f"{path}.{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}.tmp"
+        payload = {"key": key.to_dict(), "schedule": [[list(team) for team in partition] for partition in schedule]}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+        self._cache[key] = schedule
+
+    def get_or_generate(self, key: ScheduleKey, rng: np.random.Generator, config: Config) -> Schedule:
+        """The stored schedule, or `generate_schedule(rng, config)` stored under `key`.
+
+        `rng` must be the schedule stream of `key.schedule_seed` for the entry to be reusable.
+        """
+        schedule = self.get(key)
+        if schedule is None:
+            schedule = generate_schedule(rng, config)
+            self.put(key, schedule)
+        return schedule
+
+
+_LIBRARIES: Dict[str, ScheduleLibrary] = {}
+
+
+def open_library(root: str) -> ScheduleLibrary:
+    """One `ScheduleLibrary` per directory and process, so sweeps read each entry once."""
+    root = os.path.abspath(root)
+    if root not in _LIBRARIES:
+        _LIBRARIES[root] = ScheduleLibrary(root)
+    return _LIBRARIES[root]
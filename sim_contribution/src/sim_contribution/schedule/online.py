@@ -0,0 +1,160 @@
+"""Online Phase A scheduling: choose each match's partition after observing the previous ones.
+
+`OnlineScheduler` keeps per-player size counts, per-pair and per-coalition
+observation counts and running y variances (Welford), updated in `observe`.
+A candidate partition is scored as the sum of its teams' gains:
+
+- coverage, with the weights of `schedule_penalty`: a first solo match for a
+  player (1000), a first 2- or 3-player team for a player (5 each), a first
+  observation of a pair (0.1);
+- uncertainty reduction, weighted by `online_uncertainty_weight`: one more
+  observation of a coalition (or pair) with n observations and y variance s^2
+  lowers the variance of its mean from s^2/(n+1) to s^2/(n+2) (one prior
+  pseudo-observation; s^2 falls back to the variance of all y seen so far, then
+  to `noise_sigma^2`).
+
+`next_partition` is an anytime search: it starts from a candidate built like
+the fixed schedule (one solo player, the rest in teams of 2..`team_size_max`),
+then mixes fresh candidates with swaps of two players from the best one, and
+returns the best partition found when `online_decision_seconds` of wall
+time or `online_candidates` evaluations are used up. Team gains are separable,
+so a swap is scored from its two teams only. When the evaluation cap is hit
+first (the default on small leagues), decisions do not depend on machine speed.
+"""
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.schedule.generator import _random_partition_from_pool
+from sim_contribution.schedule.types import Partition, Team
+
+_SOLO_GAIN = 1000.0
+_SIZE_GAIN = 5.0
+_PAIR_GAIN = 0.1
+
+
+def _reduction(n: float, variance: float) -> float:
+    return variance / ((n + 1.0) * (n + 2.0))
+
+
+class OnlineScheduler:
+    def __init__(self, config: Config) -> None:
+        n = config.n_players
+        self.config = config
+        self.solo_counts = np.zeros(n, dtype=np.int64)
+        self.size_counts = np.zeros((n, config.team_size_max + 1), dtype=np.int64)
+        self.pair_n = np.zeros((n, n))
+        self.pair_mean = np.zeros((n, n))
+        self.pair_m2 = np.zeros((n, n))
+        # coalition -> [n, mean, m2]
+        self.coalitions: Dict[Team, List[float]] = {}
+        self.y_n = 0
+        self.y_mean = 0.0
+        self.y_m2 = 0.0
+        self.decision_seconds: List[float] = []
+        self.evaluations: List[int] = []
+
+    def observe(self, partition: Partition, y_values: List[float]) -> None:
+        for team, y in zip(partition, y_values):
+            key = tuple(sorted(team))
+            stats = self.coalitions.setdefault(key, [0.0, 0.0, 0.0])
+            stats[0] += 1.0
+            delta = y - stats[1]
+            stats[1] += delta / stats[0]
+            stats[2] += delta * (y - stats[1])
+            if len(key) == 1:
+                self.solo_counts[key[0]] += 1
+            self.size_counts[list(key), min(len(key), self.config.team_size_max)] += 1
+            for a in range(len(key)):
+                for b in range(a + 1, len(key)):
+                    i, j = key[a], key[b]
+                    self.pair_n[i, j] += 1.0
+                    delta = y - self.pair_mean[i, j]
+                    self.pair_mean[i, j] += delta / self.pair_n[i, j]
+                    self.pair_m2[i, j] += delta * (y - self.pair_mean[i, j])
+            self.y_n += 1
+            delta = y - self.y_mean
+            self.y_mean += delta / self.y_n
+            self.y_m2 += delta * (y - self.y_mean)
+
+    def _prior_variance(self) -> float:
+        if self.y_n >= 2 and self.y_m2 > 0:
+            return self.y_m2 / (self.y_n - 1)
+        return self.config.noise_sigma**2
+
+    def team_gain(self, team: Team, prior: Optional[float] = None) -> float:
+        prior = self._prior_variance() if prior is None else prior
+        key = tuple(sorted(team))
+        size = len(key)
+        gain = 0.0
+        if size == 1:
+            gain += _SOLO_GAIN * (self.solo_counts[key[0]] == 0)
+        elif size in (2, 3):
+            gain += _SIZE_GAIN * sum(self.size_counts[i, size] == 0 for i in key)
+        stats = self.coalitions.get(key)
+        n = stats[0] if stats is not None else 0.0
+        variance = stats[2] / (n - 1.0) if n >= 2 else prior
+        uncertainty = _reduction(n, variance)
+        for a in range(size):
+            for b in range(a + 1, size):
+                i, j = key[a], key[b]
+                pair_n = self.pair_n[i, j]
+                gain += _PAIR_GAIN * (pair_n == 0)
+                pair_variance = self.pair_m2[i, j] / (pair_n - 1.0) if pair_n >= 2 else prior
+                uncertainty += _reduction(pair_n, pair_variance)
+        return gain + self.config.online_uncertainty_weight * uncertainty
+
+    def _candidate(self, rng: np.random.Generator) -> Partition:
+        players = list(range(self.config.n_players))
+        unsolo = np.flatnonzero(self.solo_counts == 0)
+        solo_player = int(rng.choice(unsolo)) if unsolo.size else int(rng.choice(players))
+        players.remove(solo_player)
+        teams: Partition = [(solo_player,)]
+        teams.extend(
+            _random_partition_from_pool(
+                players,
+                rng,
+                min_size=max(2, self.config.team_size_min),
+                max_size=self.config.team_size_max,
+                allow_size1=False,
+            )
+        )
+        return teams
+
+    def next_partition(self, rng: np.random.Generator) -> Partition:
+        started = time.perf_counter()
+        deadline = started + self.config.online_decision_seconds
+        prior = self._prior_variance()
+        best = self._candidate(rng)
+        gains = [self.team_gain(team, prior) for team in best]
+        best_score = sum(gains)
+        evaluations = 1
+        while evaluations < self.config.online_candidates and time.perf_counter() < deadline:
+            evaluations += 1
+            # A fresh candidate costs as much as len(best) swaps; spend about half the time on each.
+            if evaluations % (len(best) + 1) == 0 or len(best) < 2:
+                candidate = self._candidate(rng)
+                candidate_gains = [self.team_gain(team, prior) for team in candidate]
+                if sum(candidate_gains) > best_score:
+                    best, gains, best_score = candidate, candidate_gains, sum(candidate_gains)
+                continue
+            # Swap two players of different teams (team sizes are kept).
+            t1, t2 = (int(t) for t in rng.choice(len(best), size=2, replace=False))
+            p1, p2 = int(rng.integers(len(best[t1]))), int(rng.integers(len(best[t2])))
+            team1 = best[t1][:p1] + (best[t2][p2],) + best[t1][p1 + 1 :]
+            team2 = best[t2][:p2] + (best[t1][p1],) + best[t2][p2 + 1 :]
+            gain1, gain2 = self.team_gain(team1, prior), self.team_gain(team2, prior)
+            score = best_score - gains[t1] - gains[t2] + gain1 + gain2
+            if score > best_score:
+                best = list(best)
+                best[t1], best[t2] = team1, team2
+                gains = list(gains)
+                gains[t1], gains[t2] = gain1, gain2
+                best_score = score
+        self.decision_seconds.append(time.perf_counter() - started)
+        self.evaluations.append(evaluations)
+        return best
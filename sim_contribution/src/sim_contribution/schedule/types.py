@@ -7,6 +7,9 @@ Team = Tuple[int, ...]
 Partition = List[Team]
 Schedule = List[Partition]
 
+# Config.schedule_mode values: all partitions up front / chosen after each match (schedule/online.py)
+SCHEDULE_MODES = ("fixed", "online")
+
 
 @dataclass(frozen=True)
 class MatchSchedule:
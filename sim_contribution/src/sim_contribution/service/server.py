@@ -0,0 +1,236 @@
+"""Local proposal service: JSON lines over a Unix socket or a localhost TCP port.
+
+Each request is one JSON object per line, each answer one line:
+
+    {"op": "append", "match": {"teams": [{"members": [0, 4, 7], "y_obs": 1.3}, ...]}}
+    {"op": "propose", "strategy": "greedy_interaction", "seed": 0}
+    {"op": "stats"}
+    {"op": "metrics"}
+
+Answers carry `"ok"` plus the result (or `"error"`), and echo the request's
+`"id"` if given. Work runs on a thread pool of `max_concurrent` workers; at
+most `max_concurrent` requests are processed at once, later ones wait for a
+slot. Appends are serialized by `LeagueState`; proposals read the snapshot
+current when they start. Per-op latency histograms (queueing included) are
+returned by `stats` and, in Prometheus text format, by `metrics`.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import os
+import socket
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from sim_contribution.service.state import LeagueState
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+_PREFIX = "sim_service"
+_MAX_LINE = 16 * 2**20
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+    @property
+    def n(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when empty or in +Inf)."""
+        target = q * self.n
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            running += count
+            if count and running >= target:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.n,
+            "sum_seconds": self.total,
+            "buckets": {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.counts)},
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class ServiceMetrics:
+    """Latency histograms per op; only touched from the event loop."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.in_flight = 0
+        self.waiting = 0
+
+    def record(self, op: str, seconds: float, ok: bool) -> None:
+        self.latency.setdefault(op, LatencyHistogram()).observe(seconds)
+        if not ok:
+            self.errors[op] = self.errors.get(op, 0) + 1
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "uptime_seconds": time.monotonic() - self.started,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "errors": dict(self.errors),
+            "latency": {op: hist.to_dict() for op, hist in sorted(self.latency.items())},
+        }
+
+    def format_prometheus(self) -> str:
+        lines: List[str] = [
+            f"# HELP {_PREFIX}_request_seconds Request latency, queueing included.",
+            f"# TYPE {_PREFIX}_request_seconds histogram",
+        ]
+        for op, hist in sorted(self.latency.items()):
+            running = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), hist.counts):
+                running += count
+                lines.append(f'{_PREFIX}_request_seconds_bucket{{op="{op}",le="{bound}"}} {running}')
+            lines.append(f'{_PREFIX}_request_seconds_sum{{op="{op}"}} {hist.total:.6g}')
+            lines.append(f'{_PREFIX}_request_seconds_count{{op="{op}"}} {hist.n}')
+        lines.append(f"# HELP {_PREFIX}_request_errors_total Failed requests.")
+        lines.append(f"# TYPE {_PREFIX}_request_errors_total counter")
+        for op, count in sorted(self.errors.items()):
+            lines.append(f'{_PREFIX}_request_errors_total{{op="{op}"}} {count}')
+        lines.append(f"# HELP {_PREFIX}_in_flight Requests being processed.")
+        lines.append(f"# TYPE {_PREFIX}_in_flight gauge")
+        lines.append(f"{_PREFIX}_in_flight {self.in_flight}")
+        lines.append(f"# HELP {_PREFIX}_waiting Requests waiting for a slot.")
+        lines.append(f"# TYPE {_PREFIX}_waiting gauge")
+        lines.append(f"{_PREFIX}_waiting {self.waiting}")
+        return "\n".join(lines) + "\n"
+
+
+class ProposalServer:
+    def __init__(self, state: LeagueState, max_concurrent: int = 4) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        self.state = state
+        self.max_concurrent = max_concurrent
+        self.metrics = ServiceMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="proposal")
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _execute(self, request: dict) -> Dict[str, object]:
+        op = request.get("op")
+        if op == "append":
+            snapshot = self.state.append(request["match"])
+            return {"version": snapshot.version, "match_id": int(snapshot.aggregates.match_ids[-1])}
+        if op == "propose":
+            partition, snapshot = self.state.propose(str(request["strategy"]), seed=int(request.get("seed", 0)))
+            return {"version": snapshot.version, "partition": [list(team) for team in partition]}
+        raise ValueError(f"Unknown op: {op!r}")
+
+    async def handle(self, request: dict) -> Dict[str, object]:
+        op = str(request.get("op"))
+        started = time.perf_counter()
+        if op == "stats":
+            response: Dict[str, object] = {"ok": True, "state": self.state.describe(), "service": self.metrics.to_dict()}
+        elif op == "metrics":
+            response = {"ok": True, "text": self.metrics.format_prometheus()}
+        else:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_concurrent)
+            self.metrics.waiting += 1
+            async with self._slots:
+                self.metrics.waiting -= 1
+                self.metrics.in_flight += 1
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(self._executor, self._execute, request)
+                    response = {"ok": True, **result}
+                except (KeyError, TypeError, ValueError) as exc:
+                    response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                except Exception as exc:  # one bad request must not drop the connection
+                    response = {"ok": False, "error": f"Internal error: {type(exc).__name__}: {exc}"}
+                finally:
+                    self.metrics.in_flight -= 1
+        self.metrics.record(op, time.perf_counter() - started, bool(response["ok"]))
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Over _MAX_LINE: the rest of the line may still be unread, so answer and close.
+                    writer.write(json.dumps({"ok": False, "error": "request too large"}).encode("utf-8") + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                except ValueError as exc:
+                    response: Dict[str, object] = {"ok": False, "error": f"Bad request: {exc}"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0, ready=None) -> None:
+        """Serve on the Unix socket `path`, else on `host:port`, until cancelled.
+
+        `ready(address)` is called once listening (address: the socket path or `(host, port)`).
+        A stale socket at `path` is replaced; any other existing file is an error.
+        """
+        if path is not None:
+            if os.path.lexists(path):
+                if not _is_socket(path):
+                    raise FileExistsError(f"Not a socket, refusing to replace it: {path}")
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self._connection, path=path, limit=_MAX_LINE)
+            address: object = path
+        else:
+            server = await asyncio.start_server(self._connection, host=host, port=port, limit=_MAX_LINE)
+            address = server.sockets[0].getsockname()[:2]
+        try:
+            async with server:
+                if ready is not None:
+                    ready(address)
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+            if path is not None and _is_socket(path):
+                os.unlink(path)
+
+
+def _is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def request(address: str | Tuple[str, int], payload: dict, timeout: Optional[float] = 30.0) -> dict:
+    """Blocking one-shot client: send `payload`, return the decoded answer."""
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
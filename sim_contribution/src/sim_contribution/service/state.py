@@ -0,0 +1,137 @@
+"""Resident league state of the proposal service.
+
+`LeagueState` keeps the season log, its `IndexAggregates` and the indices of
+the whole log in memory. `append` adds one match incrementally
+(`IndexAggregates.with_match`) and publishes a new immutable `LeagueSnapshot`;
+`propose` runs a strategy on the snapshot current at call time, so proposals
+never see a half-applied append.
+
+Appended teams without a rank are ranked with the `PhaseAStats` of the loaded
+log, as Phase A ranks its own observations.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.crossval import fold_strategy
+from sim_contribution.indices.aggregates import FoldIndices, IndexAggregates
+from sim_contribution.log.schema import MatchLog, SeasonLog, TeamLog
+from sim_contribution.observation.ranking import RANK_ORDER, assign_rank, z_score
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.registry import get_strategy
+
+
+@dataclass(frozen=True)
+class LeagueSnapshot:
+    version: int
+    matches: Tuple[MatchLog, ...]
+    aggregates: IndexAggregates
+    indices: FoldIndices
+
+
+class LeagueState:
+    def __init__(self, season_log: SeasonLog, config: Config) -> None:
+        self.config = config
+        self.phase_a_stats = season_log.phase_a_stats
+        aggregates = IndexAggregates.from_season_log(season_log, config)
+        self._snapshot = LeagueSnapshot(0, tuple(season_log.matches), aggregates, aggregates.full())
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> LeagueSnapshot:
+        return self._snapshot
+
+    def match_from_dict(self, data: dict, match_id: Optional[int] = None) -> MatchLog:
+        """`{"match_id": ..., "teams": [{"members": [...], "y_obs": ...}, ...]}`; `rank`, `v_true` optional.
+
+        Raises ValueError on a malformed match (no teams, a non-finite `y_obs`) or a player on more than one seat.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Match must be an object, got {type(data).__name__}")
+        if match_id is None:
+            match_id = int(data["match_id"])
+        raw_teams = data.get("teams")
+        if not isinstance(raw_teams, list) or not all(isinstance(team, dict) for team in raw_teams):
+            raise ValueError("Match teams must be a list of objects")
+        if not raw_teams:
+            raise ValueError("Match has no teams")
+        seated: Set[int] = set()
+        teams: List[TeamLog] = []
+        for team_id, team in enumerate(raw_teams):
+            if not isinstance(team.get("members"), list):
+                raise ValueError(f"Team {team_id} members must be a list")
+            members = tuple(int(m) for m in team["members"])
+            if not members or min(members) < 0 or max(members) >= self.config.n_players:
+                raise ValueError(f"Invalid team members: {list(members)}")
+            if len(set(members)) != len(members):
+                raise ValueError(f"Repeated player in team {team_id}: {list(members)}")
+            shared = seated.intersection(members)
+            if shared:
+                raise ValueError(f"Players on more than one team: {sorted(shared)}")
+            seated.update(members)
+            y_obs = float(team["y_obs"])
+            if not math.isfinite(y_obs):
+                raise ValueError(f"Team {team_id} y_obs must be finite, got {y_obs}")
+            z = z_score(y_obs, self.phase_a_stats)
+            rank = str(team.get("rank") or assign_rank(z, self.phase_a_stats.thresholds))
+            if rank not in RANK_ORDER:
+                raise ValueError(f"Unknown rank: {rank}")
+            teams.append(
+                TeamLog(
+                    match_id=match_id,
+                    team_id=team_id,
+                    members=members,
+                    v_true=float(team.get("v_true", float("nan"))),
+                    y_obs=y_obs,
+                    z=z,
+                    rank=rank,
+                    breakdown={},
+                )
+            )
+        return MatchLog(match_id=match_id, teams=teams)
+
+    def next_match_id(self) -> int:
+        ids = self._snapshot.aggregates.match_ids
+        return int(ids.max()) + 1 if ids.size else 0
+
+    def append(self, data: dict) -> LeagueSnapshot:
+        if not isinstance(data, dict):
+            raise ValueError(f"Match must be an object, got {type(data).__name__}")
+        with self._lock:
+            snapshot = self._snapshot
+            match_id = int(data["match_id"]) if data.get("match_id") is not None else self.next_match_id()
+            match = self.match_from_dict(data, match_id=match_id)
+            aggregates = snapshot.aggregates.with_match(match)
+            self._snapshot = LeagueSnapshot(
+                snapshot.version + 1, snapshot.matches + (match,), aggregates, aggregates.full()
+            )
+            return self._snapshot
+
+    def season_log(self, snapshot: Optional[LeagueSnapshot] = None) -> SeasonLog:
+        snapshot = snapshot or self._snapshot
+        return SeasonLog(matches=list(snapshot.matches), phase_a_stats=self.phase_a_stats)
+
+    def propose(self, strategy_name: str, seed: int = 0) -> Tuple[Partition, LeagueSnapshot]:
+        """Built-in index strategies (`fold_strategy`) use the resident indices; others get the `SeasonLog`."""
+        snapshot = self._snapshot
+        rng = np.random.default_rng(seed)
+        fast = fold_strategy(strategy_name)
+        if fast is not None:
+            return fast(snapshot.indices, rng, self.config), snapshot
+        return get_strategy(strategy_name)(self.season_log(snapshot), rng, self.config), snapshot
+
+    def describe(self) -> Dict[str, object]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "n_matches": snapshot.aggregates.n_matches,
+            "n_teams": int(snapshot.aggregates.y.size),
+            "n_coalitions": int(snapshot.indices.order.size),
+            "n_pairs": int(snapshot.indices.pair_index.size),
+        }
@@ -1,40 +1,86 @@
 from __future__ import annotations
 
+from itertools import chain
+from typing import Tuple
+
 import numpy as np
 
 from sim_contribution.config import Config
 from sim_contribution.indices.empirical_interaction import compute_empirical_interaction_scores
+from sim_contribution.indices.types import InteractionScores
 from sim_contribution.log.schema import SeasonLog
 from sim_contribution.schedule.types import Partition
 
+_SCAN_CHUNK = 65536
 
-def greedy_interaction_partition(
-    season_log: SeasonLog, rng: np.random.Generator, config: Config
+
+def _encode_candidates(scores: InteractionScores) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Encode scored coalitions as (members padded with -1, sizes, scores) arrays."""
+    m = len(scores)
+    keys = list(scores.keys())
+    values = np.fromiter(scores.values(), dtype=float, count=m)
+    sizes = np.fromiter((len(key) for key in keys), dtype=np.int64, count=m)
+    k_max = int(sizes.max()) if m else 0
+
+    members = np.full((m, k_max), -1, dtype=np.int64)
+    if m:
+        flat = np.fromiter(chain.from_iterable(keys), dtype=np.int64, count=int(sizes.sum()))
+        rows = np.repeat(np.arange(m), sizes)
+        starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        members[rows, np.arange(flat.size) - starts] = flat
+    return members, sizes, values
+
+
+def greedy_interaction_from_scores(
+    scores: InteractionScores, rng: np.random.Generator, config: Config
 ) -> Partition:
-    scores = compute_empirical_interaction_scores(season_log, config)
-    size_priority = {size: idx for idx, size in enumerate(config.greedy_size_priority)}
-
-    candidates = []
-    for team, score in scores.items():
-        candidates.append((team, score))
-
-    rng.shuffle(candidates)
-    candidates.sort(
-        key=lambda item: (
-            -item[1],
-            size_priority.get(len(item[0]), len(size_priority)),
-        )
-    )
-
-    assigned = set()
+    members, sizes, values = _encode_candidates(scores)
+    return greedy_interaction_from_arrays(members, sizes, values, rng, config)
+
+
+def greedy_interaction_from_arrays(
+    members: np.ndarray, sizes: np.ndarray, values: np.ndarray, rng: np.random.Generator, config: Config
+) -> Partition:
+    """Same as `greedy_interaction_from_scores` on candidates already encoded
+    (rows in the scores' iteration order, which fixes the random tie-break)."""
+    m = values.size
+
+    # Shuffle-then-stable-sort, expressed as a single lexsort: the position each
+    # candidate would take in the shuffled list is the last tie-break key.
+    # `rng.permutation(m)` consumes exactly the draws of `rng.shuffle` on an m-list.
+    shuffled = rng.permutation(m)
+    shuffle_key = np.empty(m, dtype=np.int64)
+    shuffle_key[shuffled] = np.arange(m)
+
+    priority = np.full(int(sizes.max()) + 1 if m else 1, len(config.greedy_size_priority), dtype=np.int64)
+    for idx, size in enumerate(config.greedy_size_priority):
+        if size < priority.size:
+            priority[size] = idx
+    order = np.lexsort((shuffle_key, priority[sizes], -values))
+
+    # Assignment bitset; the extra slot absorbs the -1 padding of short teams.
+    assigned = np.zeros(config.n_players + 1, dtype=bool)
+    padded = np.where(members < 0, config.n_players, members)
+    n_assigned = 0
     partition: Partition = []
 
-    for team, score in candidates:
-        if all(member not in assigned for member in team):
+    for start in range(0, m, _SCAN_CHUNK):
+        if n_assigned == config.n_players:
+            break
+        chunk = order[start : start + _SCAN_CHUNK]
+        # Assignments only grow, so rows blocked at chunk start stay blocked.
+        chunk = chunk[~assigned[padded[chunk]].any(axis=1)]
+        for row, size in zip(members[chunk].tolist(), sizes[chunk].tolist()):
+            team = row[:size]
+            if assigned[team].any():
+                continue
+            assigned[team] = True
+            n_assigned += size
             partition.append(tuple(team))
-            assigned.update(team)
+            if n_assigned == config.n_players:
+                break
 
-    remaining = [p for p in range(config.n_players) if p not in assigned]
+    remaining = [p for p in range(config.n_players) if not assigned[p]]
     rng.shuffle(remaining)
     while remaining:
         if len(remaining) == 1:
@@ -44,3 +90,19 @@ def greedy_interaction_partition(
         partition.append(team)
 
     return partition
+
+
+def interaction_candidates(season_log: SeasonLog, config: Config) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Scored coalitions encoded as by `_encode_candidates`, from `indices/partials.py`
+    when `config.index_workers > 1` (same rows and scores, no dict in between)."""
+    if config.index_workers > 1:
+        from sim_contribution.indices.partials import season_index_partial
+
+        return season_index_partial(season_log, config).fold_indices(config).candidates()
+    return _encode_candidates(compute_empirical_interaction_scores(season_log, config))
+
+
+def greedy_interaction_partition(
+    season_log: SeasonLog, rng: np.random.Generator, config: Config
+) -> Partition:
+    return greedy_interaction_from_arrays(*interaction_candidates(season_log, config), rng, config)
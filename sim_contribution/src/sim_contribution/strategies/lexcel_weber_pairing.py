@@ -1,41 +1,167 @@
+"""Lexcel pairing: accept pairs in descending lexicographic rank-count order.
+
+Pairs are ordered by (A, B, C, D, E) counts descending, then the total
+descending, then a uniform random tie-break ascending, and accepted greedily
+without reusing players until `n_players // 2` pairs are matched.
+
+Only observed pairs carry individual counts; every unobserved pair shares the
+prior vector, so they form one block ordered purely by the tie-break. That
+block is consumed lazily (`argpartition` over the remaining tie-breaks) and,
+once few players are left, by enumerating the pairs among them directly. The
+RNG draws are the same as a shuffle of all pairs followed by one `rng.random()`
+per pair, so a given seed reproduces the full-sort formulation exactly.
+"""
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Optional, Tuple
+
 import numpy as np
 
 from sim_contribution.config import Config
-from sim_contribution.indices.pair_profile import compute_pair_profile
+from sim_contribution.indices.pair_profile import (
+    observed_pair_counts,
+    pair_from_linear_index,
+    pair_linear_index,
+    pair_profile_prior_vector,
+)
 from sim_contribution.log.schema import SeasonLog
 from sim_contribution.schedule.types import Partition
 
+_PAIR_KEY_DTYPE = np.dtype(
+    [
+        ("neg_A", np.int64),
+        ("neg_B", np.int64),
+        ("neg_C", np.int64),
+        ("neg_D", np.int64),
+        ("neg_E", np.int64),
+        ("neg_total", np.int64),
+        ("tie", np.float64),
+    ]
+)
+_DRAW_CHUNK = 1 << 20
+_LAZY_CHUNK = 1 << 16
+
+
+def _pair_keys(counts: np.ndarray, ties: np.ndarray) -> np.ndarray:
+    keys = np.empty(counts.shape[0], dtype=_PAIR_KEY_DTYPE)
+    for idx, name in enumerate(_PAIR_KEY_DTYPE.names[:5]):
+        keys[name] = -counts[:, idx]
+    keys["neg_total"] = -counts.sum(axis=1)
+    keys["tie"] = ties
+    return keys
+
+
+def _draw_tie_breaks(n_pairs: int, rng: np.random.Generator) -> np.ndarray:
+    """Tie-break of each pair (indexed by linear pair index)."""
+    shuffled = rng.permutation(n_pairs)
+    ties = np.empty(n_pairs, dtype=float)
+    for start in range(0, n_pairs, _DRAW_CHUNK):
+        stop = min(start + _DRAW_CHUNK, n_pairs)
+        ties[shuffled[start:stop]] = rng.random(stop - start)
+    return ties
+
+
+class _Matcher:
+    def __init__(self, n_players: int) -> None:
+        self.n_players = n_players
+        self.target = n_players // 2
+        self.used = np.zeros(n_players, dtype=bool)
+        self.pairs: Partition = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.pairs) >= self.target
+
+    def offer(self, linear: np.ndarray) -> None:
+        left, right = pair_from_linear_index(linear, self.n_players)
+        for i, j in zip(left.tolist(), right.tolist()):
+            if self.used[i] or self.used[j]:
+                continue
+            self.pairs.append((i, j))
+            self.used[i] = True
+            self.used[j] = True
+            if self.done:
+                return
+
+
+def _consume_block(matcher: _Matcher, block_ties: np.ndarray, dense_limit: int) -> None:
+    """Offer every pair with a finite entry in `block_ties`, in ascending tie order.
+
+    `block_ties` is modified in place (consumed entries are set to +inf).
+    """
+    remaining = int(np.isfinite(block_ties).sum())
+    while remaining > 0 and not matcher.done:
+        free = np.flatnonzero(~matcher.used)
+        n_free_pairs = free.size * (free.size - 1) // 2
+        if n_free_pairs <= dense_limit:
+            # Only pairs among still-free players can be accepted from here on.
+            a, b = np.triu_indices(free.size, k=1)
+            linear = pair_linear_index(free[a], free[b], matcher.n_players)
+            ties = block_ties[linear]
+            keep = np.isfinite(ties)
+            linear, ties = linear[keep], ties[keep]
+            matcher.offer(linear[np.argsort(ties, kind="stable")])
+            return
+
+        k = min(max(_LAZY_CHUNK, 4 * free.size), remaining)
+        if k < block_ties.size:
+            chunk = np.argpartition(block_ties, k - 1)[:k]
+        else:
+            chunk = np.arange(block_ties.size)
+        chunk = chunk[np.argsort(block_ties[chunk], kind="stable")]
+        matcher.offer(chunk)
+        block_ties[chunk] = np.inf
+        remaining -= k
+
+
+def lexcel_weber_from_counts(
+    observed_index: np.ndarray,
+    observed_counts: np.ndarray,
+    rng: np.random.Generator,
+    config: Config,
+    prior: Optional[Tuple[int, int, int, int, int]] = None,
+) -> Partition:
+    """Pair players from sparse observed pair rank counts (see `compute_observed_pair_counts`)."""
+    n = config.n_players
+    n_pairs = n * (n - 1) // 2
+    ties = _draw_tie_breaks(n_pairs, rng)
+
+    if prior is None:
+        prior = pair_profile_prior_vector(config)
+    prior_fields = np.asarray(list(prior) + [sum(prior)], dtype=np.int64)
+
+    observed_keys = _pair_keys(observed_counts.reshape(-1, 5), ties[observed_index])
+    order = np.argsort(observed_keys, order=_PAIR_KEY_DTYPE.names, kind="stable")
+    observed_index = observed_index[order]
+    observed_keys = observed_keys[order]
+
+    # Position of the prior block among the sorted observed keys (ignoring the
+    # tie-break): compare each key's count fields with the prior's.
+    count_fields = np.column_stack([-observed_keys[name] for name in _PAIR_KEY_DTYPE.names[:6]])
+    diff = count_fields - prior_fields
+    has_diff = diff != 0
+    first_diff = np.argmax(has_diff, axis=1)
+    sign = np.sign(diff[np.arange(diff.shape[0]), first_diff]) * has_diff.any(axis=1)
+    first = int((sign > 0).sum())
+    last = first + int((sign == 0).sum())
+
+    # Observed pairs with the prior's counts interleave with the unobserved pairs
+    # by tie-break; all other observed pairs leave the block.
+    block_ties = ties
+    block_ties[observed_index[:first]] = np.inf
+    block_ties[observed_index[last:]] = np.inf
 
-def _pair_sort_key(vec: Tuple[int, int, int, int, int], total: int, rng: np.random.Generator) -> Tuple:
-    tie_break = rng.random()
-    return tuple([-v for v in vec] + [-total, tie_break])
+    matcher = _Matcher(n)
+    matcher.offer(observed_index[:first])
+    if not matcher.done:
+        _consume_block(matcher, block_ties, dense_limit=4 * _LAZY_CHUNK)
+    if not matcher.done:
+        matcher.offer(observed_index[last:])
+    return matcher.pairs
 
 
 def lexcel_weber_pairing(
     season_log: SeasonLog, rng: np.random.Generator, config: Config
 ) -> Partition:
-    profile = compute_pair_profile(season_log, config)
-    pair_list = []
-
-    for (i, j), vec in profile.items():
-        total = sum(vec)
-        pair_list.append(((i, j), vec, total))
-
-    rng.shuffle(pair_list)
-    pair_list.sort(key=lambda item: _pair_sort_key(item[1], item[2], rng))
-
-    used = set()
-    pairs: Partition = []
-    for (i, j), vec, total in pair_list:
-        if i in used or j in used:
-            continue
-        pairs.append((i, j))
-        used.add(i)
-        used.add(j)
-        if len(pairs) == config.n_players // 2:
-            break
-
-    return pairs
+    index, counts = observed_pair_counts(season_log, config)
+    return lexcel_weber_from_counts(index, counts, rng, config)
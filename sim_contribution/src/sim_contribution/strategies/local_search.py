@@ -0,0 +1,126 @@
+"""Local-search refinement of a proposed partition.
+
+Hill climbing over single-player moves and two-player swaps, evaluated with
+the O(d + k) deltas of `IncrementalPartition`. The value function is either
+the true production model (analysis only; `true_value_model`) or a surrogate
+estimated from the Phase A log (`estimated_value_model`), which keeps the
+refined strategies within the "observation log only" rule.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.indices.empirical_interaction import (
+    compute_empirical_interaction_scores,
+    compute_size_baselines,
+)
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.production.incremental import IncrementalPartition, TeamValueModel
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.types import StrategyFn
+
+
+def estimated_value_model(season_log: SeasonLog, config: Config) -> TeamValueModel:
+    """Additive surrogate from Phase A observations.
+
+    v_hat(T) = base(|T|) + sum_i score({i}) + sum_{i<j} score({i,j}),
+    using the shrunk empirical interaction scores (0 for unobserved coalitions).
+    """
+    n = config.n_players
+    scores = compute_empirical_interaction_scores(season_log, config)
+    size_means = compute_size_baselines(season_log)
+
+    unary = np.zeros(n)
+    pair = np.zeros((n, n))
+    for team, score in scores.items():
+        if len(team) == 1:
+            unary[team[0]] = score
+        elif len(team) == 2:
+            i, j = team
+            pair[i, j] = score
+            pair[j, i] = score
+
+    return TeamValueModel(
+        unary=unary,
+        weight=np.zeros(n),
+        unit=np.zeros((n, 0)),
+        pair=pair,
+        lambda_div=0.0,
+        weight_coef=np.zeros(n + 1),
+        size_term=np.array([size_means.get(k, 0.0) for k in range(n + 1)]),
+    )
+
+
+def improve_partition(
+    partition: Partition,
+    model: TeamValueModel,
+    rng: np.random.Generator,
+    config: Config,
+    allow_moves: bool = True,
+    max_rounds: Optional[int] = None,
+    tol: float = 1e-9,
+) -> Partition:
+    """Best-improvement moves/swaps per player (random order) until a local optimum.
+
+    Moves keep every team within [team_size_min, team_size_max]; swaps keep sizes.
+    With `allow_moves=False` only swaps are tried (e.g. fixed pairings).
+    """
+    state = IncrementalPartition(model, partition)
+    n = model.n_players
+    if max_rounds is None:
+        max_rounds = config.local_search_max_rounds
+
+    for _ in range(max_rounds):
+        improved = False
+        for p in rng.permutation(n).tolist():
+            if state.team_of[p] < 0:
+                continue
+            best_delta = tol
+            best_action = None
+
+            swaps = state.swap_deltas(p)
+            swaps[state.team_of < 0] = -np.inf
+            q = int(np.argmax(swaps))
+            if swaps[q] > best_delta:
+                best_delta, best_action = float(swaps[q]), ("swap", q)
+
+            if allow_moves:
+                src = int(state.team_of[p])
+                left = state.size[src] - 1
+                if left == 0 or left >= config.team_size_min:
+                    moves = state.move_deltas(p)
+                    feasible = (state.size + 1 <= config.team_size_max) & (
+                        (state.size > 0) | (config.team_size_min <= 1)
+                    )
+                    feasible[src] = False
+                    moves[~feasible] = -np.inf
+                    t = int(np.argmax(moves))
+                    if moves[t] > best_delta:
+                        best_delta, best_action = float(moves[t]), ("move", t)
+
+            if best_action is None:
+                continue
+            kind, target = best_action
+            if kind == "swap":
+                state.swap(p, target)
+            else:
+                state.move(p, target)
+            improved = True
+        if not improved:
+            break
+
+    return state.partition()
+
+
+def with_local_search(base: StrategyFn, allow_moves: bool = True) -> StrategyFn:
+    """Wrap a strategy so its partition is refined against the estimated value model."""
+
+    def strategy(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+        partition = base(season_log, rng, config)
+        model = estimated_value_model(season_log, config)
+        return improve_partition(partition, model, rng, config, allow_moves=allow_moves)
+
+    return strategy
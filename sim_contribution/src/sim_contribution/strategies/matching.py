@@ -0,0 +1,505 @@
+"""Maximum-weight matching on a sparse pair graph.
+
+Edges are given as arrays `(left, right, weights)` over players `0..n-1`;
+only edges with a positive weight are used (a matching never gains from the
+others). Two solvers:
+
+- `blossom_matching`: exact maximum-weight matching, Edmonds' blossom
+  algorithm with dual variables (primal-dual, Galil's formulation). O(n^3)
+  time in the worst case (O(n) stages, each with O(n) dual updates of O(n + m)
+  work), O(n + m) memory. Weights are rounded to integers (`_WEIGHT_SCALE`
+  units of the largest weight) so that every comparison is exact.
+- `greedy_augmented_matching`: edges accepted by descending weight (a 1/2
+  approximation), then improved by short augmentations until none is left or
+  `rounds` passes are done. An augmentation adds one non-matching edge (a, b),
+  drops the matching edges at a and b and re-matches the two freed partners,
+  either to each other (an alternating 4-cycle) or each to its best free
+  neighbour (alternating paths of up to 5 edges). Each vertex keeps a heap of
+  its free neighbours (pushed when a neighbour becomes free, stale entries
+  dropped lazily), so the best free neighbour costs O(log deg) amortized:
+  O(m log m) for the greedy pass, O(m) plus O(deg log deg) per augmentation
+  for each augmentation pass. At 2000 players with "interaction" weights it
+  takes 0.1 s at 10 matches (16k edges), 0.5 s at 50 (79k) and 1.6 s at
+  200 (296k).
+
+Both return `mate` (a list, -1 for unmatched players).
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+_WEIGHT_SCALE = 1 << 30
+
+
+def _positive_edges(left: np.ndarray, right: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, ...]:
+    keep = (weights > 0) & (left != right)
+    return left[keep], right[keep], weights[keep]
+
+
+def blossom_matching(n_players: int, left: np.ndarray, right: np.ndarray, weights: np.ndarray) -> List[int]:
+    """Exact maximum-weight matching (not necessarily of maximum cardinality)."""
+    left, right, weights = _positive_edges(left, right, weights)
+    mate_out = [-1] * n_players
+    if weights.size == 0:
+        return mate_out
+    # Only players with an edge take part; vertices are renumbered 0..nvertex-1.
+    players, inverse = np.unique(np.concatenate([left, right]), return_inverse=True)
+    scaled = np.rint(weights * (_WEIGHT_SCALE / weights.max())).astype(np.int64)
+    edges = [
+        (i, j, w)
+        for i, j, w in zip(inverse[: left.size].tolist(), inverse[left.size :].tolist(), scaled.tolist())
+        if w > 0
+    ]
+    mate = _blossom(players.size, edges)
+    for v, m in enumerate(mate):
+        if m >= 0:
+            mate_out[int(players[v])] = int(players[m])
+    return mate_out
+
+
+def _blossom(nvertex: int, edges: List[Tuple[int, int, int]]) -> List[int]:
+    """Edmonds' blossom algorithm on integer weights; `mate[v]` or -1.
+
+    Vertices are 0..nvertex-1, blossoms nvertex..2*nvertex-1. Edge k has the
+    endpoints 2k (its first vertex) and 2k+1 (its second); `mate[v]` holds the
+    remote endpoint of v's matched edge while the algorithm runs.
+    """
+    nedge = len(edges)
+    maxweight = max(w for _, _, w in edges)
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * nedge)]
+    neighbend: List[List[int]] = [[] for _ in range(nvertex)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    mate = [-1] * nvertex
+    # Label of a top-level blossom: 0 free, 1 S (outer), 2 T (inner); 5 marks a scanned S-blossom.
+    label = [0] * (2 * nvertex)
+    labelend = [-1] * (2 * nvertex)
+    inblossom = list(range(nvertex))
+    blossomparent = [-1] * (2 * nvertex)
+    blossomchilds: List = [None] * (2 * nvertex)
+    blossombase = list(range(nvertex)) + [-1] * nvertex
+    blossomendps: List = [None] * (2 * nvertex)
+    bestedge = [-1] * (2 * nvertex)
+    blossombestedges: List = [None] * (2 * nvertex)
+    unusedblossoms = list(range(nvertex, 2 * nvertex))
+    dualvar = [maxweight] * nvertex + [0] * nvertex
+    allowedge = [False] * nedge
+    queue: List[int] = []
+
+    def slack(k: int) -> int:
+        i, j, w = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * w
+
+    def blossom_leaves(b: int) -> List[int]:
+        if b < nvertex:
+            return [b]
+        leaves: List[int] = []
+        stack = [b]
+        while stack:
+            t = stack.pop()
+            if t < nvertex:
+                leaves.append(t)
+            else:
+                stack.extend(blossomchilds[t])
+        return leaves
+
+    def assign_label(w: int, t: int, p: int) -> None:
+        while True:
+            b = inblossom[w]
+            label[w] = label[b] = t
+            labelend[w] = labelend[b] = p
+            bestedge[w] = bestedge[b] = -1
+            if t == 1:
+                queue.extend(blossom_leaves(b))
+                return
+            # T-blossom: its base's mate becomes S.
+            base = blossombase[b]
+            w, t, p = endpoint[mate[base]], 1, mate[base] ^ 1
+
+    def scan_blossom(v: int, w: int) -> int:
+        """Base of the blossom closed by edge (v, w), or -1 if it closes an augmenting path."""
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base: int, k: int) -> None:
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        for v in blossom_leaves(b):
+            if label[inblossom[v]] == 2:
+                # T-vertices become S-vertices inside the new blossom.
+                queue.append(v)
+            inblossom[v] = b
+        # Least-slack edge from the new blossom to each neighbouring S-blossom.
+        bestedgeto: Dict[int, int] = {}
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]] for v in blossom_leaves(bv)]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    i, j, _ = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if bj != b and label[bj] == 1 and (bj not in bestedgeto or slack(k) < slack(bestedgeto[bj])):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = list(bestedgeto.values())
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(k) < slack(bestedge[b]):
+                bestedge[b] = k
+
+    def expand_blossom(b: int, endstage: bool) -> None:
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in blossom_leaves(s):
+                    inblossom[v] = s
+        if not endstage and label[b] == 2:
+            # Relabel the sub-blossoms on the even path from the entry child to the base.
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep, endptrick = 1, 0
+            else:
+                jstep, endptrick = -1, 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                reached = [v for v in blossom_leaves(bv) if label[v] != 0]
+                if reached:
+                    v = reached[0]
+                    label[v] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(v, 2, labelend[v])
+                j += jstep
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b: int, v: int) -> None:
+        """Swap matched/unmatched edges along the even path from v to the base of b."""
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep, endptrick = 1, 0
+        else:
+            jstep, endptrick = -1, 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+
+    def augment_matching(k: int) -> None:
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in range(nvertex):
+        label[:] = [0] * (2 * nvertex)
+        bestedge[:] = [-1] * (2 * nvertex)
+        blossombestedges[nvertex:] = [None] * nvertex
+        allowedge[:] = [False] * nedge
+        queue[:] = []
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+            if augmented:
+                break
+
+            # Dual update: the largest step that keeps every slack and blossom dual >= 0.
+            deltatype = 1
+            delta = min(dualvar[:nvertex])
+            deltaedge = deltablossom = -1
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if d < delta:
+                        delta, deltatype, deltaedge = d, 2, bestedge[v]
+            for b in range(2 * nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if d < delta:
+                        delta, deltatype, deltaedge = d, 3, bestedge[b]
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2 and dualvar[b] < delta:
+                    delta, deltatype, deltablossom = dualvar[b], 4, b
+
+            for v in range(nvertex):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                # Some free vertex reached dual 0: the matching is optimal.
+                break
+            if deltatype in (2, 3):
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            else:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+        # End of stage: expand S-blossoms whose dual reached 0.
+        for b in range(nvertex, 2 * nvertex):
+            if blossomparent[b] == -1 and blossombase[b] >= 0 and label[b] == 1 and dualvar[b] == 0:
+                expand_blossom(b, True)
+
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
+
+
+def greedy_augmented_matching(
+    n_players: int, left: np.ndarray, right: np.ndarray, weights: np.ndarray, rounds: int
+) -> List[int]:
+    """Greedy matching improved by short augmentations (see the module docstring)."""
+    left, right, weights = _positive_edges(left, right, weights)
+    mate = [-1] * n_players
+    if weights.size == 0:
+        return mate
+    order = np.argsort(-weights, kind="stable")
+    edges = list(zip(left[order].tolist(), right[order].tolist(), weights[order].tolist()))
+    for i, j, _ in edges:
+        if mate[i] == -1 and mate[j] == -1:
+            mate[i], mate[j] = j, i
+
+    weight_of: Dict[Tuple[int, int], float] = {}
+    top = [0.0] * n_players
+    degree = [0] * n_players
+    # neighbours[u]: (v, -w, rank of u among v's edges), ranks in descending weight order.
+    neighbours: List[List[Tuple[int, float, int]]] = [[] for _ in range(n_players)]
+    for i, j, w in edges:
+        weight_of[(i, j)] = weight_of[(j, i)] = w
+        for v, u in ((i, j), (j, i)):
+            if degree[v] == 0:
+                top[v] = w  # edges are in descending weight order
+            neighbours[u].append((v, -w, degree[v]))
+            degree[v] += 1
+    eps = 1e-12 * edges[0][2]
+
+    # free_heap[v]: (-w, rank, u) for neighbours u of v that were free when pushed;
+    # entries of since matched neighbours are dropped when they reach the top.
+    free_heap: List[List[Tuple[float, int, int]]] = [[] for _ in range(n_players)]
+
+    def mark_free(u: int) -> None:
+        for v, neg_w, rank in neighbours[u]:
+            heapq.heappush(free_heap[v], (neg_w, rank, u))
+
+    for u in range(n_players):
+        if mate[u] == -1:
+            mark_free(u)
+
+    def matched_weight(v: int) -> float:
+        return weight_of[(v, mate[v])] if mate[v] >= 0 else 0.0
+
+    def best_free(v: int, exclude: Tuple[int, ...]) -> Tuple[float, int]:
+        """The heaviest edge from v to a free vertex outside `exclude` (first in edge order on ties)."""
+        heap = free_heap[v]
+        skipped = []
+        found = (0.0, -1)
+        while heap:
+            neg_w, _, u = heap[0]
+            if mate[u] != -1:
+                heapq.heappop(heap)
+            elif u in exclude:
+                skipped.append(heapq.heappop(heap))
+            else:
+                found = (-neg_w, u)
+                break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return found
+
+    for _ in range(rounds):
+        improved = False
+        for a, b, w in edges:
+            if mate[a] == b:
+                continue
+            a2, b2 = mate[a], mate[b]
+            base = w - matched_weight(a) - matched_weight(b)
+            bound = base + (top[a2] if a2 >= 0 else 0.0) + (top[b2] if b2 >= 0 else 0.0)
+            if bound <= eps:
+                continue
+            gain, plan = base, ()
+            if a2 >= 0 and b2 >= 0 and (a2, b2) in weight_of and base + weight_of[(a2, b2)] > gain:
+                gain, plan = base + weight_of[(a2, b2)], ((a2, b2),)
+            arms: List[Tuple[int, int]] = []
+            arm_gain = base
+            taken: Tuple[int, ...] = (a, b)
+            for v in (a2, b2):
+                if v >= 0:
+                    wv, u = best_free(v, taken)
+                    if u >= 0:
+                        arms.append((v, u))
+                        arm_gain += wv
+                        taken += (u,)
+            if arm_gain > gain:
+                gain, plan = arm_gain, tuple(arms)
+            if gain <= eps:
+                continue
+            for v in (a2, b2):
+                if v >= 0:
+                    mate[v] = -1
+            mate[a], mate[b] = b, a
+            for u, v in plan:
+                mate[u], mate[v] = v, u
+            for v in (a2, b2):
+                if v >= 0 and mate[v] == -1:
+                    mark_free(v)
+            improved = True
+        if not improved:
+            break
+    return mate
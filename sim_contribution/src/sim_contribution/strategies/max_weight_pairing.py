@@ -0,0 +1,151 @@
+"""Pairing by maximum-weight matching on the pair score graph.
+
+Each observed pair gets a score (`Config.matching_pair_weights`):
+
+- "profile": mean rank points of the pair's teams (A=2, B=1, C=0, D=-1, E=-2),
+  with the pair profile prior added to the counts;
+- "interaction": mean empirical interaction score of the observed coalitions
+  holding the pair.
+
+Unobserved pairs score 0, so the graph is sparse: the matching is solved on
+the positive edges only (`strategies/matching.py`, exact or greedy with
+augmentations per `Config.matching_mode`), and the players it leaves free are
+paired at random, avoiding negative pairs where possible. When those leftover
+pairs are non-negative (the usual case: most pairs are unobserved), the exact
+mode's pairing has the maximum total score over all pairings.
+
+The exact solver's time grows with the number of players times the number of
+distinct positive weights. "profile" weights take few values (45 at 500
+players and 500 matches: 0.12 s for 40k edges) while "interaction" weights
+are nearly all distinct (4.5 s for 50k edges), so `matching_mode="auto"`
+bounds both. Past those bounds the greedy mode runs; with "interaction"
+weights at 2000 players the whole strategy takes 0.13 s at 10 matches, 0.8 s
+at 50 and 2.4 s at 200.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.indices.pair_profile import (
+    observed_pair_counts,
+    pair_from_linear_index,
+    pair_linear_index,
+    pair_profile_prior_vector,
+)
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.greedy_interaction import interaction_candidates
+from sim_contribution.strategies.matching import blossom_matching, greedy_augmented_matching
+
+MATCHING_MODES = ("auto", "exact", "greedy")
+PAIR_WEIGHT_SOURCES = ("profile", "interaction")
+_RANK_POINTS = np.array([2.0, 1.0, 0.0, -1.0, -2.0])
+# Leftover players scanned for a non-negative partner before settling for the best one seen.
+_FILL_SCAN = 64
+
+
+def pair_weights_from_counts(counts: np.ndarray, config: Config) -> np.ndarray:
+    """Mean rank points of each observed pair (rows of `compute_observed_pair_counts`)."""
+    totals = counts.reshape(-1, 5) + np.asarray(pair_profile_prior_vector(config), dtype=float)
+    n_obs = totals.sum(axis=1)
+    return np.divide(totals @ _RANK_POINTS, n_obs, out=np.zeros(n_obs.size), where=n_obs > 0)
+
+
+def pair_weights_from_candidates(
+    members: np.ndarray, sizes: np.ndarray, values: np.ndarray, n_players: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(pair_index, weights): mean score of the coalitions holding each pair
+    (candidates encoded as in `greedy_interaction_from_arrays`)."""
+    k_max = members.shape[1] if members.ndim == 2 else 0
+    linear, scores = [], []
+    for a in range(k_max):
+        for b in range(a + 1, k_max):
+            rows = np.flatnonzero(sizes > b)
+            linear.append(pair_linear_index(members[rows, a], members[rows, b], n_players))
+            scores.append(values[rows])
+    if not linear:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    index, inverse = np.unique(np.concatenate(linear), return_inverse=True)
+    totals = np.bincount(inverse, weights=np.concatenate(scores), minlength=index.size)
+    return index, totals / np.bincount(inverse, minlength=index.size)
+
+
+def _complete_pairs(free: List[int], weight_of: Dict[Tuple[int, int], float], rng: np.random.Generator) -> Partition:
+    """Pair the leftover players at random, preferring partners with a non-negative score."""
+    rng.shuffle(free)
+    pairs: Partition = []
+    while len(free) >= 2:
+        i = free.pop()
+        best, best_weight = len(free) - 1, -np.inf
+        for pos in range(len(free) - 1, max(len(free) - 1 - _FILL_SCAN, -1), -1):
+            j = free[pos]
+            weight = weight_of.get((min(i, j), max(i, j)), 0.0)
+            if weight >= 0:
+                best = pos
+                break
+            if weight > best_weight:
+                best, best_weight = pos, weight
+        j = free.pop(best)
+        pairs.append((min(i, j), max(i, j)))
+    if free:
+        pairs.append((free[0],))
+    return pairs
+
+
+def max_weight_pairing_from_weights(
+    pair_index: np.ndarray, weights: np.ndarray, rng: np.random.Generator, config: Config
+) -> Partition:
+    """Pairs of maximum total weight; `pair_index` holds linear pair indices (see `pair_linear_index`)."""
+    n = config.n_players
+    mode = config.matching_mode
+    if mode not in MATCHING_MODES:
+        raise ValueError(f"Unknown matching_mode: {mode!r} (expected one of {MATCHING_MODES})")
+    if mode == "auto":
+        # Blossom time grows with players x distinct edge weights, not with the edge count
+        # alone: tied "profile" weights stay cheap on dense graphs, "interaction" weights do not.
+        distinct = int(np.unique(weights[weights > 0]).size)
+        small = n <= config.matching_exact_max_players and distinct <= config.matching_exact_max_distinct_weights
+        mode = "exact" if small else "greedy"
+    left, right = pair_from_linear_index(pair_index, n)
+    if mode == "exact":
+        mate = blossom_matching(n, left, right, weights)
+    else:
+        mate = greedy_augmented_matching(n, left, right, weights, config.matching_augment_rounds)
+
+    pairs: Partition = [(v, m) for v, m in enumerate(mate) if m > v]
+    negative = weights < 0
+    weight_of = dict(zip(zip(left[negative].tolist(), right[negative].tolist()), weights[negative].tolist()))
+    pairs.extend(_complete_pairs([v for v, m in enumerate(mate) if m == -1], weight_of, rng))
+    return pairs
+
+
+def max_weight_pairing_from_indices(
+    pair_counts: Callable[[], Tuple[np.ndarray, np.ndarray]],
+    candidates: Callable[[], Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    rng: np.random.Generator,
+    config: Config,
+) -> Partition:
+    """Weights from `pair_counts()` (as `compute_observed_pair_counts`) or
+    `candidates()` (as `FoldIndices.candidates`), whichever the config uses."""
+    if config.matching_pair_weights == "profile":
+        index, counts = pair_counts()
+        weights = pair_weights_from_counts(counts, config)
+    elif config.matching_pair_weights == "interaction":
+        index, weights = pair_weights_from_candidates(*candidates(), config.n_players)
+    else:
+        raise ValueError(
+            f"Unknown matching_pair_weights: {config.matching_pair_weights!r} (expected one of {PAIR_WEIGHT_SOURCES})"
+        )
+    return max_weight_pairing_from_weights(index, weights, rng, config)
+
+
+def max_weight_pairing(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    return max_weight_pairing_from_indices(
+        lambda: observed_pair_counts(season_log, config),
+        lambda: interaction_candidates(season_log, config),
+        rng,
+        config,
+    )
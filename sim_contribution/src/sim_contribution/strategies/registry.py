@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.schedule.types import Partition
+from sim_contribution.strategies.greedy_interaction import greedy_interaction_partition
+from sim_contribution.strategies.lexcel_weber_pairing import lexcel_weber_pairing
+from sim_contribution.strategies.local_search import with_local_search
+from sim_contribution.strategies.max_weight_pairing import max_weight_pairing
+from sim_contribution.strategies.random_partition import random_partition
+from sim_contribution.strategies.types import StrategyFn
+
+
+def _strategy_random(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    return random_partition(config.n_players, rng, config)
+
+
+def _strategy_greedy(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    return greedy_interaction_partition(season_log, rng, config)
+
+
+def _strategy_lexcel(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    return lexcel_weber_pairing(season_log, rng, config)
+
+
+def _strategy_max_weight(season_log: SeasonLog, rng: np.random.Generator, config: Config) -> Partition:
+    return max_weight_pairing(season_log, rng, config)
+
+
+STRATEGIES: Dict[str, StrategyFn] = {
+    "random": _strategy_random,
+    "greedy_interaction": _strategy_greedy,
+    "lexcel_weber": _strategy_lexcel,
+    "greedy_interaction_ls": with_local_search(_strategy_greedy),
+    # Swaps only: keeps the 2-player teams of the pairing.
+    "lexcel_weber_ls": with_local_search(_strategy_lexcel, allow_moves=False),
+    "max_weight_pairing": _strategy_max_weight,
+}
+# The functions registered above; fast paths equivalent to them (`FOLD_STRATEGIES`)
+# apply only while a name still maps to its built-in.
+BUILTIN_STRATEGIES: Dict[str, StrategyFn] = dict(STRATEGIES)
+# Evaluated by `run_experiment` in this order (the order determines the RNG draws).
+DEFAULT_STRATEGIES = ("random", "greedy_interaction", "lexcel_weber")
+
+
+def register_strategy(name: str, fn: StrategyFn, overwrite: bool = False) -> None:
+    if name in STRATEGIES and not overwrite:
+        raise ValueError(f"Strategy already registered: {name}")
+    STRATEGIES[name] = fn
+
+
+def get_strategy(name: str) -> StrategyFn:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        known = ", ".join(sorted(STRATEGIES))
+        raise KeyError(f"Unknown strategy {name!r} (registered: {known})") from None
+
+
+def is_builtin_strategy(name: str) -> bool:
+    """Whether `name` is registered with its built-in function (not replaced by `register_strategy`)."""
+    return name in BUILTIN_STRATEGIES and STRATEGIES.get(name) is BUILTIN_STRATEGIES[name]
+
+
+def list_strategies() -> List[str]:
+    return list(STRATEGIES)
@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+from typing import Callable
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.log.schema import SeasonLog
 from sim_contribution.schedule.types import Partition
 
-__all__ = ["Partition"]
+StrategyFn = Callable[[SeasonLog, np.random.Generator, Config], Partition]
+
+__all__ = ["Partition", "StrategyFn"]
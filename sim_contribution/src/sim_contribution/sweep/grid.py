@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+from typing import Any, Dict, List, Sequence
+
+from sim_contribution.config import Config
+
+_SCALAR_TYPES = {"int": int, "float": float, "bool": bool, "str": str}
+
+
+def _parse_value(field: dataclasses.Field, text: str) -> Any:
+    kind = field.type if isinstance(field.type, str) else getattr(field.type, "__name__", "")
+    if kind == "bool":
+        if text.lower() in ("1", "true", "yes"):
+            return True
+        if text.lower() in ("0", "false", "no"):
+            return False
+        raise ValueError(f"Invalid boolean for {field.name}: {text}")
+    if kind == "Tuple[int, ...]":
+        # Tuple values use "/" inside an axis: greedy_size_priority=3/2/1,2/3/1
+        return tuple(int(part) for part in text.split("/") if part.strip())
+    if kind not in _SCALAR_TYPES:
+        raise ValueError(f"Config.{field.name} ({kind}) cannot be set from the command line")
+    return _SCALAR_TYPES[kind](text)
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[Any]]:
+    """`["lambda_div=0.5,1.0", "kappa=0.1"]` -> `{"lambda_div": [0.5, 1.0], "kappa": [0.1]}`."""
+    fields = {f.name: f for f in dataclasses.fields(Config)}
+    grid: Dict[str, List[Any]] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip()
+        if not sep or name not in fields:
+            raise ValueError(f"Invalid grid axis {spec!r} (expected <Config field>=v1,v2,...)")
+        grid[name] = [_parse_value(fields[name], v.strip()) for v in values.split(",") if v.strip()]
+        if not grid[name]:
+            raise ValueError(f"Grid axis {name} has no values")
+    return grid
+
+
+def grid_points(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the axes, first axis varying slowest; `[{}]` for an empty grid."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def apply_overrides(config: Config, overrides: Dict[str, Any]) -> Config:
+    return dataclasses.replace(config, **overrides)
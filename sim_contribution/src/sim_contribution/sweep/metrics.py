@@ -0,0 +1,288 @@
+"""Live throughput metrics of a running sweep.
+
+`SweepMetrics` accumulates counters from the compute loop (seasons, stage
+times) and from output writers (busy time); `MetricsExporter` snapshots it
+every `interval` seconds into a Prometheus text-format file and/or a one-line
+terminal status:
+
+    metrics = SweepMetrics(total=len(seeds), worker="host-1")
+    with MetricsExporter(metrics, path="sweep.prom", interval=10.0):
+        run_seasons(seeds, config, sink, metrics=metrics)
+
+Stage names are those passed to `run_experiment(record_stage=...)`
+("phase_a", "propose:<strategy>", "phase_b:<strategy>") plus "output" for
+the time the compute loop spends handing reports to the sink.
+"""
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+_PREFIX = "sim_sweep"
+_MIN_WINDOW = 1.0
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    worker: str
+    timestamp: float
+    elapsed: float
+    completed: int
+    total: Optional[int]
+    stage_seconds: Dict[str, float]
+    busy_seconds: Dict[str, float]
+    capacity: Dict[str, int]
+    queue_depth: int
+    peak_rss_self: int
+    peak_rss_children: int
+    recent_rate: Optional[float]
+
+    @property
+    def rate(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        rate = self.recent_rate if self.recent_rate else self.rate
+        if self.total is None or rate <= 0:
+            return None
+        return max(self.total - self.completed, 0) / rate
+
+    def stage_shares(self) -> Dict[str, float]:
+        total = sum(self.stage_seconds.values())
+        return {stage: (sec / total if total > 0 else 0.0) for stage, sec in self.stage_seconds.items()}
+
+    def utilization(self) -> Dict[str, float]:
+        """Busy fraction of each role over the elapsed time (per unit of capacity)."""
+        if self.elapsed <= 0:
+            return {role: 0.0 for role in self.busy_seconds}
+        return {
+            role: busy / (self.elapsed * max(self.capacity.get(role, 1), 1)) for role, busy in self.busy_seconds.items()
+        }
+
+
+def _peak_rss_bytes(who: int) -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(who).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+class SweepMetrics:
+    """Thread-safe counters; writers report through `record_busy`."""
+
+    def __init__(self, total: Optional[int] = None, worker: Optional[str] = None, writers: int = 0) -> None:
+        self.total = total
+        self.worker = worker or f"pid-{os.getpid()}"
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._completed = 0
+        self._stage_seconds: Dict[str, float] = {}
+        self._busy_seconds: Dict[str, float] = {"compute": 0.0}
+        self._capacity: Dict[str, int] = {"compute": 1}
+        if writers > 0:
+            self._busy_seconds["writer"] = 0.0
+            self._capacity["writer"] = writers
+        self._queue_depth: Callable[[], int] = lambda: 0
+        self._last: Optional[Tuple[float, int]] = None
+        self._recent: Optional[float] = None
+
+    def set_queue_depth_source(self, source: Callable[[], int]) -> None:
+        """`source()` returns the number of pending output writes (e.g. `BackgroundSink.pending`)."""
+        self._queue_depth = source
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + seconds
+
+    def record_busy(self, role: str, seconds: float) -> None:
+        with self._lock:
+            self._busy_seconds[role] = self._busy_seconds.get(role, 0.0) + seconds
+
+    def record_write(self, label: str, seconds: float) -> None:
+        """`BackgroundSink` observer."""
+        self.record_busy("writer", seconds)
+
+    def season_done(self, compute_seconds: float) -> None:
+        with self._lock:
+            self._completed += 1
+            self._busy_seconds["compute"] += compute_seconds
+
+    def snapshot(self) -> MetricsSnapshot:
+        now = time.monotonic()
+        with self._lock:
+            completed = self._completed
+            stage_seconds = dict(self._stage_seconds)
+            busy_seconds = dict(self._busy_seconds)
+            capacity = dict(self._capacity)
+            # Windows shorter than _MIN_WINDOW (e.g. the final export) keep the previous rate.
+            if self._last is None:
+                self._last = (now, completed)
+            elif now - self._last[0] >= _MIN_WINDOW:
+                self._recent = (completed - self._last[1]) / (now - self._last[0])
+                self._last = (now, completed)
+            recent = self._recent
+        try:
+            depth = int(self._queue_depth())
+        except Exception:
+            depth = 0
+        return MetricsSnapshot(
+            worker=self.worker,
+            timestamp=time.time(),
+            elapsed=now - self._started,
+            completed=completed,
+            total=self.total,
+            stage_seconds=stage_seconds,
+            busy_seconds=busy_seconds,
+            capacity=capacity,
+            queue_depth=depth,
+            peak_rss_self=_peak_rss_bytes(resource.RUSAGE_SELF),
+            peak_rss_children=_peak_rss_bytes(resource.RUSAGE_CHILDREN),
+            recent_rate=recent,
+        )
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(snapshot: MetricsSnapshot) -> str:
+    worker = f'worker="{_label(snapshot.worker)}"'
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]) -> None:
+        lines.append(f"# HELP {_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {_PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{_PREFIX}_{name}{{{labels}}} {value:.6g}")
+
+    metric("seasons_completed_total", "counter", "Seasons finished by this worker.", [(worker, snapshot.completed)])
+    if snapshot.total is not None:
+        metric("seasons_planned", "gauge", "Seasons this worker was asked to run.", [(worker, snapshot.total)])
+    metric("seasons_per_second", "gauge", "Mean throughput since start.", [(worker, snapshot.rate)])
+    if snapshot.recent_rate is not None:
+        metric(
+            "recent_seasons_per_second", "gauge", "Throughput over the last export interval.", [(worker, snapshot.recent_rate)]
+        )
+    shares = snapshot.stage_shares()
+    metric(
+        "stage_seconds_total",
+        "counter",
+        "Wall time spent per stage.",
+        [(f'{worker},stage="{_label(stage)}"', sec) for stage, sec in sorted(snapshot.stage_seconds.items())],
+    )
+    metric(
+        "stage_share",
+        "gauge",
+        "Fraction of staged time spent per stage.",
+        [(f'{worker},stage="{_label(stage)}"', share) for stage, share in sorted(shares.items())],
+    )
+    metric(
+        "utilization",
+        "gauge",
+        "Busy fraction per role (compute loop, output writers).",
+        [(f'{worker},role="{role}"', value) for role, value in sorted(snapshot.utilization().items())],
+    )
+    metric("queue_depth", "gauge", "Pending output writes.", [(worker, snapshot.queue_depth)])
+    metric(
+        "peak_rss_bytes",
+        "gauge",
+        "Peak resident set size.",
+        [(f'{worker},process="self"', snapshot.peak_rss_self), (f'{worker},process="children"', snapshot.peak_rss_children)],
+    )
+    if snapshot.eta is not None:
+        metric("eta_seconds", "gauge", "Estimated time to finish.", [(worker, snapshot.eta)])
+    metric("last_update_timestamp_seconds", "gauge", "Unix time of this export.", [(worker, snapshot.timestamp)])
+    return "\n".join(lines) + "\n"
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def format_status(snapshot: MetricsSnapshot, top_stages: int = 4) -> str:
+    done = f"{snapshot.completed}/{snapshot.total}" if snapshot.total is not None else str(snapshot.completed)
+    rate = snapshot.recent_rate if snapshot.recent_rate is not None else snapshot.rate
+    shares = sorted(snapshot.stage_shares().items(), key=lambda kv: -kv[1])[:top_stages]
+    parts = [
+        f"[{done}] {rate:.2f} seasons/s",
+        " ".join(f"{stage} {share:.0%}" for stage, share in shares) or "-",
+        "util " + " ".join(f"{role} {value:.0%}" for role, value in sorted(snapshot.utilization().items())),
+        f"queue {snapshot.queue_depth}",
+        f"rss {max(snapshot.peak_rss_self, snapshot.peak_rss_children) / 2**20:.0f}MB",
+    ]
+    if snapshot.eta is not None:
+        parts.append(f"eta {_duration(snapshot.eta)}")
+    return " | ".join(parts)
+
+
+def write_prometheus(snapshot: MetricsSnapshot, path: str) -> None:
+    """Atomic replace so scrapers never read a partial file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(format_prometheus(snapshot))
+    os.replace(tmp, path)
+
+
+class MetricsExporter:
+    """Background thread exporting `metrics` every `interval` seconds (and once on exit).
+
+    A failed export (e.g. an unwritable metrics file) is reported on stderr and
+    the next one is attempted on schedule; it never stops the sweep.
+    """
+
+    def __init__(
+        self,
+        metrics: SweepMetrics,
+        path: Optional[str] = None,
+        interval: float = 10.0,
+        stream: Optional[TextIO] = None,
+    ) -> None:
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stream = stream
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def export(self) -> MetricsSnapshot:
+        snapshot = self.metrics.snapshot()
+        if self.path is not None:
+            write_prometheus(snapshot, self.path)
+        if self.stream is not None:
+            line = format_status(snapshot)
+            if self.stream.isatty():
+                self.stream.write("\r\x1b[2K" + line)
+            else:
+                self.stream.write(line + "\n")
+            self.stream.flush()
+        return snapshot
+
+    def _export_logged(self) -> None:
+        try:
+            self.export()
+        except Exception as exc:
+            print(f"metrics export failed: {exc!r}", file=sys.stderr, flush=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._export_logged()
+
+    def __enter__(self) -> "MetricsExporter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._export_logged()
+        if self.stream is not None and self.stream.isatty():
+            self.stream.write("\n")
+            self.stream.flush()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable, List, Optional, Sequence
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.runner import run_experiment
+from sim_contribution.evaluation.aggregation import SweepAggregate
+from sim_contribution.evaluation.crosscheck import CrossChecker
+from sim_contribution.evaluation.sink import OutputSink
+from sim_contribution.strategies.registry import DEFAULT_STRATEGIES
+from sim_contribution.sweep.metrics import SweepMetrics
+
+
+def season_label(seed: int) -> str:
+    return f"seed_{seed:06d}"
+
+
+def parse_seeds(spec: str) -> List[int]:
+    """`"42"`, `"0:100"` (half-open range) or `"1,5,9"`."""
+    if ":" in spec:
+        start, stop = spec.split(":", 1)
+        return list(range(int(start), int(stop)))
+    return [int(part) for part in spec.split(",") if part.strip()]
+
+
+def run_seasons(
+    seeds: Iterable[int],
+    config: Config,
+    sink: OutputSink,
+    strategy_names: Sequence[str] = DEFAULT_STRATEGIES,
+    metrics: Optional[SweepMetrics] = None,
+    checker: Optional[CrossChecker] = None,
+) -> SweepAggregate:
+    """Run one experiment per seed, handing each report to `sink` as soon as it is done.
+
+    Only the streaming aggregate of the results is kept in memory. With
+    `checker`, each season is also cross-checked (fast vs reference paths).
+    """
+    record_stage = metrics.record_stage if metrics is not None else None
+    aggregate = SweepAggregate()
+    for seed in seeds:
+        started = time.perf_counter()
+        report = run_experiment(seed, config, strategy_names, record_stage=record_stage)
+        if checker is not None:
+            checking = time.perf_counter()
+            checker.check_season(report.season_log, report.true_params, seed, config)
+            if metrics is not None:
+                metrics.record_stage("crosscheck", time.perf_counter() - checking)
+        computed = time.perf_counter()
+        sink.submit(report, season_label(seed))
+        if metrics is not None:
+            metrics.record_stage("output", time.perf_counter() - computed)
+            metrics.season_done(computed - started)
+        aggregate.add_season(report.strategy_results)
+    sink.flush()
+    return aggregate
@@ -0,0 +1,446 @@
+"""Sharded sweeps coordinated through a shared directory (e.g. an NFS mount).
+
+The work space is the ordered list of units (grid point × seed); every
+strategy of a unit runs in the same season, as in `run_seasons`, so the
+results are those of an unsharded sweep. Units are cut into fixed-size
+shards, each represented by a file that moves between directories with
+atomic renames:
+
+    root/plan.json                 seeds, grid points, strategies, shard size, lease
+    root/todo/shard_00007          unclaimed
+    root/claimed/shard_00007@host-123
+                                   claimed; its mtime is the worker's lease heartbeat
+    root/done/shard_00007.jsonl    result rows (written to a temp file, then renamed)
+    root/done/shard_00007.agg.json per grid point `SweepAggregate` of the shard
+                                   (published before the rows)
+
+A worker claims a shard by renaming it from `todo/` to `claimed/` (only one
+rename can succeed), refreshes the claim's mtime from a heartbeat thread, and
+removes the claim after publishing its results. Claims whose mtime is older
+than the lease are renamed back to `todo/` by any worker; a worker that
+finds its claim gone stops working on the shard. Results are deterministic, so a
+shard completed twice writes identical rows.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.aggregation import SweepAggregate
+from sim_contribution.strategies.registry import DEFAULT_STRATEGIES
+from sim_contribution.sweep.grid import apply_overrides
+from sim_contribution.sweep.metrics import SweepMetrics
+from sim_contribution.sweep.runner import season_label
+
+PLAN_FILENAME = "plan.json"
+RESULTS_FILENAME = "results.jsonl"
+SUMMARY_FILENAME = "summary.csv"
+PAIRS_FILENAME = "summary_pairs.csv"
+AGGREGATE_FILENAME = "aggregate.json"
+_CLAIM_SEP = "@"
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    seeds: Tuple[int, ...]
+    grid: Tuple[Dict[str, Any], ...]
+    strategies: Tuple[str, ...]
+    shard_size: int
+    lease_seconds: float
+
+    @property
+    def n_units(self) -> int:
+        return len(self.grid) * len(self.seeds)
+
+    @property
+    def n_shards(self) -> int:
+        return -(-self.n_units // self.shard_size)
+
+    def units(self, shard: int) -> List[Tuple[int, int]]:
+        """(grid index, seed) pairs of `shard`, grid point varying slowest."""
+        start = shard * self.shard_size
+        stop = min(start + self.shard_size, self.n_units)
+        return [(u // len(self.seeds), self.seeds[u % len(self.seeds)]) for u in range(start, stop)]
+
+    def to_dict(self) -> dict:
+        return {
+            "seeds": list(self.seeds),
+            "grid": [dict(point) for point in self.grid],
+            "strategies": list(self.strategies),
+            "shard_size": self.shard_size,
+            "lease_seconds": self.lease_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ShardPlan":
+        return cls(
+            seeds=tuple(int(s) for s in data["seeds"]),
+            grid=tuple(dict(point) for point in data["grid"]),
+            strategies=tuple(data["strategies"]),
+            shard_size=int(data["shard_size"]),
+            lease_seconds=float(data["lease_seconds"]),
+        )
+
+
+@dataclass(frozen=True)
+class ShardStatus:
+    total: int
+    todo: int
+    claimed: int
+    done: int
+
+    def to_dict(self) -> dict:
+        return {"total": self.total, "todo": self.todo, "claimed": self.claimed, "done": self.done}
+
+
+def shard_name(shard: int) -> str:
+    return f"shard_{shard:05d}"
+
+
+def _dirs(root: str) -> Tuple[str, str, str]:
+    return os.path.join(root, "todo"), os.path.join(root, "claimed"), os.path.join(root, "done")
+
+
+def _done_path(root: str, name: str) -> str:
+    return os.path.join(root, "done", f"{name}.jsonl")
+
+
+def _aggregate_path(root: str, name: str) -> str:
+    return os.path.join(root, "done", f"{name}.agg.json")
+
+
+def _write_atomic(path: str, text: str) -> None:
+    tmp = f"{path}.{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def init_shards(
+    root: str,
+    seeds: Sequence[int],
+    grid: Sequence[Dict[str, Any]] = ({},),
+    strategies: Sequence[str] = DEFAULT_STRATEGIES,
+    shard_size: int = 10,
+    lease_seconds: float = 600.0,
+) -> ShardPlan:
+    """Create the queue under `root`, or check that an existing one has the same plan."""
+    if shard_size < 1:
+        raise ValueError("shard_size must be positive")
+    plan = ShardPlan(
+        seeds=tuple(int(s) for s in seeds),
+        grid=tuple(dict(point) for point in grid) or ({},),
+        strategies=tuple(strategies),
+        shard_size=shard_size,
+        lease_seconds=float(lease_seconds),
+    )
+    plan_path = os.path.join(root, PLAN_FILENAME)
+    if os.path.exists(plan_path):
+        existing = load_plan(root)
+        if existing != plan:
+            raise ValueError(f"{plan_path} already exists with a different plan")
+        return existing
+
+    todo, claimed, done = _dirs(root)
+    for path in (todo, claimed, done):
+        os.makedirs(path, exist_ok=True)
+    for shard in range(plan.n_shards):
+        open(os.path.join(todo, shard_name(shard)), "a").close()
+
+    # os.link fails if the plan appeared meanwhile, so at most one plan wins.
+    tmp = f"{plan_path}.{socket.gethostname()}-{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan.to_dict(), f, indent=2)
+    try:
+        os.link(tmp, plan_path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+    existing = load_plan(root)
+    if existing != plan:
+        raise ValueError(f"{plan_path} already exists with a different plan")
+    return existing
+
+
+def load_plan(root: str) -> ShardPlan:
+    with open(os.path.join(root, PLAN_FILENAME), "r", encoding="utf-8") as f:
+        return ShardPlan.from_dict(json.load(f))
+
+
+def shard_status(root: str) -> ShardStatus:
+    plan = load_plan(root)
+    todo, claimed, done = _dirs(root)
+    done_names = {name[: -len(".jsonl")] for name in os.listdir(done) if name.endswith(".jsonl")}
+    return ShardStatus(
+        total=plan.n_shards,
+        todo=len(os.listdir(todo)),
+        claimed=len([n for n in os.listdir(claimed) if n.split(_CLAIM_SEP)[0] not in done_names]),
+        done=len(done_names),
+    )
+
+
+def _filesystem_now(root: str) -> float:
+    """Current time as seen by the shared filesystem, so leases do not depend on host clocks."""
+    probe = os.path.join(root, ".clock")
+    try:
+        os.utime(probe, None)
+    except FileNotFoundError:
+        open(probe, "a").close()
+    return os.stat(probe).st_mtime
+
+
+def reclaim_expired(root: str, lease_seconds: float) -> List[str]:
+    """Return expired claims to `todo/` (or drop them if the shard is done)."""
+    todo, claimed, _ = _dirs(root)
+    now = _filesystem_now(root)
+    reclaimed = []
+    for entry in os.listdir(claimed):
+        path = os.path.join(claimed, entry)
+        try:
+            age = now - os.stat(path).st_mtime
+        except FileNotFoundError:
+            continue
+        if age <= lease_seconds:
+            continue
+        name = entry.split(_CLAIM_SEP)[0]
+        try:
+            if os.path.exists(_done_path(root, name)):
+                os.remove(path)
+            else:
+                os.rename(path, os.path.join(todo, name))
+                reclaimed.append(name)
+        except FileNotFoundError:
+            continue  # claim refreshed away or reclaimed by another worker
+    return reclaimed
+
+
+def claim_shard(root: str, worker_id: str) -> Optional[Tuple[str, str]]:
+    """Claim the lowest unclaimed shard; returns (shard name, claim path) or None."""
+    todo, claimed, _ = _dirs(root)
+    for name in sorted(os.listdir(todo)):
+        source = os.path.join(todo, name)
+        target = os.path.join(claimed, f"{name}{_CLAIM_SEP}{worker_id}")
+        try:
+            # Touch first: the rename keeps the mtime, which is the lease of the new claim.
+            os.utime(source, None)
+            os.rename(source, target)
+            os.utime(target, None)
+        except FileNotFoundError:
+            continue  # another worker won the rename, or reclaimed the claim already
+        return name, target
+    return None
+
+
+class _Heartbeat:
+    """Refreshes a claim's mtime every `interval` seconds until stopped or the claim is lost."""
+
+    def __init__(self, claim_path: str, interval: float) -> None:
+        self.claim_path = claim_path
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shard-heartbeat", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                os.utime(self.claim_path, None)
+            except FileNotFoundError:
+                self.lost.set()
+                return
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _shard_rows(
+    plan: ShardPlan,
+    shard: int,
+    config: Config,
+    heartbeat: _Heartbeat,
+    metrics: Optional[SweepMetrics] = None,
+) -> Optional[Tuple[List[dict], Dict[int, SweepAggregate]]]:
+    from sim_contribution.evaluation.runner import run_experiment
+
+    record_stage = metrics.record_stage if metrics is not None else None
+    rows: List[dict] = []
+    aggregates: Dict[int, SweepAggregate] = {}
+    for grid_index, seed in plan.units(shard):
+        if heartbeat.lost.is_set():
+            return None
+        point = plan.grid[grid_index]
+        started = time.perf_counter()
+        report = run_experiment(seed, apply_overrides(config, point), plan.strategies, record_stage=record_stage)
+        if metrics is not None:
+            metrics.season_done(time.perf_counter() - started)
+        for result in report.strategy_results:
+            row = result.summary_row(season_label(seed))
+            row.update({"grid": grid_index, "seed": seed, "config": dict(point)})
+            rows.append(row)
+        aggregates.setdefault(grid_index, SweepAggregate()).add_season(report.strategy_results)
+    return rows, aggregates
+
+
+def run_worker(
+    root: str,
+    config: Optional[Config] = None,
+    worker_id: Optional[str] = None,
+    max_shards: Optional[int] = None,
+    poll_seconds: float = 5.0,
+    wait: bool = True,
+    metrics: Optional[SweepMetrics] = None,
+) -> List[str]:
+    """Process shards until none are left; returns the names of shards this worker completed.
+
+    With `wait=True` the worker keeps polling while other workers hold
+    claims, so shards of crashed workers are picked up once their lease
+    expires.
+    """
+    plan = load_plan(root)
+    config = config or Config()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    if _CLAIM_SEP in worker_id:
+        raise ValueError(f"worker_id must not contain {_CLAIM_SEP!r}")
+    heartbeat_interval = max(plan.lease_seconds / 4.0, 0.05)
+
+    completed: List[str] = []
+    while max_shards is None or len(completed) < max_shards:
+        reclaim_expired(root, plan.lease_seconds)
+        claim = claim_shard(root, worker_id)
+        if claim is None:
+            status = shard_status(root)
+            if status.done >= status.total or not wait:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        name, claim_path = claim
+        shard = int(name.split("_")[1])
+        if os.path.exists(_done_path(root, name)):
+            _remove_quietly(claim_path)
+            continue
+        with _Heartbeat(claim_path, heartbeat_interval) as heartbeat:
+            outcome = _shard_rows(plan, shard, config, heartbeat, metrics)
+        if outcome is None:
+            continue  # lease lost mid-shard: another worker owns it now
+        rows, aggregates = outcome
+        started = time.perf_counter()
+        _write_atomic(
+            _aggregate_path(root, name),
+            json.dumps({str(grid): agg.to_dict() for grid, agg in sorted(aggregates.items())}),
+        )
+        _write_atomic(_done_path(root, name), "".join(json.dumps(row) + "\n" for row in rows))
+        if metrics is not None:
+            metrics.record_stage("output", time.perf_counter() - started)
+        _remove_quietly(claim_path)
+        completed.append(name)
+    return completed
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def iter_shard_rows(root: str) -> Iterator[dict]:
+    """Result rows of every shard in shard order; raises if any shard is missing."""
+    plan = load_plan(root)
+    for shard in range(plan.n_shards):
+        path = _done_path(root, shard_name(shard))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{shard_name(shard)} has not been completed ({path})")
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _shard_aggregates(root: str, name: str) -> Dict[int, SweepAggregate]:
+    """Partial aggregates of a finished shard (rebuilt from its rows if the file is missing)."""
+    try:
+        with open(_aggregate_path(root, name), "r", encoding="utf-8") as f:
+            return {int(grid): SweepAggregate.from_dict(data) for grid, data in json.load(f).items()}
+    except FileNotFoundError:
+        pass
+    aggregates: Dict[int, SweepAggregate] = {}
+    season: List[dict] = []
+    with open(_done_path(root, name), "r", encoding="utf-8") as f:
+        for row in (json.loads(line) for line in f if line.strip()):
+            if season and (row["grid"], row["seed"]) != (season[0]["grid"], season[0]["seed"]):
+                aggregates.setdefault(season[0]["grid"], SweepAggregate()).add_rows(season)
+                season = []
+            season.append(row)
+    if season:
+        aggregates.setdefault(season[0]["grid"], SweepAggregate()).add_rows(season)
+    return aggregates
+
+
+def merge_aggregates(root: str) -> Dict[int, SweepAggregate]:
+    """Per grid point aggregate of every shard, merged in shard order."""
+    plan = load_plan(root)
+    merged: Dict[int, SweepAggregate] = {}
+    for shard in range(plan.n_shards):
+        name = shard_name(shard)
+        if not os.path.exists(_done_path(root, name)):
+            raise FileNotFoundError(f"{name} has not been completed ({_done_path(root, name)})")
+        for grid, aggregate in _shard_aggregates(root, name).items():
+            merged.setdefault(grid, SweepAggregate()).merge(aggregate)
+    return merged
+
+
+def _write_csv_atomic(path: str, rows: List[Dict[str, object]]) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        if rows:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def merge_shards(root: str) -> str:
+    """Write `results.jsonl` (all rows, streamed in shard order), `aggregate.json`,
+    and per grid point `summary.csv` / `summary_pairs.csv` from the shard aggregates."""
+    plan = load_plan(root)
+    merged = merge_aggregates(root)
+
+    results_path = os.path.join(root, RESULTS_FILENAME)
+    tmp = f"{results_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
+        for shard in range(plan.n_shards):
+            with open(_done_path(root, shard_name(shard)), "r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, out)
+    os.replace(tmp, results_path)
+
+    _write_atomic(
+        os.path.join(root, AGGREGATE_FILENAME),
+        json.dumps({str(grid): agg.to_dict() for grid, agg in sorted(merged.items())}, indent=2),
+    )
+    strategy_rows: List[Dict[str, object]] = []
+    pair_rows: List[Dict[str, object]] = []
+    for grid, aggregate in sorted(merged.items()):
+        context = {"grid": grid, "config": json.dumps(plan.grid[grid], sort_keys=True)}
+        strategy_rows.extend({**context, **row} for row in aggregate.strategy_rows())
+        pair_rows.extend({**context, **row} for row in aggregate.pair_rows())
+    summary_path = os.path.join(root, SUMMARY_FILENAME)
+    _write_csv_atomic(summary_path, strategy_rows)
+    _write_csv_atomic(os.path.join(root, PAIRS_FILENAME), pair_rows)
+    return summary_path
@@ -0,0 +1,290 @@
+"""Successive-halving tuner for strategy knobs.
+
+Candidates are `Config` overrides of strategy-only fields (`TUNABLE_FIELDS`),
+so Phase A does not depend on them: each season is simulated once with the
+base config, published to shared memory (`parallel/shared_memory.py`) and
+reused by every candidate. Rung k evaluates the surviving candidates on the
+first `min_seasons * eta**k` seeds (seasons already evaluated at an earlier
+rung are not re-run) and promotes the best `ceil(n / eta)` by mean Phase B
+`Σy`, until one candidate is left or all seeds are used.
+
+Comparisons are paired: on a season, every candidate gets the same strategy
+RNG and the same Phase B noise stream, so two candidates proposing the same
+partition score the same.
+"""
+from __future__ import annotations
+
+import csv
+import dataclasses
+import json
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sim_contribution.config import Config
+from sim_contribution.evaluation.runner import evaluate_partition, propose_partition, run_phase_a
+from sim_contribution.log.columnar import ColumnarSeasonLog
+from sim_contribution.log.schema import SeasonLog
+from sim_contribution.parallel.shared_memory import (
+    SharedArrayStore,
+    SharedSeasonLogHandle,
+    SharedTrueParamsHandle,
+    attach_season_log,
+    attach_true_params,
+    publish_season_log,
+    publish_true_params,
+)
+from sim_contribution.players.types import TrueParams
+from sim_contribution.rng import named_rng
+from sim_contribution.strategies.registry import get_strategy
+
+# Config fields read only by the strategies (never by Phase A).
+TUNABLE_FIELDS = (
+    "interaction_alpha",
+    "greedy_size_priority",
+    "pair_profile_prior",
+    "pair_profile_prior_strength",
+    "local_search_max_rounds",
+    "matching_pair_weights",
+    "matching_mode",
+    "matching_exact_max_players",
+    "matching_exact_max_distinct_weights",
+    "matching_augment_rounds",
+)
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    rung: int
+    candidate: int
+    seed: int
+    total_y: float
+    total_v_true: float
+
+
+@dataclass(frozen=True)
+class RungSummary:
+    rung: int
+    candidate: int
+    n_seasons: int
+    mean_total_y: float
+    std_total_y: float
+    mean_total_v_true: float
+    promoted: bool
+
+
+@dataclass(frozen=True)
+class TuningResult:
+    strategy: str
+    base_config: Config
+    candidates: List[Dict[str, Any]]
+    best: int
+    trials: List[TrialResult]
+    rungs: List[RungSummary]
+    n_seeds: int
+
+    @property
+    def config(self) -> Config:
+        return dataclasses.replace(self.base_config, **self.candidates[self.best])
+
+    @property
+    def n_evaluations(self) -> int:
+        return len(self.trials)
+
+    @property
+    def grid_evaluations(self) -> int:
+        """Evaluations of the full grid on every seed."""
+        return len(self.candidates) * self.n_seeds
+
+
+def _check_candidates(candidates: Sequence[Dict[str, Any]]) -> None:
+    if not candidates:
+        raise ValueError("No candidates to tune")
+    for overrides in candidates:
+        for name in overrides:
+            if name not in TUNABLE_FIELDS:
+                raise ValueError(f"Config.{name} is not tunable (tunable: {', '.join(TUNABLE_FIELDS)})")
+
+
+def evaluate_candidate(
+    season_log: SeasonLog, true_params: TrueParams, seed: int, config: Config, strategy: str
+) -> Tuple[float, float]:
+    """(Σy, Σv_true) of `strategy` under `config`; RNGs depend on (seed, strategy) only."""
+    partition = propose_partition(get_strategy(strategy), season_log, named_rng(seed, f"tune:{strategy}"), config)
+    result = evaluate_partition(partition, true_params, season_log.phase_a_stats, named_rng(seed, "phase_b"), config, strategy)
+    return result.total_y, float(sum(team.v_true for team in result.teams))
+
+
+# Seasons attached by this worker, keyed by the first segment of their log.
+_ATTACHED_SEASONS: Dict[str, Tuple[SeasonLog, TrueParams]] = {}
+
+
+def _attached_season(handles: Tuple[SharedSeasonLogHandle, SharedTrueParamsHandle]) -> Tuple[SeasonLog, TrueParams]:
+    log_handle, params_handle = handles
+    key = next(iter(log_handle.arrays.values())).segment
+    if key not in _ATTACHED_SEASONS:
+        _ATTACHED_SEASONS[key] = (attach_season_log(log_handle).to_season_log(), attach_true_params(params_handle))
+    return _ATTACHED_SEASONS[key]
+
+
+def _evaluate_task(args: tuple) -> Tuple[float, float]:
+    handles, seed, config, strategy = args
+    season_log, true_params = _attached_season(handles)
+    return evaluate_candidate(season_log, true_params, seed, config, strategy)
+
+
+def _phase_a_task(args: tuple) -> Tuple[SeasonLog, TrueParams]:
+    return run_phase_a(*args)
+
+
+def tune(
+    strategy: str,
+    candidates: Sequence[Dict[str, Any]],
+    seeds: Sequence[int],
+    base_config: Config,
+    min_seasons: int = 3,
+    eta: int = 3,
+    workers: int = 1,
+) -> TuningResult:
+    get_strategy(strategy)
+    _check_candidates(candidates)
+    if min_seasons < 1 or eta < 2:
+        raise ValueError("min_seasons must be >= 1 and eta >= 2")
+    if not seeds:
+        raise ValueError("No seeds to tune on")
+    configs = [dataclasses.replace(base_config, **overrides) for overrides in candidates]
+
+    seasons: Dict[int, Tuple[SeasonLog, TrueParams]] = {}
+    handles: Dict[int, Tuple[SharedSeasonLogHandle, SharedTrueParamsHandle]] = {}
+    scores: List[Dict[int, Tuple[float, float]]] = [{} for _ in candidates]
+    trials: List[TrialResult] = []
+    rungs: List[RungSummary] = []
+
+    with SharedArrayStore() as store:
+        pool: Optional[Executor] = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            alive = list(range(len(candidates)))
+            rung = 0
+            while True:
+                rung_seeds = list(seeds[: min(min_seasons * eta**rung, len(seeds))])
+                new_seeds = [seed for seed in rung_seeds if seed not in seasons]
+                phase_a_tasks = [(seed, base_config) for seed in new_seeds]
+                simulated = pool.map(_phase_a_task, phase_a_tasks) if pool else map(_phase_a_task, phase_a_tasks)
+                for seed, (season_log, true_params) in zip(new_seeds, simulated):
+                    seasons[seed] = (season_log, true_params)
+                    if pool is not None:
+                        handles[seed] = (
+                            publish_season_log(
+                                store, ColumnarSeasonLog.from_season_log(season_log).with_precision(base_config)
+                            ),
+                            publish_true_params(store, true_params),
+                        )
+
+                pending = [(c, seed) for c in alive for seed in rung_seeds if seed not in scores[c]]
+                if pool is not None:
+                    tasks = [(handles[seed], seed, configs[c], strategy) for c, seed in pending]
+                    outcomes = list(pool.map(_evaluate_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+                else:
+                    outcomes = [evaluate_candidate(*seasons[seed], seed, configs[c], strategy) for c, seed in pending]
+                for (c, seed), (total_y, total_v_true) in zip(pending, outcomes):
+                    scores[c][seed] = (total_y, total_v_true)
+                    trials.append(TrialResult(rung, c, seed, total_y, total_v_true))
+
+                values = {c: np.array([scores[c][seed] for seed in rung_seeds]) for c in alive}
+                ranked = sorted(alive, key=lambda c: (-float(values[c][:, 0].mean()), c))
+                final = len(alive) == 1 or len(rung_seeds) == len(seeds)
+                promoted = ranked[:1] if final else ranked[: math.ceil(len(alive) / eta)]
+                for c in ranked:
+                    rungs.append(
+                        RungSummary(
+                            rung=rung,
+                            candidate=c,
+                            n_seasons=len(rung_seeds),
+                            mean_total_y=float(values[c][:, 0].mean()),
+                            std_total_y=float(values[c][:, 0].std()),
+                            mean_total_v_true=float(values[c][:, 1].mean()),
+                            promoted=c in promoted,
+                        )
+                    )
+                if final:
+                    break
+                alive = promoted
+                rung += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    return TuningResult(
+        strategy=strategy,
+        base_config=base_config,
+        candidates=[dict(overrides) for overrides in candidates],
+        best=promoted[0],
+        trials=trials,
+        rungs=rungs,
+        n_seeds=len(seeds),
+    )
+
+
+def _overrides_text(overrides: Dict[str, Any]) -> str:
+    return " ".join(
+        f"{name}={'/'.join(str(v) for v in value) if isinstance(value, tuple) else value}"
+        for name, value in overrides.items()
+    )
+
+
+def _write_rows(path: str, rows: List[Dict[str, object]]) -> None:
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_tuning_report(result: TuningResult, outdir: str) -> None:
+    """`tuned_config.json`, `tuner_trace.csv` (every evaluation) and `tuner_rungs.csv`."""
+    os.makedirs(outdir, exist_ok=True)
+    tuned = {
+        "strategy": result.strategy,
+        "overrides": result.candidates[result.best],
+        "config": dataclasses.asdict(result.config),
+        "n_evaluations": result.n_evaluations,
+        "grid_evaluations": result.grid_evaluations,
+    }
+    with open(os.path.join(outdir, "tuned_config.json"), "w", encoding="utf-8") as f:
+        json.dump(tuned, f, ensure_ascii=False, indent=2)
+    _write_rows(
+        os.path.join(outdir, "tuner_trace.csv"),
+        [
+            {
+                "rung": trial.rung,
+                "candidate": trial.candidate,
+                "overrides": _overrides_text(result.candidates[trial.candidate]),
+                "seed": trial.seed,
+                "total_y": trial.total_y,
+                "total_v_true": trial.total_v_true,
+            }
+            for trial in result.trials
+        ],
+    )
+    _write_rows(
+        os.path.join(outdir, "tuner_rungs.csv"),
+        [
+            {**dataclasses.asdict(summary), "overrides": _overrides_text(result.candidates[summary.candidate])}
+            for summary in result.rungs
+        ],
+    )
+
+
+def summarize_tuning(result: TuningResult) -> str:
+    best = [summary for summary in result.rungs if summary.candidate == result.best][-1]
+    return (
+        f"{result.strategy}: best {_overrides_text(result.candidates[result.best]) or '(base config)'} "
+        f"mean Σy={best.mean_total_y:.3f} ± {best.std_total_y:.3f} on {best.n_seasons} seasons "
+        f"(Σv_true={best.mean_total_v_true:.3f}); "
+        f"{result.n_evaluations} evaluations vs {result.grid_evaluations} for the full grid"
+    )
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import dataclasses
+import hashlib
 import os
-from typing import List
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 import numpy as np
 import matplotlib
 
@@ -9,19 +13,83 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
 from sim_contribution.evaluation.types import StrategyResult
+from sim_contribution.log.columnar import ColumnarSeasonLog
 from sim_contribution.log.schema import SeasonLog, TeamLog
+from sim_contribution.observation.ranking import RANK_ORDER
 from sim_contribution.players.types import TrueParams
+from sim_contribution.viz.types import PLOT_LEVELS, SUMMARY_FIGURES
 from sim_contribution.config import Config
 
 
+HASH_SUFFIX = ".inputs.sha256"
+DPI = 150
+
+# Bump when a figure's drawing code changes so cached PNGs are re-rendered.
+RENDER_VERSION = 3
+
+# Above these sizes figures switch to aggregated / downsampled rendering.
+TABLE_MAX_ROWS = 60
+BAR_MAX_ITEMS = 200
+HEATMAP_MAX_SIZE = 256
+
+RANK_COLORS = {"A": "#4C78A8", "B": "#54A24B", "C": "#EECA3B", "D": "#F58518", "E": "#E45756"}
+
+
 def _save(fig: plt.Figure, outdir: str, filename: str) -> None:
     os.makedirs(outdir, exist_ok=True)
     path = os.path.join(outdir, filename)
     fig.tight_layout()
-    fig.savefig(path, dpi=150)
+    fig.savefig(path, dpi=DPI)
     plt.close(fig)
 
 
+def _save_empty(outdir: str, filename: str, message: str) -> None:
+    """A placeholder figure, so empty inputs still leave a PNG (and its input hash) behind."""
+    fig, ax = plt.subplots(figsize=(6, 2))
+    ax.axis("off")
+    ax.text(0.5, 0.5, message, ha="center", va="center")
+    _save(fig, outdir, filename)
+
+
+def block_average(matrix: np.ndarray, max_size: int = HEATMAP_MAX_SIZE) -> Tuple[np.ndarray, int, int]:
+    """Mean over (row_block × col_block) tiles so that neither side exceeds `max_size`.
+
+    Returns the reduced matrix and the block sizes; trailing partial blocks
+    average only their existing cells.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    n_rows, n_cols = matrix.shape
+    row_block = max(1, -(-n_rows // max_size))
+    col_block = max(1, -(-n_cols // max_size))
+    if row_block == 1 and col_block == 1:
+        return matrix, 1, 1
+    out_rows = -(-n_rows // row_block)
+    out_cols = -(-n_cols // col_block)
+    sums = np.zeros((out_rows, out_cols))
+    counts = np.zeros((out_rows, out_cols))
+    # Row bands keep the temporary memory at O(row_block * n_cols).
+    col_index = np.arange(n_cols) // col_block
+    for r in range(out_rows):
+        band = matrix[r * row_block : (r + 1) * row_block]
+        sums[r] = np.bincount(col_index, weights=band.sum(axis=0), minlength=out_cols)
+        counts[r] = np.bincount(col_index, minlength=out_cols) * band.shape[0]
+    return sums / counts, row_block, col_block
+
+
+def _player_bars(ax: plt.Axes, values: List[float], color: str) -> None:
+    if len(values) <= BAR_MAX_ITEMS:
+        ax.bar(range(len(values)), values, color=color)
+        return
+    x = np.arange(len(values))
+    ax.fill_between(x, values, step="mid", color=color, linewidth=0)
+
+
+def _extent(matrix: np.ndarray) -> Tuple[float, float, float, float]:
+    """imshow extent keeping player / dimension coordinates after `block_average`."""
+    n_rows, n_cols = matrix.shape
+    return (-0.5, n_cols - 0.5, n_rows - 0.5, -0.5)
+
+
 def plot_player_attributes(true_params: TrueParams, config: Config, outdir: str) -> None:
     abilities = [p.ability for p in true_params.players]
     cooper = [p.cooperativeness for p in true_params.players]
@@ -30,23 +98,29 @@ def plot_player_attributes(true_params: TrueParams, config: Config, outdir: str)
 
     fig, axes = plt.subplots(3, 2, figsize=(12, 11))
 
-    axes[0, 0].bar(range(len(abilities)), abilities, color="#4C78A8")
+    _player_bars(axes[0, 0], abilities, "#4C78A8")
     axes[0, 0].set_title("Ability (a_i)")
     axes[0, 0].set_xlabel("Player")
 
-    axes[0, 1].bar(range(len(cooper)), cooper, color="#F58518")
+    _player_bars(axes[0, 1], cooper, "#F58518")
     axes[0, 1].set_title("Cooperativeness (c_i)")
     axes[0, 1].set_xlabel("Player")
 
-    im1 = axes[1, 0].imshow(skills, aspect="auto", cmap="viridis")
-    axes[1, 0].set_title("Skill vectors (s_i)")
+    skill_image, skill_block, _ = block_average(skills) if skills.size else (skills, 1, 1)
+    im1 = axes[1, 0].imshow(skill_image, aspect="auto", cmap="viridis", extent=_extent(skills))
+    axes[1, 0].set_title("Skill vectors (s_i)" if skill_block == 1 else f"Skill vectors (s_i), means of {skill_block} players")
     axes[1, 0].set_xlabel("Skill dimension")
     axes[1, 0].set_ylabel("Player")
     fig.colorbar(im1, ax=axes[1, 0], shrink=0.8)
 
-    max_abs = np.max(np.abs(affinity)) if affinity.size else 1.0
-    im2 = axes[1, 1].imshow(affinity, cmap="coolwarm", vmin=-max_abs, vmax=max_abs)
-    axes[1, 1].set_title("Affinity matrix (h_ij)")
+    affinity_image, aff_block, _ = block_average(affinity) if affinity.size else (affinity, 1, 1)
+    max_abs = np.max(np.abs(affinity_image)) if affinity_image.size else 1.0
+    im2 = axes[1, 1].imshow(
+        affinity_image, cmap="coolwarm", vmin=-max_abs, vmax=max_abs, extent=_extent(affinity)
+    )
+    axes[1, 1].set_title(
+        "Affinity matrix (h_ij)" if aff_block == 1 else f"Affinity matrix (h_ij), {aff_block}x{aff_block} block means"
+    )
     axes[1, 1].set_xlabel("Player")
     axes[1, 1].set_ylabel("Player")
     fig.colorbar(im2, ax=axes[1, 1], shrink=0.8)
@@ -69,7 +143,16 @@ def plot_player_attributes(true_params: TrueParams, config: Config, outdir: str)
     _save(fig, outdir, "players.png")
 
 
-def plot_phase_a_teams(season_log: SeasonLog, outdir: str) -> None:
+def plot_phase_a_teams(season_log: SeasonLog, outdir: str, max_rows: int = TABLE_MAX_ROWS) -> None:
+    """Table of every Phase A team, or per-match summaries above `max_rows` teams."""
+    n_rows = sum(len(match.teams) for match in season_log.matches)
+    if n_rows == 0:
+        _save_empty(outdir, "phase_a_teams.png", "No Phase A teams")
+        return
+    if n_rows > max_rows:
+        _plot_phase_a_team_summary(season_log, outdir)
+        return
+
     rows = []
     for match in season_log.matches:
         for team in match.teams:
@@ -98,6 +181,62 @@ def plot_phase_a_teams(season_log: SeasonLog, outdir: str) -> None:
     _save(fig, outdir, "phase_a_teams.png")
 
 
+def _plot_phase_a_team_summary(season_log: SeasonLog, outdir: str) -> None:
+    """Aggregated view for large seasons (the full table is in phase_a_teams.csv)."""
+    n_matches = len(season_log.matches)
+    n_teams = np.array([len(match.teams) for match in season_log.matches], dtype=np.int64)
+    match_index = np.repeat(np.arange(n_matches), n_teams)
+    y = np.fromiter((team.y_obs for match in season_log.matches for team in match.teams), dtype=float, count=int(n_teams.sum()))
+    rank_code = {r: idx for idx, r in enumerate(RANK_ORDER)}
+    ranks = np.fromiter(
+        (rank_code[team.rank] for match in season_log.matches for team in match.teams), dtype=np.int64, count=y.size
+    )
+
+    safe_teams = np.maximum(n_teams, 1)
+    mean_y = np.bincount(match_index, weights=y, minlength=n_matches) / safe_teams
+    min_y = np.full(n_matches, np.inf)
+    max_y = np.full(n_matches, -np.inf)
+    np.minimum.at(min_y, match_index, y)
+    np.maximum.at(max_y, match_index, y)
+    per_match_ranks = np.zeros((len(RANK_ORDER), n_matches))
+    np.add.at(per_match_ranks, (ranks, match_index), 1.0)
+
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    x = np.arange(n_matches)
+
+    axes[0, 0].fill_between(x, min_y, max_y, color="#4C78A8", alpha=0.25, linewidth=0, label="min-max")
+    axes[0, 0].plot(x, mean_y, color="#4C78A8", linewidth=1.0, label="mean")
+    axes[0, 0].set_title("Phase A y per match")
+    axes[0, 0].set_xlabel("Match")
+    axes[0, 0].legend(fontsize=8)
+
+    totals = np.bincount(ranks, minlength=len(RANK_ORDER))
+    axes[0, 1].bar(RANK_ORDER, totals, color=[RANK_COLORS[r] for r in RANK_ORDER])
+    axes[0, 1].set_title(f"Rank histogram ({y.size} teams)")
+
+    axes[1, 0].stackplot(
+        x,
+        per_match_ranks / safe_teams,
+        labels=RANK_ORDER,
+        colors=[RANK_COLORS[r] for r in RANK_ORDER],
+        step="mid",
+    )
+    axes[1, 0].set_xlim(-0.5, max(n_matches - 0.5, 0.5))
+    axes[1, 0].set_ylim(0, 1)
+    axes[1, 0].set_title("Rank share per match")
+    axes[1, 0].set_xlabel("Match")
+    axes[1, 0].legend(fontsize=8, loc="upper right")
+
+    stats = season_log.phase_a_stats
+    axes[1, 1].hist(y, bins=50, color="#72B7B2")
+    for label, cutoff in stats.thresholds:
+        axes[1, 1].axvline(stats.mean_y + cutoff * stats.std_y, color="black", linewidth=0.8, linestyle="--")
+    axes[1, 1].set_title("Distribution of y (dashed: rank cutoffs)")
+
+    fig.suptitle(f"Phase A teams: {n_matches} matches, {y.size} teams (full table: phase_a_teams.csv)")
+    _save(fig, outdir, "phase_a_teams.png")
+
+
 def _stacked_breakdown(ax: plt.Axes, teams: List[TeamLog], title: str) -> None:
     components = ["base", "diversity", "affinity", "cooperation", "comm_cost"]
     colors = {
@@ -110,25 +249,34 @@ def _stacked_breakdown(ax: plt.Axes, teams: List[TeamLog], title: str) -> None:
     x = np.arange(len(teams))
     bottom_pos = np.zeros(len(teams))
     bottom_neg = np.zeros(len(teams))
+    as_bars = len(teams) <= BAR_MAX_ITEMS
 
     for comp in components:
         vals = np.array([t.breakdown.get(comp, 0.0) for t in teams])
         pos = np.clip(vals, 0, None)
         neg = np.clip(vals, None, 0)
-        ax.bar(x, pos, bottom=bottom_pos, label=comp, color=colors.get(comp))
-        ax.bar(x, neg, bottom=bottom_neg, label="_nolegend_", color=colors.get(comp))
+        if as_bars:
+            ax.bar(x, pos, bottom=bottom_pos, label=comp, color=colors.get(comp))
+            ax.bar(x, neg, bottom=bottom_neg, label="_nolegend_", color=colors.get(comp))
+        else:
+            ax.fill_between(x, bottom_pos, bottom_pos + pos, step="mid", label=comp, color=colors.get(comp), linewidth=0)
+            ax.fill_between(x, bottom_neg, bottom_neg + neg, step="mid", color=colors.get(comp), linewidth=0)
         bottom_pos += pos
         bottom_neg += neg
 
     ax.axhline(0, color="black", linewidth=0.8)
-    ax.set_xticks(x)
-    ax.set_xticklabels([f"T{idx}" for idx in range(len(teams))])
+    if as_bars:
+        ax.set_xticks(x)
+        ax.set_xticklabels([f"T{idx}" for idx in range(len(teams))])
+    else:
+        ax.set_xlabel("Team")
     ax.set_title(title)
 
 
 def plot_phase_a_breakdowns(season_log: SeasonLog, outdir: str) -> None:
     all_teams = [team for match in season_log.matches for team in match.teams]
     if not all_teams:
+        _save_empty(outdir, "phase_a_breakdown.png", "No Phase A teams")
         return
 
     sorted_teams = sorted(all_teams, key=lambda t: t.y_obs)
@@ -144,6 +292,7 @@ def plot_phase_a_breakdowns(season_log: SeasonLog, outdir: str) -> None:
 
 def plot_phase_b_partitions(strategy_results: List[StrategyResult], outdir: str) -> None:
     if not strategy_results:
+        _save_empty(outdir, "phase_b_partitions.png", "No strategy results")
         return
 
     fig, axes = plt.subplots(len(strategy_results), 1, figsize=(10, 4 * len(strategy_results)))
@@ -152,14 +301,15 @@ def plot_phase_b_partitions(strategy_results: List[StrategyResult], outdir: str)
 
     for ax, result in zip(axes, strategy_results):
         _stacked_breakdown(ax, result.teams, f"Phase B: {result.name}")
-        ax.set_xticklabels(
-            [
-                ",".join(str(m) for m in team.members)
-                for team in result.teams
-            ],
-            rotation=30,
-            ha="right",
-        )
+        if len(result.teams) <= BAR_MAX_ITEMS:
+            ax.set_xticklabels(
+                [
+                    ",".join(str(m) for m in team.members)
+                    for team in result.teams
+                ],
+                rotation=30,
+                ha="right",
+            )
         ax.legend(loc="upper right", fontsize=8)
 
     _save(fig, outdir, "phase_b_partitions.png")
@@ -189,15 +339,144 @@ def plot_phase_b_summary(strategy_results: List[StrategyResult], outdir: str) ->
     _save(fig, outdir, "phase_b_summary.png")
 
 
+@dataclass(frozen=True)
+class FigureTask:
+    """One output figure: `render(*args, outdir)` writes `filename`."""
+
+    filename: str
+    render: Callable[..., None]
+    args: Tuple[Any, ...]
+
+    def digest(self, memo: Optional[Dict[int, bytes]] = None) -> str:
+        """Hash of the figure's inputs; `memo` shares per-argument digests between tasks."""
+        h = hashlib.sha256()
+        _update_digest(h, (RENDER_VERSION, DPI, matplotlib.__version__, self.filename, self.render.__name__))
+        for arg in self.args:
+            key = id(arg)
+            if memo is None or key not in memo:
+                arg_hash = hashlib.sha256()
+                _update_digest(arg_hash, arg)
+                if memo is None:
+                    h.update(arg_hash.digest())
+                    continue
+                memo[key] = arg_hash.digest()
+            h.update(memo[key])
+        return h.hexdigest()
+
+
+def _update_digest(h: Any, obj: Any) -> None:
+    """Feed a canonical encoding of `obj` (arrays, dataclasses, containers, scalars)."""
+    if isinstance(obj, SeasonLog):
+        # Column arrays hash far faster than a walk over every TeamLog.
+        columnar = ColumnarSeasonLog.from_season_log(obj)
+        _update_digest(h, (columnar.columns(), columnar.phase_a_stats))
+    elif isinstance(obj, np.ndarray):
+        h.update(f"nd{obj.dtype.str}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(f"dc{type(obj).__name__}".encode())
+        for f in dataclasses.fields(obj):
+            h.update(f.name.encode())
+            _update_digest(h, getattr(obj, f.name))
+    elif isinstance(obj, Mapping):
+        h.update(f"map{len(obj)}".encode())
+        for key in sorted(obj, key=repr):
+            _update_digest(h, key)
+            _update_digest(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"seq{len(obj)}".encode())
+        for item in obj:
+            _update_digest(h, item)
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+
+
+def figure_tasks(
+    true_params: TrueParams,
+    season_log: SeasonLog,
+    strategy_results: List[StrategyResult],
+    config: Config,
+    level: str = "all",
+) -> List[FigureTask]:
+    if level not in PLOT_LEVELS:
+        raise ValueError(f"Unknown plot level: {level} (expected one of {', '.join(PLOT_LEVELS)})")
+    tasks = [
+        FigureTask("players.png", plot_player_attributes, (true_params, config)),
+        FigureTask("phase_a_teams.png", plot_phase_a_teams, (season_log,)),
+        FigureTask("phase_a_breakdown.png", plot_phase_a_breakdowns, (season_log,)),
+        FigureTask("phase_b_partitions.png", plot_phase_b_partitions, (strategy_results,)),
+        FigureTask("phase_b_summary.png", plot_phase_b_summary, (strategy_results,)),
+    ]
+    if level == "none":
+        return []
+    if level == "summary":
+        return [task for task in tasks if task.filename in SUMMARY_FIGURES]
+    return tasks
+
+
+def is_up_to_date(task: FigureTask, outdir: str, digest: Optional[str] = None) -> bool:
+    path = os.path.join(outdir, task.filename)
+    try:
+        with open(path + HASH_SUFFIX, "r", encoding="utf-8") as f:
+            recorded = f.read().strip()
+    except FileNotFoundError:
+        return False
+    return os.path.exists(path) and recorded == (digest or task.digest())
+
+
+def render_figure(task: FigureTask, outdir: str, digest: Optional[str] = None) -> None:
+    """Render `task` and record its input hash next to the PNG."""
+    path = os.path.join(outdir, task.filename)
+    sidecar = path + HASH_SUFFIX
+    if os.path.exists(sidecar):
+        os.remove(sidecar)
+    task.render(*task.args, outdir)
+    if os.path.exists(path):
+        tmp = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write((digest or task.digest()) + "\n")
+        os.replace(tmp, sidecar)
+
+
 def plot_all(
     true_params: TrueParams,
     season_log: SeasonLog,
     strategy_results: List[StrategyResult],
     config: Config,
     outdir: str,
-) -> None:
-    plot_player_attributes(true_params, config, outdir)
-    plot_phase_a_teams(season_log, outdir)
-    plot_phase_a_breakdowns(season_log, outdir)
-    plot_phase_b_partitions(strategy_results, outdir)
-    plot_phase_b_summary(strategy_results, outdir)
+    level: str = "all",
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+    force: bool = False,
+) -> List[str]:
+    """Render the figures of `level`, skipping those whose inputs are unchanged.
+
+    Figures are independent; with `executor` (or `workers > 1`, which creates a
+    temporary process pool) they are rendered in parallel. Returns the
+    filenames that were rendered.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    pending = []
+    memo: Dict[int, bytes] = {}
+    for task in figure_tasks(true_params, season_log, strategy_results, config, level):
+        digest = task.digest(memo)
+        if force or not is_up_to_date(task, outdir, digest):
+            pending.append((task, digest))
+    if not pending:
+        return []
+
+    if executor is None and workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            return _render_with(pool, pending, outdir)
+    if executor is not None:
+        return _render_with(executor, pending, outdir)
+    for task, digest in pending:
+        render_figure(task, outdir, digest)
+    return [task.filename for task, _ in pending]
+
+
+def _render_with(executor: Executor, pending: List[Tuple[FigureTask, str]], outdir: str) -> List[str]:
+    futures = [executor.submit(render_figure, task, outdir, digest) for task, digest in pending]
+    for future in futures:
+        future.result()
+    return [task.filename for task, _ in pending]
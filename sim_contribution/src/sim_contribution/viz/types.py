@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+# Kept apart from `plots` so that argument parsing does not import matplotlib.
+PLOT_LEVELS = ("none", "summary", "all")
+SUMMARY_FIGURES = ("phase_a_breakdown.png", "phase_b_summary.png")